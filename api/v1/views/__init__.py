@@ -13,3 +13,4 @@ from api.v1.views.amenities import *
 from api.v1.views.users import *
 from api.v1.views.places_reviews import *
 from api.v1.views.places_amenities import *
+from api.v1.views.suggest import *
@@ -3,6 +3,7 @@
 This file contains the Amenity module
 """
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.amenity import Amenity
@@ -10,9 +11,8 @@ from models.amenity import Amenity
 
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 def get_all_amenities():
-    """ get amenities by id """
-    all_list = [obj.to_dict() for obj in storage.all(Amenity).values()]
-    return jsonify(all_list)
+    """ get a page of amenities """
+    return paginate(Amenity)
 
 
 @app_views.route('/amenities/<string:amenity_id>', methods=['GET'],
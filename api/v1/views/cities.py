@@ -3,6 +3,7 @@
 This file contains the City module
 """
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.state import State
@@ -16,8 +17,7 @@ def get_cities(state_id):
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
-    list_cities = [obj.to_dict() for obj in state.cities]
-    return jsonify(list_cities)
+    return paginate(City, "state_id", state_id)
 
 
 @app_views.route('/cities/<string:city_id>', methods=['GET'],
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 """ routing File """
 from api.v1.views import app_views
-from flask import Flask, jsonify
+from flask import Flask, jsonify, make_response, request
 from models import storage
+from models.city import City
+from models.place import Place
 
 
 @app_views.route('/status', strict_slashes=False)
@@ -16,13 +18,32 @@ def status():
 @app_views.route('/stats', strict_slashes=False)
 def count():
     """
-    Retrieves the number of each objects by type.
+    Retrieves the number of each objects by type, and with ?by=state or
+    ?by=city, or both comma separated, the number of cities and places
+    of each state or of places of each city.
     """
-    return jsonify({
-        "amenities": storage.count("Amenity"),
-        "cities": storage.count("City"),
-        "places": storage.count("Place"),
-        "reviews": storage.count("Review"),
-        "states": storage.count("State"),
-        "users": storage.count("User")
-    })
+    by = [name.strip() for name in request.args.get('by', '').split(",")
+          if name.strip()]
+    if not all(name in ("state", "city") for name in by):
+        return make_response(jsonify({"error": "Invalid by"}), 400)
+    counts = storage.counts()
+    stats = {
+        "amenities": counts["Amenity"],
+        "cities": counts["City"],
+        "places": counts["Place"],
+        "reviews": counts["Review"],
+        "states": counts["State"],
+        "users": counts["User"]
+    }
+    places = storage.tally(Place, "city_id") if by else {}
+    if "city" in by:
+        stats["by_city"] = {id: {"places": total}
+                            for id, total in places.items()}
+    if "state" in by:
+        found = {id: {"cities": total, "places": 0} for id, total in
+                 storage.tally(City, "state_id").items()}
+        for id, state_id in storage.column(City, "state_id").items():
+            if state_id in found:
+                found[state_id]["places"] += places.get(id, 0)
+        stats["by_state"] = found
+    return jsonify(stats)
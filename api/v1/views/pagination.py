@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""
+Pagination and streaming of the list views: a page holds at most limit
+objects ordered by created_at and id, and the opaque cursor of the next
+page is sent in the X-Next-Cursor and Link headers. With ?stream=1, or
+when NDJSON is accepted, the objects following the cursor are streamed
+instead, encoded one at a time as storage yields them.
+"""
+import base64
+from datetime import datetime
+from flask import jsonify, make_response, request, Response
+from flask import stream_with_context
+import heapq
+from itertools import islice
+import json
+from models import storage
+from models.base_model import time
+from os import getenv
+from urllib.parse import urlencode
+
+# integer - objects in a page when no limit is asked, and the most a
+# page can hold
+page_limit = int(getenv('HBNB_API_PAGE_LIMIT', 100))
+# integer - bytes of encoded objects gathered before a streamed chunk is
+# sent
+chunk_size = 65536
+
+
+def page_args(capped=True):
+    """returns the limit and the (created_at, id) cursor asked by the
+    request, the cursor being None on the first page and the limit None
+    when neither asked nor capped; raises ValueError when either is
+    invalid"""
+    limit = request.args.get('limit', page_limit if capped else None)
+    if limit is not None:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        if capped:
+            limit = min(limit, page_limit)
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return limit, None
+    try:
+        cursor += "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor))
+        return limit, (datetime.strptime(created_at, time), str(id))
+    except TypeError:
+        raise ValueError("invalid cursor")
+
+
+def cursor(obj):
+    """returns the opaque cursor of the objects following obj"""
+    data = json.dumps([obj.created_at.strftime(time), obj.id])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def page_of(objs, limit, after=None):
+    """returns the first limit objects of objs, or all of them when limit
+    is None, following the cursor after, like storage.page does for
+    stored objects"""
+    if after is not None:
+        objs = (obj for obj in objs if (obj.created_at, obj.id) > after)
+    if limit is None:
+        return sorted(objs, key=lambda obj: (obj.created_at, obj.id))
+    return heapq.nsmallest(limit, objs,
+                           key=lambda obj: (obj.created_at, obj.id))
+
+
+def stream_mimetype():
+    """returns the mimetype the response should be streamed in, or None
+    to send a page"""
+    if request.accept_mimetypes.best_match(
+            ['application/json', 'application/x-ndjson']) == \
+            'application/x-ndjson':
+        return 'application/x-ndjson'
+    if request.args.get('stream') in ['1', 'true']:
+        return 'application/json'
+    return None
+
+
+def page_response(objs, limit):
+    """returns the JSON list of the first limit objects of objs, linking to
+    the next page when objs holds more"""
+    data = ", ".join(obj.to_json() for obj in objs[:limit])
+    response = Response("[" + data + "]", mimetype='application/json')
+    if len(objs) > limit:
+        next_cursor = cursor(objs[limit - 1])
+        args = request.args.to_dict()
+        args.update(cursor=next_cursor, limit=limit)
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
+
+
+def stream_response(objs, mimetype):
+    """returns a response encoding the objects of the iterator objs as
+    they come, as a JSON array or one JSON object per line"""
+    ndjson = mimetype == 'application/x-ndjson'
+
+    def generate():
+        """yields the encoded objects chunk_size bytes at a time"""
+        chunk = [] if ndjson else ["["]
+        size = 0
+        for n, obj in enumerate(objs):
+            data = obj.to_json()
+            if ndjson:
+                chunk.append(data + "\n")
+            else:
+                chunk.append("," + data if n else data)
+            size += len(data) + 1
+            if size >= chunk_size:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
+        if not ndjson:
+            chunk.append("]")
+        if chunk:
+            yield "".join(chunk)
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def bad_page():
+    """returns the response to an invalid limit or cursor"""
+    return make_response(jsonify({"error": "Invalid limit or cursor"}), 400)
+
+
+def paginate(cls, attr=None, id=None, objs=None):
+    """returns the response listing the cls objects, or those whose attr
+    refers to id, or else the given objs: one page of them, or all those
+    following the cursor when streaming"""
+    mimetype = stream_mimetype()
+    try:
+        limit, after = page_args(mimetype is None)
+    except ValueError:
+        return bad_page()
+    if mimetype is None:
+        if objs is None:
+            objs = storage.page(cls, limit + 1, after, attr, id)
+        else:
+            objs = page_of(objs, limit + 1, after)
+        return page_response(objs, limit)
+    if objs is None:
+        objs = storage.walk(cls, after, attr, id)
+    else:
+        objs = page_of(objs, None, after)
+    return stream_response(islice(objs, limit), mimetype)
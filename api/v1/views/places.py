@@ -3,13 +3,19 @@
 This file contains the Place module
 """
 from api.v1.views import app_views
+from api.v1.views.pagination import page_limit, paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
+from models.engine import geo, query
 from models.place import Place
 from models.city import City
 from models.user import User
-from models.amenity import Amenity
-from models.state import State
+
+# float - kilometers searched by places_nearby when no radius is asked
+nearby_radius = 10.0
+# tuple - attributes the where of places_search may filter on
+searchable = ("number_rooms", "number_bathrooms", "max_guest",
+              "price_by_night", "city_id", "user_id")
 
 
 @app_views.route('/cities/<string:city_id>/places',
@@ -19,8 +25,7 @@ def get_all_places(city_id):
     city = storage.get(City, city_id)
     if city is None:
         abort(404)
-    places = [obj.to_dict() for obj in city.places]
-    return jsonify(places)
+    return paginate(Place, "city_id", city_id)
 
 
 @app_views.route('/places/<string:place_id>', methods=['GET'],
@@ -88,56 +93,86 @@ def post_place(place_id):
                  strict_slashes=False)
 def search_places_by_id():
     """ search places by id """
-    if request.get_json() is None:
+    data = request.get_json(silent=True)
+    if data is None:
         return make_response(jsonify({"error": "Not a JSON"}), 400)
-
-    data = request.get_json()
-
-    if data and len(data):
-        states = data.get('states', None)
-        cities = data.get('cities', None)
-        amenities = data.get('amenities', None)
-
-    if not data or not len(data) or (
-            not states and
-            not cities and
-            not amenities):
-        places = storage.all(Place).values()
-        list_places = []
-        for place in places:
-            list_places.append(place.to_dict())
-        return jsonify(list_places)
-
-    list_places = []
-    if states:
-        states_obj = [storage.get(State, s_id) for s_id in states]
-        for state in states_obj:
-            if state:
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            list_places.append(place)
-
-    if cities:
-        city_obj = [storage.get(City, c_id) for c_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in list_places:
-                        list_places.append(place)
-
-    if amenities:
-        if not list_places:
-            list_places = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
-        list_places = [place for place in list_places
-                       if all([am in place.amenities
-                               for am in amenities_obj])]
-
-    places = []
-    for p in list_places:
-        d = p.to_dict()
-        d.pop('amenities', None)
-        places.append(d)
-
-    return jsonify(places)
+    if type(data) is not dict:
+        data = {}
+    for key in ['states', 'cities', 'amenities']:
+        if type(data.get(key) or []) is not list:
+            return make_response(jsonify({"error": "Invalid " + key}), 400)
+    states = [i for i in data.get('states') or [] if type(i) is str]
+    cities = [i for i in data.get('cities') or [] if type(i) is str]
+    amenities = data.get('amenities') or []
+    if not all(type(i) is str for i in amenities):
+        return jsonify([])
+
+    where = data.get('where')
+    if where is not None:
+        try:
+            if type(where) is not dict or \
+                    not all(attr in searchable for attr in where):
+                raise ValueError("unknown attribute")
+            query.predicates(where)
+        except ValueError:
+            return make_response(jsonify({"error": "Invalid where"}), 400)
+
+    q = data.get('q')
+    if q is not None:
+        try:
+            limit = int(request.args.get('limit', page_limit))
+            if type(q) is not str or limit < 1:
+                raise ValueError("invalid q or limit")
+        except ValueError:
+            return make_response(jsonify({"error": "Invalid q or limit"}),
+                                 400)
+        return search_text(q, min(limit, page_limit), states, cities,
+                           amenities, where)
+
+    list_places = None
+    if states or cities or amenities:
+        list_places = storage.search_places(states, cities, amenities)
+        if where:
+            list_places = query.run(list_places, where)
+    elif where:
+        list_places = storage.query(Place, where)
+    return paginate(Place, objs=list_places)
+
+
+def search_text(q, limit, states, cities, amenities, where):
+    """ the limit places best matching the words of q, with their score,
+    among those of the filters when given """
+    if not (states or cities or amenities or where):
+        found = storage.search_text(Place, q, limit)
+    else:
+        found = storage.search_text(Place, q)
+        if states or cities or amenities:
+            ids = {place.id for place in
+                   storage.search_places(states, cities, amenities)}
+            found = [(score, place) for score, place in found
+                     if place.id in ids]
+        if where:
+            test = query.predicates(where)
+            found = [(score, place) for score, place in found
+                     if query.match(place, test)]
+    return jsonify([dict(place.to_dict(), score=round(score, 4))
+                    for score, place in found[:limit]])
+
+
+@app_views.route('/places_nearby', methods=['GET'], strict_slashes=False)
+def get_places_nearby():
+    """ list the places nearest to a position """
+    try:
+        position = geo.coordinates(float(request.args['lat']),
+                                   float(request.args['lng']))
+        radius = float(request.args.get('radius', nearby_radius))
+        limit = int(request.args.get('limit', page_limit))
+        if position is None or not 0 < radius < float("inf") or limit < 1:
+            raise ValueError("invalid position, radius or limit")
+    except (KeyError, ValueError):
+        return make_response(jsonify(
+            {"error": "Invalid lat, lng, radius or limit"}), 400)
+    found = storage.nearby(Place, position[0], position[1], radius,
+                           min(limit, page_limit))
+    return jsonify([dict(place.to_dict(), distance=round(far, 3))
+                    for far, place in found])
@@ -1,9 +1,8 @@
 #!/usr/bin/python3
 """places_amenities.py"""
-import os
 from api.v1.views import app_views
 from flask import abort, jsonify, make_response, request
-from models import storage
+from models import storage, storage_t
 from models.amenity import Amenity
 from models.place import Place
 
@@ -31,7 +30,10 @@ def delete_amenity(place_id, amenity_id):
         abort(404)
     if amenity not in place.amenities:
         abort(404)
-    place.amenities.remove(amenity)
+    if storage_t == 'db':
+        place.amenities.remove(amenity)
+    else:
+        place.amenity_ids = [i for i in place.amenity_ids if i != amenity.id]
     storage.save()
     return jsonify({})
 
@@ -48,6 +50,9 @@ def post_amenity2(place_id, amenity_id):
         abort(404)
     if amenity in place.amenities:
         return (jsonify(amenity.to_dict()), 200)
-    place.amenities.append(amenity)
+    if storage_t == 'db':
+        place.amenities.append(amenity)
+    else:
+        place.amenities = amenity
     storage.save()
-    return (jsonify(amenity.to_dict(), 201))
+    return (jsonify(amenity.to_dict()), 201)
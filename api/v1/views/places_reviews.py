@@ -3,6 +3,7 @@
 This file contains the Review module
 """
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.place import Place
@@ -17,8 +18,7 @@ def get_all_reviews(place_id):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
-    reviews = [obj.to_dict() for obj in place.reviews]
-    return jsonify(reviews)
+    return paginate(Review, "place_id", place_id)
 
 
 @app_views.route('/reviews/<string:review_id>', methods=['GET'],
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """State module"""
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.state import State
@@ -8,9 +9,8 @@ from models.state import State
 
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
 def all():
-    """ get all state objects """
-    all_list = [obj.to_dict() for obj in storage.all(State).values()]
-    return jsonify(all_list)
+    """ get a page of state objects """
+    return paginate(State)
 
 
 @app_views.route('/states/<string:state_id>', methods=['GET'],
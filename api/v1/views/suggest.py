@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+"""
+This file contains the suggest module
+"""
+from api.v1.views import app_views
+from api.v1.views.pagination import page_limit
+from flask import jsonify, request, make_response
+from models import storage
+from models.engine.suggest import fields
+
+# integer - names suggested when no limit is asked
+suggest_limit = 10
+
+
+@app_views.route('/suggest', methods=['GET'], strict_slashes=False)
+def get_suggestions():
+    """ list the states, cities, amenities and places whose name starts
+    with prefix """
+    try:
+        types = request.args.get('types')
+        if types is not None:
+            types = [name.strip() for name in types.split(",")
+                     if name.strip()]
+            if not all(name in fields for name in types):
+                raise ValueError("unknown type")
+        limit = int(request.args.get('limit', suggest_limit))
+        if limit < 1:
+            raise ValueError("limit must be positive")
+    except ValueError:
+        return make_response(jsonify({"error": "Invalid types or limit"}),
+                             400)
+    found = storage.suggest(request.args.get('prefix', ''), types,
+                            min(limit, page_limit))
+    return jsonify([{"__class__": cls, "id": id, "name": name}
+                    for cls, id, name in found])
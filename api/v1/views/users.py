@@ -3,6 +3,7 @@
 This file contains the User module
 """
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.user import User
@@ -10,9 +11,8 @@ from models.user import User
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def get_all_users():
-    """ get users by id"""
-    all_list = [obj.to_dict() for obj in storage.all(User).values()]
-    return jsonify(all_list)
+    """ get a page of users """
+    return paginate(User)
 
 
 @app_views.route('/users/<string:user_id>', methods=['GET'],
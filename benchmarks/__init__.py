@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Benchmarks for the storage engines, run from the repository root with
+python3 -m benchmarks.<module>
+"""
+
+from datetime import datetime, timedelta
+import random
+import time
+import uuid
+
+
+def dataset(places, seed=0):
+    """returns a synthetic list of State, City, User, Amenity, Place and
+    Review objects holding the given number of places: 20 places per
+    city, 50 cities per state, 10 places per user, 50 amenities, 3
+    amenities and 1 review per place"""
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.review import Review
+    from models.state import State
+    from models.user import User
+    rand = random.Random(seed)
+    start = datetime(2023, 1, 1)
+
+    def ids(n):
+        """returns n reproducible uuids"""
+        return [str(uuid.UUID(int=rand.getrandbits(128), version=4))
+                for i in range(n)]
+
+    def stamps():
+        """returns reproducible created_at and updated_at values"""
+        created = start + timedelta(microseconds=rand.randrange(10 ** 13))
+        created = created.strftime("%Y-%m-%dT%H:%M:%S.%f")
+        return {"created_at": created, "updated_at": created}
+
+    objs = []
+    cities = max(1, places // 20)
+    state_ids = ids(max(1, cities // 50))
+    city_ids = ids(cities)
+    user_ids = ids(max(1, places // 10))
+    amenity_ids = ids(50)
+    for i, id in enumerate(state_ids):
+        objs.append(State(id=id, name="State {}".format(i), **stamps()))
+    for i, id in enumerate(city_ids):
+        objs.append(City(id=id, name="City {}".format(i),
+                         state_id=rand.choice(state_ids), **stamps()))
+    for i, id in enumerate(user_ids):
+        objs.append(User(id=id, email="user{}@hbnb.io".format(i),
+                         password="pwd", first_name="User",
+                         last_name=str(i), **stamps()))
+    for i, id in enumerate(amenity_ids):
+        objs.append(Amenity(id=id, name="Amenity {}".format(i),
+                            **stamps()))
+    review_ids = ids(places)
+    for i, id in enumerate(ids(places)):
+        objs.append(Place(id=id, name="Place {}".format(i),
+                          city_id=rand.choice(city_ids),
+                          user_id=rand.choice(user_ids),
+                          description="A lovely place number {}".format(i),
+                          number_rooms=rand.randrange(1, 8),
+                          number_bathrooms=rand.randrange(1, 4),
+                          max_guest=rand.randrange(1, 12),
+                          price_by_night=rand.randrange(20, 500),
+                          latitude=rand.uniform(-60, 60),
+                          longitude=rand.uniform(-180, 180),
+                          amenity_ids=rand.sample(amenity_ids, 3),
+                          **stamps()))
+        objs.append(Review(id=review_ids[i], place_id=id,
+                           user_id=rand.choice(user_ids),
+                           text="Review of place {}".format(i), **stamps()))
+    return objs
+
+
+def timed(func, *args, **kwargs):
+    """returns the result of func(*args, **kwargs) and the seconds it
+    took"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
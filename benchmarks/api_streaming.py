@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Compares listing every place in one jsonify response with streaming them
+as a JSON array and as NDJSON: time to the first chunk, total time and
+peak memory allocated while answering, with the file storage engine.
+
+    python3 -m benchmarks.api_streaming [places]
+"""
+
+from benchmarks import dataset
+from flask import jsonify
+import models
+from models.place import Place
+import sys
+import time
+import tracemalloc
+
+
+def measure(send):
+    """returns the seconds to the first chunk, the total seconds and the
+    peak bytes allocated to answer the request made by send()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = send()
+    chunks = iter(response.response)
+    next(chunks, None)
+    first = time.perf_counter() - start
+    for chunk in chunks:
+        pass
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return first, total, peak
+
+
+def main():
+    """prints the timings and peak memory of each response mode"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for obj in dataset(places):
+        models.storage.new(obj)
+    from api.v1.app import app
+
+    @app.route('/bench/jsonify')
+    def whole():
+        """every place in one jsonify response, as before streaming"""
+        return jsonify([obj.to_dict()
+                        for obj in models.storage.all(Place).values()])
+    client = app.test_client()
+    search = '/api/v1/places_search'
+    ndjson = {"Accept": "application/x-ndjson"}
+    modes = {"jsonify": lambda: client.get('/bench/jsonify',
+                                           buffered=False),
+             "stream=1": lambda: client.post(search + '?stream=1', json={},
+                                             buffered=False),
+             "ndjson": lambda: client.post(search, json={}, headers=ndjson,
+                                           buffered=False)}
+    print("{} places".format(places))
+    print("{:<10}{:>14}{:>12}{:>14}".format("mode", "first chunk s",
+                                            "total s", "peak MiB"))
+    for name, send in modes.items():
+        first, total, peak = measure(send)
+        print("{:<10}{:>14.4f}{:>12.4f}{:>14.1f}".format(
+            name, first, total, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
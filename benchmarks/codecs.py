@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Compares the codecs and compressions FileStorage can write its file with
+on a synthetic dataset: size on disk, time to stream the records to the
+file and time to stream them back. The codecs or compressions whose
+package is not installed are listed as such. The garbage collector is
+paused while decoding, as reload() does.
+
+    python3 -m benchmarks.codecs [objects]
+"""
+
+from benchmarks import dataset, timed
+import gc
+import models
+from models.engine import codec
+from models.engine.file_storage import FileStorage
+import os
+import sys
+import tempfile
+
+
+def encode(records, path, name, compression):
+    """streams the records to the file at path"""
+    with open(path, "wb") as f:
+        codec.dump(records, f, name, compression)
+
+
+def decode(path):
+    """streams the records back from the file at path"""
+    return codec.read(path)[1]
+
+
+def main():
+    """prints the size, encode time and decode time of each codec and
+    compression"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    for obj in dataset(max(1, objects * 20 // 43)):
+        storage.new(obj)
+    storage.save()
+    records = FileStorage._FileStorage__records
+    print("{} objects".format(storage.count()))
+    print("{:<10}{:<8}{:>10}{:>12}{:>12}".format(
+        "codec", "comp", "MiB", "encode s", "decode s"))
+    for name, found in codec.codecs.items():
+        for compression, stream in codec.compressions.items():
+            if found.package is None or stream.package is None:
+                print("{:<10}{:<8}{:>10}".format(name, compression,
+                                                 "n/a"))
+                continue
+            path = "file." + codec.suffix(name, compression)
+            encoded = timed(encode, records, path, name, compression)[1]
+            gc.disable()
+            decoded = timed(decode, path)[1]
+            gc.enable()
+            print("{:<10}{:<8}{:>10.2f}{:>12.4f}{:>12.4f}".format(
+                name, compression, os.path.getsize(path) / 2 ** 20,
+                encoded, decoded))
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Times a cold FileStorage.reload() of a synthetic file.json next to the
+steps it replaced: building every object through __init__ and encoding
+every record again.
+
+    python3 -m benchmarks.file_storage_reload [objects]
+"""
+
+from benchmarks import dataset, timed
+import json
+import models
+from models.engine.file_storage import classes, FileStorage
+import os
+import sys
+import tempfile
+
+
+def main():
+    """prints the seconds taken by each step of loading the file"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    for obj in dataset(max(1, objects * 20 // 43)):
+        storage.new(obj)
+    storage.save()
+    with open("file.json", "r") as f:
+        jo = timed(json.load, f)[0]
+    steps = {
+        "json.load": lambda: json.load(open("file.json", "r")),
+        "legacy __init__": lambda: [classes[r["__class__"]](**r)
+                                    for r in jo.values()],
+        "legacy dumps": lambda: [json.dumps(r) for r in jo.values()],
+    }
+    print("{} objects, {:.1f} MiB".format(
+        len(jo), os.path.getsize("file.json") / 2 ** 20))
+    for name, step in steps.items():
+        print("{:<16}{:>10.4f} s".format(name, timed(step)[1]))
+    FileStorage._FileStorage__objects = {}
+    print("{:<16}{:>10.4f} s".format("reload", timed(storage.reload)[1]))
+
+
+if __name__ == "__main__":
+    main()
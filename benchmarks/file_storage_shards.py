@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Compares the single file of FileStorage with its shard files on a
+synthetic dataset: the save after one review changed, which rewrites
+only the shard of the review, and the cold reload() by a pool of 1, 2, 4
+and as many processes as there are cores.
+
+    python3 -m benchmarks.file_storage_shards [objects] [partitions]
+"""
+
+from benchmarks import dataset, timed
+import models
+from models.engine.file_storage import FileStorage
+from models.review import Review
+import os
+import sys
+import tempfile
+
+
+def cold_reload(storage, processes):
+    """returns the seconds of a reload() into an empty storage"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__records = {}
+    FileStorage._FileStorage__load_processes = processes
+    return timed(storage.reload)[1]
+
+
+def touch_review(storage):
+    """returns the seconds of the save() after one review changed"""
+    review = next(iter(storage.all(Review).values()))
+    review.text = review.text + "!"
+    return timed(storage.save)[1]
+
+
+def main():
+    """prints the seconds taken to save and reload in each layout"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    partitions = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    for obj in dataset(max(1, objects * 20 // 43)):
+        storage.new(obj)
+    storage.save()
+    cores = os.cpu_count() or 1
+    print("{} objects, {} partitions, {} cores".format(
+        storage.count(), partitions, cores))
+    print("{:<10}{:>10}{:>12}".format("layout", "processes", "seconds"))
+    print("{:<10}{:>10}{:>12.4f}".format("single", "save",
+                                         touch_review(storage)))
+    print("{:<10}{:>10}{:>12.4f}".format("single", 1,
+                                         cold_reload(storage, 1)))
+    FileStorage._FileStorage__shards = partitions
+    FileStorage._FileStorage__indexed = None
+    storage.save()
+    print("{:<10}{:>10}{:>12.4f}".format("sharded", "save",
+                                         touch_review(storage)))
+    for processes in sorted({1, 2, 4, cores}):
+        print("{:<10}{:>10}{:>12.4f}".format(
+            "sharded", processes, cold_reload(storage, processes)))
+
+
+if __name__ == "__main__":
+    main()
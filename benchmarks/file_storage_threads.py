@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Stress benchmark of concurrent FileStorage readers: reader threads call
+get(), all(cls), related() and iterate all() while one writer thread
+keeps adding and deleting objects; nothing is written to disk.
+
+    python3 -m benchmarks.file_storage_threads [places] [seconds]
+"""
+
+from benchmarks import dataset
+import models
+from models.city import City
+from models.place import Place
+from models.state import State
+import random
+import sys
+import threading
+import time
+
+
+def run(threads, seconds, states, cities):
+    """returns the reads done and errors hit by the given number of
+    reader threads during the given seconds"""
+    storage = models.storage
+    stop = threading.Event()
+    reads = [0] * threads
+    errors = []
+
+    def reader(n):
+        """reads until stopped"""
+        rand = random.Random(n)
+        try:
+            while not stop.is_set():
+                state = storage.get(State, rand.choice(states))
+                storage.related(City, "state_id", state.id)
+                storage.all(City)
+                storage.related(Place, "city_id", rand.choice(cities))
+                for key in storage.all():
+                    break
+                reads[n] += 5
+        except Exception as e:
+            errors.append(e)
+
+    def writer():
+        """adds and deletes states until stopped"""
+        while not stop.is_set():
+            state = State(name="writer")
+            storage.new(state)
+            storage.delete(state)
+
+    workers = [threading.Thread(target=reader, args=(n,))
+               for n in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(reads), errors
+
+
+def main():
+    """prints the read throughput for 1 to 8 reader threads"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    for obj in dataset(places):
+        models.storage.new(obj)
+    states = [s.id for s in models.storage.all(State).values()]
+    cities = [c.id for c in models.storage.all(City).values()]
+    print("{} objects, 1 writer thread".format(models.storage.count()))
+    print("{:>8} {:>14} {:>8}".format("readers", "reads/s", "errors"))
+    for threads in [1, 2, 4, 8]:
+        reads, errors = run(threads, seconds, states, cities)
+        print("{:>8} {:>14.0f} {:>8}".format(threads, reads / seconds,
+                                             len(errors)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Compares storage.nearby() on the grid of FileStorage with a scan of
+every place, on the places of a synthetic dataset spread between the
+latitudes -60 and 60: the 10 nearest places of random positions within
+a radius of 10, 100 and 1000 kilometers.
+
+    python3 -m benchmarks.places_nearby [places] [queries]
+"""
+
+from benchmarks import dataset, timed
+import heapq
+import models
+from models.engine import geo
+from models.engine.file_storage import FileStorage
+from models.place import Place
+import os
+import random
+import sys
+import tempfile
+
+
+def scan(places, lat, lng, radius, limit):
+    """returns the (distance, place) of the limit nearest places within
+    radius of (lat, lng), computing the distance to every place"""
+    found = ((geo.distance(lat, lng, place.latitude, place.longitude),
+              place) for place in places)
+    return heapq.nsmallest(limit, ((far, place) for far, place in found
+                                   if far <= radius),
+                           key=lambda item: (item[0], item[1].id))
+
+
+def main():
+    """prints the milliseconds per search on the grid and by a scan"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    found = [obj for obj in dataset(places) if type(obj) is Place]
+    built = 0.0
+    for place in found:
+        built += timed(storage.new, place)[1]
+    rand = random.Random(1)
+    positions = [(rand.uniform(-60, 60), rand.uniform(-180, 180))
+                 for i in range(queries)]
+    scans = max(1, queries // 20)
+    print("{} places, stored in {:.2f} s".format(len(found), built))
+    print("{:>10}{:>10}{:>12}{:>12}".format("radius km", "found",
+                                            "grid ms", "scan ms"))
+    for radius in [10, 100, 1000]:
+        grid = total = 0
+        for lat, lng in positions:
+            result, secs = timed(storage.nearby, Place, lat, lng, radius, 10)
+            grid += secs
+            total += len(result)
+        scanned = sum(timed(scan, found, lat, lng, radius, 10)[1]
+                      for lat, lng in positions[:scans])
+        print("{:>10}{:>10.1f}{:>12.3f}{:>12.3f}".format(
+            radius, total / queries, grid * 1000 / queries,
+            scanned * 1000 / scans))
+
+
+if __name__ == "__main__":
+    main()
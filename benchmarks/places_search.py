@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Times storage.search_places against the list based search it replaced,
+for the query shapes places_search accepts, on the configured engine;
+amenities are matched by the bitmaps of the amenity index.
+
+    python3 -m benchmarks.places_search [places]
+"""
+
+from benchmarks import dataset, timed
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+import sys
+
+
+def list_search(states, cities, amenities):
+    """the previous places_search: lists deduplicated by membership
+    tests and amenities checked one place at a time"""
+    storage = models.storage
+    list_places = []
+    for state in [storage.get(State, s_id) for s_id in states]:
+        if state:
+            for city in state.cities:
+                for place in city.places:
+                    list_places.append(place)
+    for city in [storage.get(City, c_id) for c_id in cities]:
+        if city:
+            for place in city.places:
+                if place not in list_places:
+                    list_places.append(place)
+    if amenities:
+        if not list_places:
+            list_places = storage.all(Place).values()
+        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
+        list_places = [place for place in list_places
+                       if all([am in place.amenities
+                               for am in amenities_obj])]
+    return list_places
+
+
+def main():
+    """prints the seconds taken by both searches for each query shape"""
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    storage = models.storage
+    objs = dataset(places)
+    amenities = {obj.id: obj for obj in objs if type(obj) is Amenity}
+    for obj in objs:
+        if models.storage_t == "db" and type(obj) is Place:
+            obj.amenities.extend(amenities[id] for id in obj.amenity_ids)
+        storage.new(obj)
+    if models.storage_t == "db":
+        storage.save()
+    states = [obj.id for obj in objs if type(obj) is State]
+    cities = [obj.id for obj in objs if type(obj) is City]
+    amenity_ids = list(amenities)
+    shapes = {"1 state": (states[:1], [], []),
+              "10 cities": ([], cities[:10], []),
+              "state+amenity": (states[:1], [], amenity_ids[:1]),
+              "2 amenities": ([], [], amenity_ids[:2]),
+              "3 amenities": ([], [], amenity_ids[:3])}
+    # the db engines build their amenity index on the first search
+    storage.search_places([], [], amenity_ids[:1])
+    print("{} places".format(places))
+    print("{:<16}{:>10}{:>12}{:>12}".format("query", "results", "list",
+                                            "sets"))
+    for name, shape in shapes.items():
+        found, sets = timed(storage.search_places, *shape)
+        old = timed(list_search, *shape)[1]
+        print("{:<16}{:>10}{:>12.4f}{:>12.4f}".format(name, len(found),
+                                                      old, sets))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Times dumping a synthetic dataset with the to_dict BaseModel had before
+the compiled serializers, with the compiled to_dict, and with to_json.
+
+    python3 -m benchmarks.serializers [places]
+"""
+
+from benchmarks import dataset, timed
+import json
+import sys
+
+time = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def legacy_to_dict(obj, secure_pwd=True):
+    """the previous BaseModel.to_dict"""
+    new_dict = obj.__dict__.copy()
+    if "created_at" in new_dict:
+        new_dict["created_at"] = new_dict["created_at"].strftime(time)
+    if "updated_at" in new_dict:
+        new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+    new_dict["__class__"] = obj.__class__.__name__
+    if "_sa_instance_state" in new_dict:
+        del new_dict["_sa_instance_state"]
+    if secure_pwd:
+        if 'password' in new_dict:
+            del new_dict['password']
+    return new_dict
+
+
+def main():
+    """prints the seconds taken to dump every object each way"""
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    objs = dataset(places)
+    dumps = {
+        "legacy to_dict": lambda: [legacy_to_dict(o) for o in objs],
+        "to_dict": lambda: [o.to_dict() for o in objs],
+        "legacy json": lambda: [json.dumps(legacy_to_dict(o)) for o in objs],
+        "to_json": lambda: [o.to_json() for o in objs],
+    }
+    print("{} objects".format(len(objs)))
+    for name, dump in dumps.items():
+        print("{:<16}{:>10.4f} s".format(name, timed(dump)[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Starts 1, 2, 4 and 8 worker processes over the same synthetic dataset,
+with the file storage engine and with the shared column snapshot, and
+prints the memory of each worker once it has served a few hundred gets
+and a places search: its resident set, its proportional share of the
+pages it shares, and the pages only it holds (from smaps_rollup).
+
+    python3 -m benchmarks.shared_workers [places]
+"""
+
+from benchmarks import dataset
+import models
+from models.engine.file_storage import FileStorage
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def memory():
+    """returns the Rss, Pss and private kB of this process"""
+    found = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                found[parts[0].rstrip(":")] = int(parts[1])
+    return (found["Rss"], found["Pss"],
+            found["Private_Clean"] + found["Private_Dirty"])
+
+
+def worker():
+    """serves a few reads, prints its memory and waits to be released"""
+    import models
+    from models.place import Place
+    with open("ids.txt", "r") as f:
+        ids = f.read().split()
+    for id in ids:
+        models.storage.get(Place, id)
+    models.storage.search_places(cities=[models.storage.get(
+        Place, ids[0]).city_id])
+    print(*memory(), flush=True)
+    sys.stdin.readline()
+
+
+def run(engine, workers):
+    """returns the average (Rss, Pss, private) kB of the workers"""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    env.pop("HBNB_TYPE_STORAGE", None)
+    if engine == "shared":
+        env["HBNB_TYPE_STORAGE"] = "shared"
+    command = [sys.executable, "-m", "benchmarks.shared_workers",
+               "--worker"]
+    procs = [subprocess.Popen(command, env=env, stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, text=True)
+             for i in range(workers)]
+    found = [list(map(int, proc.stdout.readline().split()))
+             for proc in procs]
+    for proc in procs:
+        proc.communicate("\n")
+    return [sum(values) / workers / 1024 for values in zip(*found)]
+
+
+def main():
+    """prints the memory per worker of each engine and worker count"""
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        return worker()
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    objs = dataset(places)
+    for obj in objs:
+        storage.new(obj)
+    storage.save()
+    with open("ids.txt", "w") as f:
+        f.write("\n".join(obj.id for obj in objs[-places * 2::2][:500]))
+    run("shared", 1)
+    print("{} objects".format(len(objs)))
+    print("{:<8}{:>8}{:>10}{:>10}{:>12}".format("engine", "workers",
+                                                "RSS MiB", "PSS MiB",
+                                                "private MiB"))
+    for engine in ["file", "shared"]:
+        for workers in [1, 2, 4, 8]:
+            rss, pss, private = run(engine, workers)
+            print("{:<8}{:>8}{:>10.1f}{:>10.1f}{:>12.1f}".format(
+                engine, workers, rss, pss, private))
+
+
+if __name__ == "__main__":
+    main()
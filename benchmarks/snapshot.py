@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Compares the JSON file with the binary snapshot of the same synthetic
+dataset: size on disk, time to decode the file and time of a cold
+FileStorage.reload() from each. The garbage collector is paused while
+decoding, as reload() does.
+
+    python3 -m benchmarks.snapshot [objects]
+"""
+
+from benchmarks import dataset, timed
+import gc
+import json
+import models
+from models.engine import snapshot
+from models.engine.file_storage import FileStorage
+import os
+import sys
+import tempfile
+
+
+def read(path):
+    """returns the content of the file at path"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def main():
+    """prints the size, decode time and reload time of each format"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    for obj in dataset(max(1, objects * 20 // 43)):
+        storage.new(obj)
+    storage.save()
+    storage.export("file.hbnb", "binary")
+    formats = {"json": ("file.json", json.loads),
+               "binary": ("file.hbnb", snapshot.decode)}
+    print("{} objects".format(storage.count()))
+    print("{:<8}{:>10}{:>12}{:>12}".format("format", "MiB", "decode s",
+                                           "reload s"))
+    for name, (path, decode) in formats.items():
+        data = read(path)
+        gc.disable()
+        decoded = timed(decode, data)[1]
+        gc.enable()
+        FileStorage._FileStorage__file_path = path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__records = {}
+        reloaded = timed(storage.reload)[1]
+        print("{:<8}{:>10.1f}{:>12.4f}{:>12.4f}".format(
+            name, len(data) / 2 ** 20, decoded, reloaded))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Compares the file, SQLite and MySQL storage engines on the same
+workload: bulk insert and save, single object saves, primary key gets,
+counts, the breakdowns of /stats and a full class scan. MySQL is only
+measured when HBNB_MYSQL_DB is set. Each engine runs in its own process
+since the models are mapped differently for the file engine.
+
+    python3 -m benchmarks.storage_engines [places]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def workload(places):
+    """runs the workload on the engine of this process and returns the
+    seconds taken by each step"""
+    from benchmarks import dataset, timed
+    import models
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    storage = models.storage
+    objs = dataset(places)
+    results = {}
+
+    def insert():
+        """adds every object then saves once"""
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+    results["insert + save"] = timed(insert)[1]
+    states = [obj for obj in objs if type(obj) is State][:100]
+
+    def single_saves():
+        """saves 100 objects one at a time"""
+        for state in states:
+            state.name = "Renamed"
+            state.save()
+    results["100 saves"] = timed(single_saves)[1]
+    ids = [obj.id for obj in objs if type(obj) is Place][:1000]
+
+    def gets():
+        """gets 1000 places by id"""
+        for id in ids:
+            storage.get(Place, id)
+    results["1000 gets"] = timed(gets)[1]
+
+    def counts():
+        """counts every class 10 times"""
+        for i in range(10):
+            for name in ["Amenity", "City", "Place", "Review", "State",
+                         "User"]:
+                storage.count(name)
+    results["60 counts"] = timed(counts)[1]
+
+    def breakdowns():
+        """tallies the cities of each state and the places of each city"""
+        storage.tally(City, "state_id")
+        storage.tally(Place, "city_id")
+        storage.column(City, "state_id")
+    results["breakdowns"] = timed(breakdowns)[1]
+    results["all(Place)"] = timed(storage.all, Place)[1]
+    return results
+
+
+def main():
+    """runs the workload once per engine and prints the timings"""
+    if len(sys.argv) > 2 and sys.argv[1] == "--workload":
+        print(json.dumps(workload(int(sys.argv[2]))))
+        return
+    places = sys.argv[1] if len(sys.argv) > 1 else "10000"
+    engines = ["file", "sqlite"]
+    if os.getenv("HBNB_MYSQL_DB"):
+        engines.append("db")
+    # the workloads run in a temporary directory so the file engine
+    # never touches ./file.json
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for engine in engines:
+            env = dict(os.environ, HBNB_TYPE_STORAGE=engine,
+                       HBNB_SQLITE_PATH=os.path.join(tmp, "hbnb.db"),
+                       PYTHONPATH=root)
+            out = subprocess.run([sys.executable, "-m",
+                                  "benchmarks.storage_engines", "--workload",
+                                  places], cwd=tmp, env=env, check=True,
+                                 stdout=subprocess.PIPE,
+                                 universal_newlines=True).stdout
+            timings[engine] = json.loads(out.splitlines()[-1])
+    print("{} places".format(places))
+    print("{:<16}".format("seconds") +
+          "".join("{:>12}".format(engine) for engine in engines))
+    for step in timings[engines[0]]:
+        print("{:<16}".format(step) +
+              "".join("{:>12.4f}".format(timings[engine][step])
+                      for engine in engines))
+
+
+if __name__ == "__main__":
+    main()
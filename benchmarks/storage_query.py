@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""
+Compares storage.query() on its secondary indexes with a scan of every
+place, on a synthetic dataset: the places of one user through the hash
+index, a price range through the sorted index and the cheapest places
+through the ordered walk of that index.
+
+    python3 -m benchmarks.storage_query [objects] [repeats]
+"""
+
+from benchmarks import dataset, timed
+import models
+from models.engine import query
+from models.engine.file_storage import FileStorage
+from models.place import Place
+import os
+import sys
+import tempfile
+
+
+def main():
+    """prints the milliseconds per query with and without the indexes"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    os.chdir(tempfile.mkdtemp())
+    storage = FileStorage()
+    for obj in dataset(max(1, objects * 20 // 43)):
+        storage.new(obj)
+    places = list(storage.all(Place).values())
+    user_id = places[0].user_id
+    cases = [("user", {"user_id": user_id}, None, None),
+             ("price range", {"price_by_night": {">=": 100, "<": 105}},
+              None, None),
+             ("cheapest 10", None, "price_by_night", 10)]
+    timed(storage.query, Place, *cases[0][1:])
+    print("{} objects, {} places".format(storage.count(), len(places)))
+    print("{:<14}{:>8}{:>10}{:>12}{:>12}".format(
+        "query", "found", "index", "indexed ms", "scan ms"))
+    for name, where, order_by, limit in cases:
+        plan = storage.explain(Place, where, order_by, limit)
+        indexed = scan = 0
+        for i in range(repeats):
+            found, secs = timed(storage.query, Place, where, order_by, limit)
+            indexed += secs
+            scan += timed(query.run, places, where, order_by, limit)[1]
+        print("{:<14}{:>8}{:>10}{:>12.3f}{:>12.3f}".format(
+            name, len(found), plan["kind"] or "scan",
+            indexed * 1000 / repeats, scan * 1000 / repeats))
+
+
+if __name__ == "__main__":
+    main()
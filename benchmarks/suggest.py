@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Compares storage.suggest() on the name index of FileStorage with a scan
+of every name, on the states, cities, amenities and places of a
+synthetic dataset: the 10 first names of random prefixes of 1 to 4
+characters, then of a prefix asked right after a place is renamed.
+
+    python3 -m benchmarks.suggest [places] [queries]
+"""
+
+from benchmarks import dataset, timed
+import heapq
+import models
+from models.engine import suggest
+from models.engine.file_storage import FileStorage
+import os
+import random
+import sys
+import tempfile
+
+
+def scan(objs, prefix, limit):
+    """returns the (class name, id, name) of the limit first objects
+    whose name starts with prefix, casefolding every name"""
+    prefix = prefix.casefold()
+    found = ((obj.name.casefold(), type(obj).__name__ + "." + obj.id, obj)
+             for obj in objs)
+    return [(type(obj).__name__, obj.id, obj.name)
+            for folded, key, obj in heapq.nsmallest(
+                limit, (item for item in found
+                        if item[0].startswith(prefix)))]
+
+
+def main():
+    """prints the milliseconds per suggestion on the index and by a
+    scan"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.chdir(tempfile.mkdtemp())
+    rand = random.Random(2)
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "an", "el"]
+    storage = FileStorage()
+    named = []
+    for obj in dataset(places):
+        if type(obj).__name__ in suggest.fields:
+            obj.name = "".join(rand.choice(syllables) for i in range(
+                rand.randint(2, 5))).capitalize()
+            named.append(obj)
+        storage.new(obj)
+    timed(storage.suggest, "")
+    scans = max(1, queries // 50)
+    print("{} names".format(len(named)))
+    print("{:>8}{:>10}{:>12}{:>12}".format(
+        "prefix", "found", "index ms", "scan ms"))
+    for size in [1, 2, 3, 4]:
+        prefixes = ["".join(rand.choice(syllables) for i in range(size))
+                    [:size] for j in range(queries)]
+        indexed = total = 0
+        for prefix in prefixes:
+            found, secs = timed(storage.suggest, prefix)
+            indexed += secs
+            total += len(found)
+        scanned = sum(timed(scan, named, prefix, 10)[1]
+                      for prefix in prefixes[:scans])
+        print("{:>8}{:>10.1f}{:>12.3f}{:>12.3f}".format(
+            size, total / queries, indexed * 1000 / queries,
+            scanned * 1000 / scans))
+    renamed = after = 0
+    for i in range(queries // 10 or 1):
+        place = rand.choice(named)
+        renamed += timed(setattr, place, "name", "Renamed")[1]
+        after += timed(storage.suggest, "ren")[1]
+    print("rename {:.3f} ms, next suggestion {:.3f} ms".format(
+        renamed * 1000 / (queries // 10 or 1),
+        after * 1000 / (queries // 10 or 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Times storage.search_text() of FileStorage on the places and reviews of
+a synthetic dataset whose texts are drawn from a Zipf vocabulary: the
+10 best places and every place for rare, mixed and common words, next
+to a scan tokenizing every text, then the first search building the
+index from the objects against one reading it back from its file.
+
+    python3 -m benchmarks.text_search [places] [queries]
+"""
+
+from benchmarks import dataset, timed
+import models
+from models.engine import text
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+import os
+import random
+import sys
+import tempfile
+
+
+def scan(objs, q):
+    """returns the objects whose text holds a word of q, tokenizing the
+    text of every object"""
+    words = set(text.tokens(q))
+    return [obj for obj in objs
+            if words.intersection(text.tokens(text.document(
+                type(obj).__name__, obj.__dict__)[1]))]
+
+
+def main():
+    """prints the milliseconds per search with and without a limit, by a
+    scan, and of the first search"""
+    if models.storage_t == "db":
+        sys.exit("run with the file storage engine")
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    os.chdir(tempfile.mkdtemp())
+    rand = random.Random(1)
+    words = ["w{}".format(i) for i in range(50000)]
+    weights = [1 / (i + 1) for i in range(len(words))]
+    storage = FileStorage()
+    found = []
+    for obj in dataset(places):
+        if type(obj) is Place:
+            obj.description = " ".join(rand.choices(words, weights, k=30))
+        elif type(obj) is Review:
+            obj.text = " ".join(rand.choices(words, weights, k=15))
+        else:
+            continue
+        storage.new(obj)
+        found.append(obj)
+    built = timed(storage.search_text, Place, "w1")[1]
+    storage.save_text_index()
+    FileStorage._FileStorage__texts = None
+    loaded = timed(storage.search_text, Place, "w1")[1]
+    print("{} documents, first search {:.2f} s building the index, "
+          "{:.2f} s reading it".format(len(found), built, loaded))
+    cases = [("rare", 20000, 50000), ("mixed", 10, 50000), ("common", 0, 10)]
+    scans = max(1, queries // 10)
+    print("{:<8}{:>10}{:>12}{:>12}{:>12}".format(
+        "words", "matches", "top 10 ms", "all ms", "scan ms"))
+    for name, low, high in cases:
+        asked = [" ".join(rand.choice(words[low:high]) for i in range(3))
+                 for j in range(queries)]
+        if name == "mixed":
+            asked = [q + " " + rand.choice(words[20000:]) for q in asked]
+        best = every = total = 0
+        for q in asked:
+            best += timed(storage.search_text, Place, q, 10)[1]
+            result, secs = timed(storage.search_text, Place, q)
+            every += secs
+            total += len(result)
+        scanned = sum(timed(scan, found, q)[1] for q in asked[:scans])
+        print("{:<8}{:>10.1f}{:>12.3f}{:>12.3f}{:>12.3f}".format(
+            name, total / queries, best * 1000 / queries,
+            every * 1000 / queries, scanned * 1000 / scans))
+
+
+if __name__ == "__main__":
+    main()
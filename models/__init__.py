@@ -11,6 +11,17 @@ storage_t = getenv("HBNB_TYPE_STORAGE")
 if storage_t == "db":
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
+elif storage_t == "sqlite":
+    # SQLite is another SQLAlchemy backend, the models map their columns
+    # exactly as they do for MySQL
+    storage_t = "db"
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+elif storage_t == "shared":
+    # the objects are file storage models, served from a column snapshot
+    # that every worker process maps instead of loading
+    from models.engine.shared_storage import SharedStorage
+    storage = SharedStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
@@ -5,13 +5,18 @@ Contains class BaseModel
 
 from datetime import datetime
 import models
+from models.serializer import serializer
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# DateTime - timestamps kept to the microsecond, as MySQL's DATETIME
+# would drop them and the (created_at, id) cursors hold them
+timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -23,8 +28,8 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(timestamp, default=datetime.utcnow, index=True)
+        updated_at = Column(timestamp, default=datetime.utcnow)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -47,6 +52,12 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and lets storage reindex the instance"""
+            super().__setattr__(name, value)
+            models.storage.changed(self, name)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -60,18 +71,11 @@ class BaseModel:
 
     def to_dict(self, secure_pwd=True):
         """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
-        new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
-        if secure_pwd:
-            if 'password' in new_dict:
-                del new_dict['password']
-        return new_dict
+        return serializer(self.__class__).to_dict(self, secure_pwd)
+
+    def to_json(self, secure_pwd=True):
+        """returns the JSON encoding of to_dict(), without building it"""
+        return serializer(self.__class__).to_json(self, secure_pwd)
 
     def delete(self):
         """delete the current instance from the storage"""
@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+"""
+Contains the class AmenityIndex
+
+The bitmaps are compressed the way roaring bitmaps are: the ordinals are
+split by their high bits into chunks of CHUNK places, and each chunk of
+an amenity is held in a container of its own, a sorted array of the low
+bits of its ordinals while it has no more than DENSE of them, a bitmap
+of CHUNK bits beyond. A rare amenity then takes two bytes a place, and
+the chunks no place of an amenity falls in take nothing.
+"""
+
+from array import array
+from bisect import bisect_left
+import threading
+
+# int - places covered by a container, whose ordinals share their high
+# bits
+CHUNK = 1 << 16
+# int - ordinals an array container holds before it becomes a bitmap
+DENSE = 4096
+
+
+class AmenityIndex:
+    """bitmap index of the places linked to each amenity: every place id
+    gets an ordinal, and every amenity a compressed bitmap whose bit n is
+    set when the place of ordinal n is linked to it; the ordinals of the
+    places dropped are given to the next places, so the bitmaps span no
+    more places than were ever indexed at once"""
+
+    def __init__(self):
+        """Instantiate an empty index"""
+        # dictionary - ordinals by place id
+        self.__ordinals = {}
+        # list - place ids by ordinal, None once the place is dropped
+        self.__places = []
+        # list - ordinals of the places dropped, free to reuse
+        self.__free = []
+        # dictionary - {chunk: container} bitmaps of place ordinals by
+        # amenity id, a container being an array('H') or a bytearray
+        self.__bitmaps = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __set(bitmap, ordinal):
+        """sets the bit of ordinal in the {chunk: container} bitmap"""
+        chunk, low = divmod(ordinal, CHUNK)
+        found = bitmap.get(chunk)
+        if found is None:
+            bitmap[chunk] = array("H", [low])
+        elif type(found) is bytearray:
+            found[low >> 3] |= 1 << (low & 7)
+        else:
+            i = bisect_left(found, low)
+            if i == len(found) or found[i] != low:
+                found.insert(i, low)
+                if len(found) > DENSE:
+                    dense = bytearray(CHUNK >> 3)
+                    for item in found:
+                        dense[item >> 3] |= 1 << (item & 7)
+                    bitmap[chunk] = dense
+
+    @staticmethod
+    def __clear(bitmap, ordinal):
+        """clears the bit of ordinal in the {chunk: container} bitmap"""
+        chunk, low = divmod(ordinal, CHUNK)
+        found = bitmap.get(chunk)
+        if found is None:
+            return
+        if type(found) is bytearray:
+            found[low >> 3] &= ~(1 << (low & 7)) & 0xff
+            bits = int.from_bytes(found, "little")
+            if bin(bits).count("1") <= DENSE // 2:
+                found = bitmap[chunk] = array("H", AmenityIndex.__lows(bits))
+        else:
+            i = bisect_left(found, low)
+            if i < len(found) and found[i] == low:
+                del found[i]
+        if not found:
+            del bitmap[chunk]
+
+    @staticmethod
+    def __lows(bits):
+        """returns the positions of the bits set in bits, in order"""
+        data = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+        return [(i << 3) + bit for i, byte in enumerate(data)
+                if byte for bit in range(8) if byte >> bit & 1]
+
+    @staticmethod
+    def __size(bitmap):
+        """returns the number of bits set in the {chunk: container}
+        bitmap"""
+        return sum(len(found) if type(found) is array else
+                   bin(int.from_bytes(found, "little")).count("1")
+                   for found in bitmap.values())
+
+    @staticmethod
+    def __and(containers):
+        """returns the low bits set in every container, in order: the
+        arrays are intersected from the smallest, and the bitmaps ANDed
+        when there is no array"""
+        arrays = [found for found in containers if type(found) is array]
+        if not arrays:
+            bits = -1
+            for found in containers:
+                bits &= int.from_bytes(found, "little")
+            return AmenityIndex.__lows(bits) if bits > 0 else []
+        lows = min(arrays, key=len)
+        for found in containers:
+            if found is lows:
+                continue
+            if type(found) is array:
+                found = set(found)
+                lows = [low for low in lows if low in found]
+            else:
+                lows = [low for low in lows
+                        if found[low >> 3] >> (low & 7) & 1]
+            if not lows:
+                break
+        return lows
+
+    def link(self, place_id, *amenity_ids):
+        """sets the bit of place_id in the bitmap of each amenity id"""
+        with self.__lock:
+            ordinal = self.__ordinals.get(place_id)
+            if ordinal is None:
+                if self.__free:
+                    ordinal = self.__free.pop()
+                    self.__places[ordinal] = place_id
+                else:
+                    ordinal = len(self.__places)
+                    self.__places.append(place_id)
+                self.__ordinals[place_id] = ordinal
+            for amenity_id in amenity_ids:
+                self.__set(self.__bitmaps.setdefault(amenity_id, {}),
+                           ordinal)
+
+    def unlink(self, place_id, amenity_id):
+        """clears the bit of place_id in the bitmap of amenity_id"""
+        with self.__lock:
+            ordinal = self.__ordinals.get(place_id)
+            bitmap = self.__bitmaps.get(amenity_id)
+            if ordinal is not None and bitmap is not None:
+                self.__clear(bitmap, ordinal)
+
+    def drop_place(self, place_id):
+        """clears place_id from every bitmap and forgets its ordinal"""
+        with self.__lock:
+            ordinal = self.__ordinals.pop(place_id, None)
+            if ordinal is None:
+                return
+            self.__places[ordinal] = None
+            for bitmap in self.__bitmaps.values():
+                self.__clear(bitmap, ordinal)
+            self.__free.append(ordinal)
+
+    def drop_amenity(self, amenity_id):
+        """forgets the bitmap of amenity_id"""
+        with self.__lock:
+            self.__bitmaps.pop(amenity_id, None)
+
+    def __bits(self, amenity_ids, place_ids):
+        """returns the ordinals set in the bitmaps of amenity_ids and
+        among those of place_ids unless it is None, in order, ANDing the
+        containers of the chunks every bitmap holds, starting from the
+        bitmap with the fewest bits set; the caller holds the lock, as an
+        ordinal may be given to another place once dropped"""
+        bitmaps = [self.__bitmaps.get(id) for id in set(amenity_ids)]
+        if not all(bitmaps):
+            return []
+        if place_ids is not None:
+            bitmap = {}
+            for id in place_ids:
+                ordinal = self.__ordinals.get(id)
+                if ordinal is not None:
+                    self.__set(bitmap, ordinal)
+            bitmaps.append(bitmap)
+        bitmaps.sort(key=self.__size)
+        ordinals = []
+        for chunk in sorted(bitmaps[0]):
+            containers = [bitmap.get(chunk) for bitmap in bitmaps]
+            if all(found is not None for found in containers):
+                ordinals.extend(chunk * CHUNK + low
+                                for low in self.__and(containers))
+        return ordinals
+
+    def places(self, amenity_ids, place_ids=None):
+        """returns the ids of the places linked to every amenity of
+        amenity_ids, among place_ids unless it is None"""
+        with self.__lock:
+            places = self.__places
+            return [places[ordinal] for ordinal in
+                    self.__bits(amenity_ids, place_ids)]
+
+    def count(self, amenity_ids, place_ids=None):
+        """returns the number of places linked to every amenity of
+        amenity_ids, among place_ids unless it is None"""
+        with self.__lock:
+            return len(self.__bits(amenity_ids, place_ids))
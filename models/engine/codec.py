@@ -0,0 +1,473 @@
+#!/usr/bin/python3
+"""
+Contains the codecs FileStorage writes its file with and the stream
+compressions around them. Every codec and compression starts its output
+with bytes of its own, or is JSON, so read() takes any file whatever the
+configuration that wrote it. Records are written and read in chunks of
+chunk_size bytes: the file never sits in memory as a whole.
+
+codecs:
+    json     the JSON object of the records, one record per line
+    orjson   the same JSON, encoded and decoded by orjson if installed
+    msgpack  MessagePack [key, record] pairs, if msgpack is installed
+    binary   the marshal snapshot of models/engine/snapshot.py
+compressions:
+    none, zlib (deflate in a gzip stream), lzma (xz) and zstd (if
+    zstandard is installed)
+"""
+
+from codecs import getincrementaldecoder
+import gzip
+import hashlib
+import io
+import json
+import lzma
+from models.engine import snapshot
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# integer - bytes written or read at a time
+chunk_size = 1 << 16
+
+
+class Hashed(io.RawIOBase):
+    """raw stream computing the sha1 digest of the bytes read from or
+    written to the raw file it wraps, which closing it leaves open"""
+
+    def __init__(self, raw):
+        """Wraps the raw file raw"""
+        self.raw = raw
+        self.sha1 = hashlib.sha1()
+
+    def readable(self):
+        """tells if the wrapped file is readable"""
+        return self.raw.readable()
+
+    def writable(self):
+        """tells if the wrapped file is writable"""
+        return self.raw.writable()
+
+    def readinto(self, b):
+        """reads into b and hashes the bytes read"""
+        n = self.raw.readinto(b)
+        if n:
+            self.sha1.update(memoryview(b)[:n])
+        return n
+
+    def write(self, b):
+        """writes and hashes b"""
+        n = self.raw.write(b)
+        self.sha1.update(memoryview(b)[:n])
+        return n
+
+    def hexdigest(self):
+        """returns the sha1 digest of the bytes so far"""
+        return self.sha1.hexdigest()
+
+
+class Batch:
+    """collects small writes into chunks of chunk_size bytes"""
+
+    def __init__(self, f):
+        """Writes to the binary file f"""
+        self.f = f
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        """adds data, writing the chunk once it is full"""
+        self.parts.append(data)
+        self.size += len(data)
+        if self.size >= chunk_size:
+            self.flush()
+
+    def flush(self):
+        """writes what was added so far"""
+        self.f.write(b"".join(self.parts))
+        self.parts = []
+        self.size = 0
+
+
+class Codec:
+    """the encoding of the records in a file"""
+    # string - name of the codec in HBNB_FILE_CODEC
+    name = None
+    # string - extension of the file written
+    suffix = None
+    # bytes - the first bytes of a file in this codec
+    magic = None
+    # module - the optional package the codec needs, True if none
+    package = True
+
+    def check(self):
+        """raises ValueError unless the package of the codec is
+        installed"""
+        if self.package is None:
+            raise ValueError("the {} codec is not installed".format(
+                self.name))
+
+    def record(self, obj):
+        """returns the record of obj kept in FileStorage.__records"""
+        return obj.to_dict(secure_pwd=False)
+
+    def dump(self, records, f):
+        """writes records, a dictionary of records by key in any form
+        FileStorage keeps them, to the binary file f"""
+        raise NotImplementedError
+
+    def load(self, f):
+        """yields the (key, record) pairs read from the buffered binary
+        file f"""
+        raise NotImplementedError
+
+
+class JSON(Codec):
+    """the JSON object of the records by key, one record per line"""
+    name = "json"
+    suffix = "json"
+
+    def encode(self, value):
+        """returns the JSON encoding of value as bytes"""
+        return json.dumps(value).encode()
+
+    def loads(self, data):
+        """returns the value of the JSON data"""
+        return json.loads(data)
+
+    def record(self, obj):
+        """returns the JSON encoding of obj"""
+        return obj.to_json(secure_pwd=False)
+
+    def dump(self, records, f):
+        """writes the JSON object of records, one per line"""
+        batch = Batch(f)
+        batch.write(b"{")
+        separator = b"\n"
+        for key, record in records.items():
+            if type(record) is str:
+                record = record.encode()
+            else:
+                record = self.encode(snapshot.record(record))
+            batch.write(separator + self.encode(key) + b": " + record)
+            separator = b",\n"
+        batch.write(b"\n}\n")
+        batch.flush()
+
+    def load(self, f):
+        """yields the records of the JSON object read from f: the whole
+        lines of records in each chunk are decoded at once as an object,
+        and from the first chunk where that fails, as for JSON not
+        written one record per line, scan() decodes the rest"""
+        text = f.read(chunk_size).lstrip()
+        if not text.startswith(b"{"):
+            raise ValueError("not a JSON object")
+        text = text[1:]
+        if text.lstrip(b" \t\r").startswith(b"\n"):
+            data = text
+            while data:
+                cut = text.rfind(b"\n") + 1
+                if cut:
+                    lines = text[:cut].rstrip()
+                    if lines.endswith(b","):
+                        lines = lines[:-1]
+                    try:
+                        found = self.loads(b"{" + lines + b"}")
+                    except ValueError:
+                        break
+                    text = text[cut:]
+                    for pair in found.items():
+                        yield pair
+                data = f.read(chunk_size)
+                text += data
+        for pair in scan(f, text):
+            yield pair
+
+
+class ORJSON(JSON):
+    """the JSON codec encoded and decoded by orjson"""
+    name = "orjson"
+    package = orjson
+
+    def encode(self, value):
+        """returns the JSON encoding of value"""
+        return orjson.dumps(value)
+
+    def loads(self, data):
+        """returns the value of the JSON data"""
+        return orjson.loads(data)
+
+
+class MessagePack(Codec):
+    """a magic number, then the MessagePack [key, record] pair of each
+    record"""
+    name = "msgpack"
+    suffix = "msgpack"
+    magic = b"HBMP\x01"
+    package = msgpack
+
+    def dump(self, records, f):
+        """writes the [key, record] pairs of records"""
+        batch = Batch(f)
+        batch.write(self.magic)
+        packer = msgpack.Packer()
+        for key, record in records.items():
+            batch.write(packer.pack([key, snapshot.record(record)]))
+        batch.flush()
+
+    def load(self, f):
+        """yields the [key, record] pairs read from f"""
+        if f.read(len(self.magic)) != self.magic:
+            raise ValueError("not a MessagePack file")
+        for key, record in msgpack.Unpacker(f, raw=False,
+                                            read_size=chunk_size):
+            yield key, record
+
+
+class Binary(Codec):
+    """the binary snapshot of models/engine/snapshot.py"""
+    name = "binary"
+    suffix = "hbnb"
+    magic = snapshot.magic
+
+    def record(self, obj):
+        """returns the snapshot row of obj"""
+        return snapshot.row(obj.to_dict(secure_pwd=False))
+
+    def dump(self, records, f):
+        """writes the snapshot of records"""
+        snapshot.dump(records, f)
+
+    def load(self, f):
+        """yields the rows of the snapshot read from f"""
+        return snapshot.load(f)
+
+
+class Compression:
+    """no compression; the base of the stream compressions"""
+    # string - name of the compression in HBNB_FILE_COMPRESSION
+    name = "none"
+    # string - added to the extension of the file written
+    suffix = ""
+    # bytes - the first bytes of a file in this compression
+    magic = None
+    # module - the optional package the compression needs, True if none
+    package = True
+
+    def check(self):
+        """raises ValueError unless the package of the compression is
+        installed"""
+        if self.package is None:
+            raise ValueError("the {} compression is not installed".format(
+                self.name))
+
+    def writer(self, f):
+        """returns the stream compressing to the binary file f"""
+        return f
+
+    def reader(self, f):
+        """returns the stream decompressing the binary file f"""
+        return f
+
+
+class Zlib(Compression):
+    """deflate in a gzip stream"""
+    name = "zlib"
+    suffix = ".gz"
+    magic = b"\x1f\x8b"
+
+    def writer(self, f):
+        """returns the gzip stream writing to f"""
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6,
+                             mtime=0)
+
+    def reader(self, f):
+        """returns the gzip stream reading f"""
+        return gzip.GzipFile(fileobj=f, mode="rb")
+
+
+class LZMA(Compression):
+    """xz compression"""
+    name = "lzma"
+    suffix = ".xz"
+    magic = b"\xfd7zXZ\x00"
+
+    def writer(self, f):
+        """returns the xz stream writing to f"""
+        return lzma.LZMAFile(f, "wb", preset=1)
+
+    def reader(self, f):
+        """returns the xz stream reading f"""
+        return lzma.LZMAFile(f, "rb")
+
+
+class Zstd(Compression):
+    """zstandard compression"""
+    name = "zstd"
+    suffix = ".zst"
+    magic = b"\x28\xb5\x2f\xfd"
+    package = zstandard
+
+    def writer(self, f):
+        """returns the zstandard stream writing to f"""
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+
+    def reader(self, f):
+        """returns the zstandard stream reading f"""
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+
+
+# dictionary - the codecs by name
+codecs = {codec.name: codec for codec in [JSON(), ORJSON(), MessagePack(),
+                                          Binary()]}
+# dictionary - the compressions by name
+compressions = {compression.name: compression for compression in [
+    Compression(), Zlib(), LZMA(), Zstd()]}
+
+
+def get(codec="json", compression="none"):
+    """returns the codec and compression of the given names, raising
+    ValueError if one is unknown or not installed"""
+    if codec not in codecs:
+        raise ValueError("unknown codec {}".format(codec))
+    if compression not in compressions:
+        raise ValueError("unknown compression {}".format(compression))
+    codecs[codec].check()
+    compressions[compression].check()
+    return codecs[codec], compressions[compression]
+
+
+def suffix(codec="json", compression="none"):
+    """returns the extension of a file in the given codec and
+    compression"""
+    return codecs[codec].suffix + compressions[compression].suffix
+
+
+def scan(f, text=b""):
+    """yields the "key": value pairs of the JSON object read from the
+    binary file f, text being what was read of it past its opening
+    brace, however the JSON is laid out"""
+    decoder = json.JSONDecoder()
+    utf8 = getincrementaldecoder("utf-8")()
+    buffer = utf8.decode(text)
+    position = 0
+    end = False
+
+    def more():
+        """appends the next chunk of f to the buffer, returning False at
+        the end of f"""
+        nonlocal buffer, position, end
+        data = f.read(chunk_size)
+        if not data:
+            end = True
+            return False
+        buffer = buffer[position:] + utf8.decode(data)
+        position = 0
+        return True
+
+    def skip():
+        """skips the whitespace, returning the next character or None at
+        the end of f"""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not more():
+                return None
+
+    def value():
+        """decodes the JSON value at the position"""
+        nonlocal position
+        while True:
+            try:
+                found, stop = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if end or not more():
+                    raise
+                continue
+            if stop < len(buffer) or end or not more():
+                position = stop
+                return found
+
+    while True:
+        char = skip()
+        if char is None:
+            raise ValueError("truncated JSON object")
+        if char == "}":
+            return
+        if char == ",":
+            position += 1
+            continue
+        key = value()
+        if skip() != ":":
+            raise ValueError("expected ':' after {}".format(key))
+        position += 1
+        skip()
+        yield key, value()
+
+
+def dump(records, f, codec="json", compression="none"):
+    """writes records, by key and in any form FileStorage keeps them, to
+    the binary file f in the given codec and compression"""
+    codec, compression = get(codec, compression)
+    stream = compression.writer(f)
+    codec.dump(records, stream)
+    if stream is not f:
+        stream.close()
+
+
+def load(f, json_codec="json"):
+    """yields the (key, record) pairs read from the buffered binary file
+    f, whatever its compression and codec, raising ValueError if it is
+    truncated or invalid; JSON is decoded by the codec json_codec"""
+    try:
+        head = f.peek(8)
+        for compression in compressions.values():
+            if compression.magic and head.startswith(compression.magic):
+                compression.check()
+                f = io.BufferedReader(compression.reader(f), chunk_size)
+                head = f.peek(8)
+                break
+        found = codecs[json_codec]
+        if not isinstance(found, JSON) or found.package is None:
+            found = codecs["json"]
+        for codec in codecs.values():
+            if codec.magic and head.startswith(codec.magic):
+                codec.check()
+                found = codec
+        for pair in found.load(f):
+            yield pair
+    except EOFError:
+        raise ValueError("truncated file")
+
+
+def read(path, json_codec="json"):
+    """returns the sha1 digest of the file at path and its records by
+    key"""
+    with open(path, "rb", buffering=0) as raw:
+        hashed = Hashed(raw)
+        f = io.BufferedReader(hashed, chunk_size)
+        records = dict(load(f, json_codec))
+        while f.read(chunk_size):
+            pass
+        return hashed.hexdigest(), records
+
+
+def digest(path):
+    """returns the sha1 digest of the file at path"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(chunk_size), b""):
+            sha1.update(data)
+    return sha1.hexdigest()
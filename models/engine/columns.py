@@ -0,0 +1,303 @@
+#!/usr/bin/python3
+"""
+Contains the column snapshot format of SharedStorage and the Columns
+class reading it through a read-only memory map.
+
+The file holds a header, then aligned sections, then a JSON table of
+contents locating the sections. Each class has its rows sorted by id and
+one column per attribute: a mask byte per row (missing, null or set),
+then int64 or float64 values, or the offsets and UTF-8 bytes of strings
+or of the JSON text of any other value. The rows ordered by created_at
+and id, and (value, row) postings of the foreign key attributes, make
+get(), paging and related() binary searches over the mapped bytes.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import json
+import mmap
+import os
+import struct
+
+# bytes - the first bytes of every column snapshot
+magic = b"HBCS"
+# integer - version of the layout
+version = 1
+# Struct - magic, version, then offset and length of the table of contents
+header = struct.Struct("<4sB3xQQ")
+# integers - mask byte of a missing, null or set value
+MISSING, NULL, SET = 0, 1, 2
+
+
+def kind(values):
+    """returns how a column holding values is stored: "str", "int",
+    "float", or "json" for anything else"""
+    kinds = {type(value) for value in values if value is not None}
+    if kinds == {int} and all(-2 ** 63 <= value < 2 ** 63
+                              for value in values if value is not None):
+        return "int"
+    if len(kinds) == 1 and kinds < {str, float}:
+        return kinds.pop().__name__
+    return "json"
+
+
+class Writer:
+    """writes the aligned sections of a column snapshot to a file"""
+
+    def __init__(self, f):
+        """Starts a snapshot in the file object f"""
+        self.f = f
+        f.write(bytes(header.size))
+
+    def section(self, data):
+        """writes data at the next 8 byte boundary and returns its
+        [offset, length]"""
+        offset = self.f.tell()
+        if offset % 8:
+            self.f.write(bytes(8 - offset % 8))
+            offset = self.f.tell()
+        self.f.write(data)
+        return [offset, len(data)]
+
+    def strings(self, values):
+        """writes the offsets and UTF-8 bytes of the strings values"""
+        blobs = [value.encode() for value in values]
+        offsets = array("q", [0])
+        total = 0
+        for blob in blobs:
+            total += len(blob)
+            offsets.append(total)
+        return {"offsets": self.section(offsets.tobytes()),
+                "data": self.section(b"".join(blobs))}
+
+    def column(self, values, present):
+        """writes the column of values, where present tells which rows
+        hold their attribute"""
+        found = kind([value for value, set_ in zip(values, present)
+                      if set_])
+        mask = bytes(MISSING if not set_ else NULL if value is None else SET
+                     for value, set_ in zip(values, present))
+        stored = [value if set_ and value is not None else None
+                  for value, set_ in zip(values, present)]
+        location = {"kind": found, "mask": self.section(mask)}
+        if found == "int":
+            location["data"] = self.section(array(
+                "q", [value or 0 for value in stored]).tobytes())
+        elif found == "float":
+            location["data"] = self.section(array(
+                "d", [value or 0.0 for value in stored]).tobytes())
+        elif found == "str":
+            location.update(self.strings([value or "" for value in stored]))
+        else:
+            location.update(self.strings(["" if value is None else
+                                          json.dumps(value)
+                                          for value in stored]))
+        return location
+
+    def table(self, records, relations):
+        """writes the columns, order and postings of the records of one
+        class, given as dictionaries sorted by id"""
+        fields = {}
+        for record in records:
+            for field in record:
+                fields.setdefault(field, None)
+        fields.pop("__class__", None)
+        columns = {}
+        for field in fields:
+            values = [record.get(field) for record in records]
+            present = [field in record for record in records]
+            columns[field] = self.column(values, present)
+        order = sorted(range(len(records)), key=lambda row: (
+            records[row].get("created_at") or "", records[row]["id"]))
+        postings = {}
+        for attr in relations:
+            pairs = []
+            for row, record in enumerate(records):
+                value = record.get(attr)
+                for item in value if type(value) is list else [value]:
+                    if type(item) is str:
+                        pairs.append((item, row))
+            pairs.sort()
+            postings[attr] = {
+                "keys": self.strings([item for item, row in pairs]),
+                "rows": self.section(array(
+                    "q", [row for item, row in pairs]).tobytes())}
+        return {"rows": len(records), "columns": columns,
+                "order": self.section(array("q", order).tobytes()),
+                "postings": postings}
+
+    def finish(self, toc):
+        """writes the table of contents and the header"""
+        location = self.section(json.dumps(toc).encode())
+        self.f.seek(0)
+        self.f.write(header.pack(magic, version, *location))
+
+
+def write(path, records, relations):
+    """atomically replaces the column snapshot at path with the records,
+    dictionaries holding their __class__, indexing the foreign key
+    attributes listed by class name in relations"""
+    tables = {}
+    for record in records:
+        tables.setdefault(record["__class__"], []).append(record)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        writer = Writer(f)
+        toc = {}
+        for name, found in tables.items():
+            found.sort(key=lambda record: record["id"])
+            toc[name] = writer.table(found, relations.get(name, ()))
+        writer.finish(toc)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Strings:
+    """sequence of the strings of a section, decoded on access"""
+
+    def __init__(self, view, location):
+        """Maps the strings located in view"""
+        start, length = location["offsets"]
+        self.offsets = view[start:start + length].cast("q")
+        start, length = location["data"]
+        self.data = view[start:start + length]
+
+    def __len__(self):
+        """returns the number of strings"""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """returns the string i"""
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class Column:
+    """values of one attribute, decoded on access"""
+
+    def __init__(self, view, location):
+        """Maps the column located in view"""
+        self.kind = location["kind"]
+        start, length = location["mask"]
+        self.mask = view[start:start + length]
+        if self.kind == "int" or self.kind == "float":
+            start, length = location["data"]
+            self.values = view[start:start + length].cast(
+                "q" if self.kind == "int" else "d")
+        else:
+            self.values = Strings(view, location)
+
+    def get(self, row):
+        """returns (True, value) when the row has the attribute, value
+        being None when it is null, else (False, None)"""
+        mask = self.mask[row]
+        if mask == SET:
+            value = self.values[row]
+            if self.kind == "json":
+                value = json.loads(value)
+            return True, value
+        return mask == NULL, None
+
+
+class Table:
+    """the mapped rows of one class"""
+
+    def __init__(self, name, view, toc):
+        """Maps the table of class name located by toc in view"""
+        self.name = name
+        self.rows = toc["rows"]
+        self.columns = {field: Column(view, location)
+                        for field, location in toc["columns"].items()}
+        self.ids = self.columns["id"].values
+        start, length = toc["order"]
+        self.order = view[start:start + length].cast("q")
+        self.postings = {attr: (Strings(view, location["keys"]),
+                                view[location["rows"][0]:sum(
+                                    location["rows"])].cast("q"))
+                         for attr, location in toc["postings"].items()}
+
+    def find(self, id):
+        """returns the row of id, or None"""
+        row = bisect_left(self.ids, id)
+        if row < self.rows and self.ids[row] == id:
+            return row
+        return None
+
+    def record(self, row):
+        """returns the attributes stored for row"""
+        attrs = {}
+        for field, column in self.columns.items():
+            found, value = column.get(row)
+            if found:
+                attrs[field] = value
+        return attrs
+
+    def value(self, row, field, default=None):
+        """returns the value of field stored for row, None when it is
+        null, or default when the row does not hold it"""
+        column = self.columns.get(field)
+        if column is None:
+            return default
+        found, value = column.get(row)
+        return value if found else default
+
+    def related(self, attr, id):
+        """returns the rows whose attr refers to id, or None when attr is
+        not indexed"""
+        if attr not in self.postings:
+            return None
+        keys, rows = self.postings[attr]
+        return rows[bisect_left(keys, id):bisect_right(keys, id)].tolist()
+
+    def ordered(self, after=None):
+        """returns the rows ordered by created_at and id, following the
+        (created_at, id) cursor after unless it is None; created_at is
+        compared in its stored ISO format"""
+        start = 0
+        if after is not None:
+            start = bisect_right(Keys(self), after)
+        return self.order[start:]
+
+
+class Keys:
+    """sequence of the (created_at, id) of the rows of a table, in
+    order"""
+
+    def __init__(self, table):
+        """Reads the keys of table"""
+        self.table = table
+        self.created = table.columns.get("created_at")
+
+    def __len__(self):
+        """returns the number of rows"""
+        return self.table.rows
+
+    def __getitem__(self, i):
+        """returns the key of the row i in order"""
+        row = self.table.order[i]
+        created = self.created.get(row)[1] if self.created else None
+        return (created or "", self.table.ids[row])
+
+
+class Columns:
+    """the tables of a column snapshot, read through a memory map shared
+    with every process mapping the same file"""
+
+    def __init__(self, path):
+        """Maps the column snapshot at path"""
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        found, number, start, length = header.unpack_from(view)
+        if found != magic:
+            raise ValueError("not a column snapshot")
+        if number != version:
+            raise ValueError("unsupported column snapshot version {}".format(
+                number))
+        toc = json.loads(str(view[start:start + length], "utf-8"))
+        self.tables = {name: Table(name, view, found)
+                       for name, found in toc.items()}
+
+    def table(self, name):
+        """returns the table of class name, or None"""
+        return self.tables.get(name)
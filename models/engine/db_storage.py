@@ -3,18 +3,29 @@
 Contains the class DBStorage
 """
 
+import atexit
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.amenity_index import AmenityIndex
+from models.engine import geo, suggest, text
+from models.engine import query as predicates
+from models.engine.suggest import NameIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, literal, or_
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import ColumnProperty, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
+import heapq
+import re
+import threading
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -24,28 +35,97 @@ class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # AmenityIndex - bitmaps of the places linked to each amenity, built
+    # from place_amenity on first use and changed by the commits of this
+    # process
+    __amenities = None
+    # float - monotonic time the amenity index was built at
+    __amenities_at = 0.0
+    # float - seconds before the amenity index is rebuilt, to pick up the
+    # links changed by other processes
+    __amenities_ttl = float(getenv('HBNB_AMENITY_INDEX_TTL', 60))
+    # TextIndex - the documents of the classes of text.fields, read back
+    # from __text_path and synced with the database on first use
+    __texts = None
+    # float - monotonic time the text index was synced at
+    __texts_at = 0.0
+    # float - seconds before the text index is synced again, to pick up
+    # the texts changed by other processes
+    __texts_ttl = float(getenv('HBNB_TEXT_INDEX_TTL', 300))
+    # string - path to the file the text index is saved to
+    __text_path = getenv('HBNB_TEXT_INDEX', 'hbnb.text')
+    # NameIndex - the names of the objects of the classes of
+    # suggest.fields, synced with the database on first use
+    __names = None
+    # float - monotonic time the name index was synced at
+    __names_at = 0.0
+    # float - seconds before the name index is synced again, to pick up
+    # the names changed by other processes
+    __names_ttl = float(getenv('HBNB_SUGGEST_INDEX_TTL', 60))
+    # dictionary - committed rows of each class, shifted by the commits of
+    # this process and counted again by the database when older than
+    # HBNB_COUNT_TTL seconds, to pick up the rows of other processes
+    __counts = None
+    # float - monotonic time the rows were counted at
+    __counts_at = 0.0
+    # float - seconds before the rows are counted again
+    __counts_ttl = float(getenv('HBNB_COUNT_TTL', 60))
+    # dictionary - committed {parent id: rows} of each (class name,
+    # attribute) tallied, kept like __counts
+    __tallies = {}
+    # dictionary - monotonic time each tally was counted at
+    __tallies_at = {}
+    # lock - serializes the counts and the commits shifting them
+    __counts_lock = threading.Lock()
 
-    def __init__(self):
-        """Instantiate a DBStorage object"""
+    def __init__(self, engine=None):
+        """Instantiate a DBStorage object, on the MySQL database unless
+        another SQLAlchemy engine is given"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        if engine is None:
+            engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
+                                   format(HBNB_MYSQL_USER,
+                                          HBNB_MYSQL_PWD,
+                                          HBNB_MYSQL_HOST,
+                                          HBNB_MYSQL_DB))
+        self.__engine = engine
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    @staticmethod
+    def __options(cls, load):
+        """returns the loader options that eagerly load each dotted
+        relationship path of load, like "cities.places", from cls in one
+        batched SELECT ... IN query per relationship"""
+        options = []
+        for path in load or ():
+            option = None
+            current = cls
+            for name in path.split("."):
+                attr = getattr(current, name)
+                if option is None:
+                    option = selectinload(attr)
+                else:
+                    option = option.selectinload(attr)
+                current = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def all(self, cls=None, load=None):
+        """query on the current database session, eagerly loading the
+        relationship paths listed in load when cls is given"""
         new_dict = {}
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+            if cls is None or cls is classes[clss] or cls == clss:
+                query = self.__session.query(classes[clss])
+                if cls is not None:
+                    query = query.options(*self.__options(classes[clss],
+                                                          load))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -70,23 +150,499 @@ class DBStorage:
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        event.listen(sess_factory, "after_flush", self.__flushed)
+        event.listen(sess_factory, "after_commit", self.__committed)
+        event.listen(sess_factory, "after_rollback", self.__rolled_back)
+        if not event.contains(Place, "after_delete", self.__erased):
+            for name in text.fields:
+                for found in ["after_insert", "after_update"]:
+                    event.listen(classes[name], found, self.__written)
+                event.listen(classes[name], "after_delete", self.__erased)
+            for name in suggest.fields:
+                for found in ["after_insert", "after_update"]:
+                    event.listen(classes[name], found, self.__named)
+                event.listen(classes[name], "after_delete", self.__unnamed)
+
+    @staticmethod
+    def __links(session):
+        """records in the session the place_amenity rows its flush added
+        or removed, and the places and amenities it deleted, applied to
+        the amenity index once committed"""
+        links = session.info.setdefault("amenities", [])
+        for obj in list(session.new) + list(session.dirty):
+            if type(obj) is Place:
+                history = sqlalchemy.inspect(obj).attrs.amenities.history
+                pairs = [(obj, amenity) for amenity in history.added], \
+                    [(obj, amenity) for amenity in history.deleted]
+            elif type(obj) is Amenity:
+                history = sqlalchemy.inspect(obj).attrs.place_amenities.history
+                pairs = [(place, obj) for place in history.added], \
+                    [(place, obj) for place in history.deleted]
+            else:
+                continue
+            links.extend(("link", place.id, amenity.id)
+                         for place, amenity in pairs[0])
+            links.extend(("unlink", place.id, amenity.id)
+                         for place, amenity in pairs[1])
+        for obj in session.deleted:
+            if type(obj) is Place:
+                links.append(("drop_place", obj.id))
+            elif type(obj) is Amenity:
+                links.append(("drop_amenity", obj.id))
+        if not links:
+            del session.info["amenities"]
+
+    @staticmethod
+    def __written(mapper, connection, obj):
+        """indexes the text of an inserted or updated object"""
+        if DBStorage.__texts is not None:
+            DBStorage.__texts.add(*text.document(obj.__class__.__name__,
+                                                 obj.__dict__))
+
+    @staticmethod
+    def __erased(mapper, connection, obj):
+        """drops a deleted object from the text index"""
+        if DBStorage.__texts is not None:
+            DBStorage.__texts.discard(obj.__class__.__name__ + "." + obj.id)
+
+    @staticmethod
+    def __named(mapper, connection, obj):
+        """indexes the name of an inserted or updated object"""
+        if DBStorage.__names is not None:
+            name = obj.__class__.__name__
+            DBStorage.__names.add(name + "." + obj.id,
+                                  getattr(obj, suggest.fields[name], None))
+
+    @staticmethod
+    def __unnamed(mapper, connection, obj):
+        """drops a deleted object from the name index"""
+        if DBStorage.__names is not None:
+            DBStorage.__names.discard(obj.__class__.__name__ + "." + obj.id)
+
+    @staticmethod
+    def __stored(obj, attr):
+        """returns the value of attr obj held before the flush"""
+        history = sqlalchemy.inspect(obj).attrs[attr].history
+        found = history.deleted or history.unchanged
+        return found[0] if found else None
+
+    @staticmethod
+    def __flushed(session, context):
+        """records in the session the rows its flush added to or removed
+        from each class and tally, applied once committed"""
+        deltas = session.info.setdefault("counts", {})
+
+        def shift(key, sign):
+            """adds sign to the delta of key"""
+            deltas[key] = deltas.get(key, 0) + sign
+        DBStorage.__links(session)
+        tallied = list(DBStorage.__tallies)
+        for obj in session.new:
+            name = obj.__class__.__name__
+            if name in classes:
+                shift((name, None, None), 1)
+                for tally, attr in tallied:
+                    if tally == name:
+                        shift((name, attr, getattr(obj, attr, None)), 1)
+        for obj in session.deleted:
+            name = obj.__class__.__name__
+            if name in classes:
+                shift((name, None, None), -1)
+                for tally, attr in tallied:
+                    if tally == name:
+                        shift((name, attr, DBStorage.__stored(obj, attr)),
+                              -1)
+        for obj in session.dirty:
+            name = obj.__class__.__name__
+            for tally, attr in tallied:
+                if tally != name:
+                    continue
+                history = sqlalchemy.inspect(obj).attrs[attr].history
+                if history.added:
+                    shift((name, attr, DBStorage.__stored(obj, attr)), -1)
+                    shift((name, attr, history.added[0]), 1)
+
+    @staticmethod
+    def __committed(session):
+        """shifts the counts and tallies by the rows the session's flushes
+        added or removed, and the amenity index by the links they
+        changed"""
+        links = session.info.pop("amenities", ())
+        index = DBStorage.__amenities
+        if index is not None:
+            for found in links:
+                getattr(index, found[0])(*found[1:])
+        deltas = session.info.pop("counts", None)
+        if not deltas:
+            return
+        with DBStorage.__counts_lock:
+            DBStorage.__shift(DBStorage.__counts, DBStorage.__tallies,
+                              deltas, 1)
+
+    @staticmethod
+    def __rolled_back(session):
+        """forgets the rows and links the session's flushes added or
+        removed"""
+        session.info.pop("counts", None)
+        session.info.pop("amenities", None)
+
+    @staticmethod
+    def __shift(counts, tallies, deltas, sign):
+        """adds sign times each delta to counts and tallies, those not
+        counted yet being left out"""
+        for (name, attr, parent), delta in deltas.items():
+            if attr is None:
+                if counts is not None:
+                    counts[name] = counts.get(name, 0) + sign * delta
+                continue
+            tally = tallies.get((name, attr))
+            if tally is None or parent is None:
+                continue
+            tally[parent] = tally.get(parent, 0) + sign * delta
+            if not tally[parent]:
+                del tally[parent]
+
+    def __amenity_index(self):
+        """returns the amenity index, built from every place_amenity row
+        when missing or older than HBNB_AMENITY_INDEX_TTL seconds"""
+        now = time.monotonic()
+        if (DBStorage.__amenities is None or
+                now - DBStorage.__amenities_at > self.__amenities_ttl):
+            link = Base.metadata.tables["place_amenity"]
+            index = AmenityIndex()
+            for place_id, amenity_id in self.__session.execute(
+                    select(link.c.place_id, link.c.amenity_id)):
+                index.link(place_id, amenity_id)
+            DBStorage.__amenities = index
+            DBStorage.__amenities_at = now
+        return DBStorage.__amenities
 
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
-        """ gets """
+    def get(self, cls, id, load=None):
+        """returns the object of class cls with the given id, or None,
+        from the session identity map or by primary key, eagerly loading
+        the relationship paths listed in load"""
         if cls in classes.values() and id and type(id) == str:
-            d_obj = self.all(cls)
-            for k, v in d_obj.items():
-                if k.split(".")[1] == id:
-                    return v
+            return self.__session.get(cls, id,
+                                      options=self.__options(cls, load))
         return None
 
+    def page(self, cls, limit, after=None, attr=None, id=None):
+        """returns up to limit objects of class cls, or of those whose
+        attr refers to id, ordered by created_at and id and following
+        the (created_at, id) cursor after unless it is None"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        query = select(cls)
+        if attr is not None:
+            query = query.where(getattr(cls, attr) == id)
+        if after is not None:
+            query = query.where(or_(cls.created_at > after[0],
+                                    and_(cls.created_at == after[0],
+                                         cls.id > after[1])))
+        query = query.order_by(cls.created_at, cls.id).limit(limit)
+        return self.__session.scalars(query).all()
+
+    def walk(self, cls, after=None, attr=None, id=None, batch=1000):
+        """yields the objects page() would return, without a limit,
+        fetched batch at a time"""
+        while True:
+            objs = self.page(cls, batch, after, attr, id)
+            for obj in objs:
+                yield obj
+            if len(objs) < batch:
+                return
+            after = (objs[-1].created_at, objs[-1].id)
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """returns the places in the given states or cities, or anywhere
+        when neither is given, that have every given amenity; the
+        amenities are matched with an AND of their bitmaps, or by the
+        database while the session holds links not committed yet"""
+        where = []
+        if states or cities:
+            in_states = select(City.id).where(City.state_id.in_(states or ()))
+            where.append(Place.city_id.in_(cities or ()) |
+                         Place.city_id.in_(in_states))
+        if not amenities:
+            return self.__session.scalars(select(Place).where(*where)).all()
+        self.__session.flush()
+        if self.__session.info.get("amenities"):
+            where.extend(Place.amenities.any(Amenity.id == id)
+                         for id in set(amenities))
+            return self.__session.scalars(select(Place).where(*where)).all()
+        candidates = None
+        if where:
+            candidates = self.__session.scalars(
+                select(Place.id).where(*where)).all()
+        ids = self.__amenity_index().places(amenities, candidates)
+        places = []
+        for i in range(0, len(ids), 500):
+            places.extend(self.__session.scalars(
+                select(Place).where(Place.id.in_(ids[i:i + 500]))))
+        return places
+
     def count(self, cls=None):
-        """ counts """
-        data = self.all(cls)
-        if cls in classes.values():
-            data = self.all(cls)
-        return len(data)
+        """returns the number of rows, of cls or of every class, from the
+        counters"""
+        if cls is None:
+            return sum(self.counts().values())
+        if type(cls) is not str:
+            cls = cls.__name__
+        return self.counts().get(cls, 0)
+
+    def __pending(self):
+        """returns the deltas of the rows the session flushed and did not
+        commit yet, flushing the objects it holds first like a query"""
+        self.__session.flush()
+        return self.__session.info.get("counts", {})
+
+    def counts(self):
+        """returns the number of rows of every class, from the counters
+        the commits keep up to date, counted again from a single query
+        when older than HBNB_COUNT_TTL seconds; the rows the session
+        flushed are counted, like a query would"""
+        pending = self.__pending()
+        now = time.monotonic()
+        with DBStorage.__counts_lock:
+            if (DBStorage.__counts is None or
+                    now - DBStorage.__counts_at > self.__counts_ttl):
+                query = union_all(*[select(literal(name), func.count())
+                                    .select_from(classes[name])
+                                    for name in classes])
+                counts = {name: count for name, count in
+                          self.__session.execute(query)}
+                self.__shift(counts, {}, pending, -1)
+                DBStorage.__counts = counts
+                DBStorage.__counts_at = now
+            counts = dict(DBStorage.__counts)
+        self.__shift(counts, {}, pending, 1)
+        return counts
+
+    def tally(self, cls, attr):
+        """returns the number of rows of cls referring to each parent id
+        through the column attr, kept like counts() and counted again
+        with a GROUP BY; raises ValueError if attr is not a column"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return {}
+        column = self.__column(cls, attr)
+        key = (cls.__name__, attr)
+        pending = self.__pending()
+        now = time.monotonic()
+        with DBStorage.__counts_lock:
+            if (key not in DBStorage.__tallies or
+                    now - DBStorage.__tallies_at[key] > self.__counts_ttl):
+                tallies = {key: {parent: count for parent, count in
+                                 self.__session.execute(
+                                     select(column, func.count())
+                                     .where(column.isnot(None))
+                                     .group_by(column))}}
+                self.__shift(None, tallies, pending, -1)
+                DBStorage.__tallies[key] = tallies[key]
+                DBStorage.__tallies_at[key] = now
+            tallies = {key: dict(DBStorage.__tallies[key])}
+        self.__shift(None, tallies, pending, 1)
+        return tallies[key]
+
+    def column(self, cls, attr):
+        """returns the value of attr of every row of cls by id, selecting
+        that column only; raises ValueError if attr is not a column"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return {}
+        return {id: value for id, value in self.__session.execute(
+            select(cls.id, self.__column(cls, attr)))}
+
+    @staticmethod
+    def __column(cls, attr):
+        """returns the column of cls mapping attr, raising ValueError if
+        there is none"""
+        column = getattr(cls, attr, None)
+        if not isinstance(getattr(column, "property", None), ColumnProperty):
+            raise ValueError("{} has no column {}".format(cls.__name__,
+                                                          attr))
+        return column
+
+    def __statement(self, cls, where, order_by, limit):
+        """returns the SELECT of query(), or None for an unknown class"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return None
+        statement = select(cls)
+        for attr, op, operand in predicates.predicates(where):
+            column = self.__column(cls, attr)
+            if op == "in":
+                statement = statement.where(column.in_(operand))
+            else:
+                statement = statement.where(
+                    predicates.operators[op](column, operand))
+        order = predicates.ordering(order_by)
+        for attr, descending in order:
+            column = self.__column(cls, attr)
+            statement = statement.order_by(column.desc() if descending
+                                           else column.asc())
+        if order:
+            statement = statement.order_by(cls.id.desc() if order[0][1]
+                                           else cls.id.asc())
+        if limit is not None:
+            statement = statement.limit(limit)
+        return statement
+
+    def query(self, cls, where=None, order_by=None, limit=None):
+        """returns the list of the cls objects satisfying every predicate
+        of where, ordered by order_by and up to limit of them, as
+        described in models/engine/query.py, selected by the database"""
+        statement = self.__statement(cls, where, order_by, limit)
+        if statement is None:
+            return []
+        return self.__session.scalars(statement).all()
+
+    def explain(self, cls, where=None, order_by=None, limit=None):
+        """returns how query() finds its objects: its SQL, the plan of the
+        database and the first index the plan uses, None for a scan"""
+        statement = self.__statement(cls, where, order_by, limit)
+        name = cls if type(cls) is str or cls is None else cls.__name__
+        plan = {"engine": "db", "class": name, "index": None, "sql": None,
+                "plan": []}
+        if statement is None:
+            return plan
+        plan["sql"] = str(statement.compile(
+            self.__engine, compile_kwargs={"literal_binds": True}))
+        if self.__engine.dialect.name == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            prefix = "EXPLAIN "
+        rows = self.__session.connection().exec_driver_sql(
+            prefix + plan["sql"]).mappings().all()
+        for row in rows:
+            if "detail" in row:
+                detail = row["detail"]
+                found = re.search(r"USING (?:COVERING )?INDEX (\w+)",
+                                  detail)
+                found = found and found.group(1)
+            else:
+                detail = dict(row)
+                found = row.get("key")
+            plan["plan"].append(detail)
+            if plan["index"] is None and found:
+                plan["index"] = found
+        return plan
+
+    def nearby(self, cls, lat, lng, radius, limit=None):
+        """returns the (distance, object) of the cls objects positioned
+        within radius kilometers of (lat, lng), nearest first, and up to
+        limit of them; the database selects those in the bounding box of
+        the circle on the (latitude, longitude) index"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values() or cls.__name__ not in geo.positions:
+            return []
+        lat_attr, lng_attr = geo.positions[cls.__name__]
+        latitude, longitude = getattr(cls, lat_attr), getattr(cls, lng_attr)
+        (south, north), spans = geo.bounds(lat, lng, radius)
+        statement = select(cls).where(
+            latitude.between(south, north),
+            or_(*(longitude.between(west, east) for west, east in spans)))
+        found = []
+        for obj in self.__session.scalars(statement):
+            far = geo.distance(lat, lng, getattr(obj, lat_attr),
+                               getattr(obj, lng_attr))
+            if far <= radius:
+                found.append((far, obj))
+        if limit is None:
+            return sorted(found, key=lambda item: (item[0], item[1].id))
+        return heapq.nsmallest(limit, found,
+                               key=lambda item: (item[0], item[1].id))
+
+    def __documents(self):
+        """yields the (key, text, owner) of every document in the
+        database, selecting only their text columns"""
+        for name, attrs in text.fields.items():
+            cls = classes[name]
+            attrs = ("id",) + attrs + text.owners.get(name, (None,))[1:]
+            for row in self.__session.execute(
+                    select(*(getattr(cls, attr) for attr in attrs))):
+                yield text.document(name, row._mapping)
+
+    def __text_index(self):
+        """returns the text index, synced with the texts of the database
+        when missing or older than HBNB_TEXT_INDEX_TTL seconds, then
+        saved if that took any tokenizing"""
+        now = time.monotonic()
+        if (DBStorage.__texts is None or
+                now - DBStorage.__texts_at > self.__texts_ttl):
+            index = DBStorage.__texts
+            if index is None:
+                index = text.read(self.__text_path)
+                atexit.register(self.save_text_index)
+            index.sync(self.__documents())
+            DBStorage.__texts = index
+            DBStorage.__texts_at = now
+            self.save_text_index()
+        return DBStorage.__texts
+
+    def save_text_index(self):
+        """saves the text index to HBNB_TEXT_INDEX if it changed since it
+        was read or saved"""
+        if DBStorage.__texts is not None:
+            text.write(DBStorage.__texts, self.__text_path)
+
+    def search_text(self, cls, q, limit=None):
+        """returns the (score, object) of the cls objects credited with
+        the documents matching the words of q, best first by their BM25
+        score and up to limit of them"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        index = self.__text_index()
+        prefix = cls.__name__ + "."
+        for found in [index.search(q, limit, prefix),
+                      index.search(q, None, prefix)]:
+            ids = [key[len(prefix):] for score, key in found]
+            objs = {}
+            for i in range(0, len(ids), 500):
+                objs.update((obj.id, obj) for obj in self.__session.scalars(
+                    select(cls).where(cls.id.in_(ids[i:i + 500]))))
+            if limit is None or len(objs) == len(ids):
+                break
+        return [(score, objs[id]) for (score, key), id in zip(found, ids)
+                if id in objs][:limit]
+
+    def __name_index(self):
+        """returns the name index, synced with the names of the database
+        when missing or older than HBNB_SUGGEST_INDEX_TTL seconds,
+        selecting only their id and name columns"""
+        now = time.monotonic()
+        if (DBStorage.__names is None or
+                now - DBStorage.__names_at > self.__names_ttl):
+            index = DBStorage.__names or NameIndex()
+            names = []
+            for name, attr in suggest.fields.items():
+                cls = classes[name]
+                names.extend((name + "." + id, value) for id, value in
+                             self.__session.execute(
+                                 select(cls.id, getattr(cls, attr))))
+            index.sync(names)
+            DBStorage.__names = index
+            DBStorage.__names_at = now
+        return DBStorage.__names
+
+    def suggest(self, prefix, types=None, limit=10):
+        """returns the (class name, id, name) of the first limit objects
+        of the classes of types, or of every class of suggest.fields,
+        whose name starts with prefix whatever the case, ordered by
+        name"""
+        if types is not None:
+            types = {cls if type(cls) is str else cls.__name__
+                     for cls in types}
+        return self.__name_index().suggest(prefix, types, limit)
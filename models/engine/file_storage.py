@@ -3,84 +3,1264 @@
 Contains the FileStorage class
 """
 
+import atexit
+import contextlib
+from datetime import datetime
+import fcntl
+import gc
+import heapq
+import io
+from itertools import islice
 import json
+import os
+import threading
+import time
+import uuid
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine.amenity_index import AmenityIndex
+from models.engine import codec, query, shards, snapshot, suggest, text
+from models.engine.geo import GeoGrid, positions
+from models.engine.query import SortedIndex
+from models.engine.suggest import NameIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# foreign key attributes indexed for each class, a list attribute
+# indexes every id it holds; they are the hash indexes of query()
+relations = {"City": ("state_id",),
+             "Place": ("city_id", "user_id", "amenity_ids"),
+             "Review": ("place_id", "user_id")}
+
+# attributes kept in a sorted index for each class, answering the range
+# predicates and the ordering of query()
+ranges = {"Place": ("number_rooms", "number_bathrooms", "max_guest",
+                    "price_by_night")}
+
+
+def hydrate(name, attrs):
+    """returns the instance of the class called name holding the stored
+    attributes attrs, which it takes over, without going through __init__
+    and __setattr__: the attributes are set at once and a stored password
+    is not hashed again"""
+    cls = classes[name]
+    obj = cls.__new__(cls)
+    for field in ("created_at", "updated_at"):
+        value = attrs.get(field)
+        if type(value) is str:
+            attrs[field] = datetime.fromisoformat(value)
+        else:
+            attrs[field] = datetime.utcnow()
+    if attrs.get("id") is None:
+        attrs["id"] = str(uuid.uuid4())
+    obj.__dict__.update(attrs)
+    return obj
+
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
-    # string - path to the JSON file
-    __file_path = "file.json"
+    # string - codec of the file written: "json", "orjson", "msgpack" or
+    # "binary" snapshot, HBNB_FILE_FORMAT being its former name
+    __codec = getenv("HBNB_FILE_CODEC", getenv("HBNB_FILE_FORMAT", "json"))
+    # string - compression of the file written: "none", "zlib", "lzma" or
+    # "zstd"
+    __compression = getenv("HBNB_FILE_COMPRESSION", "none")
+    # string - path to the file, whatever codec and compression wrote it
+    __file_path = "file." + codec.suffix(__codec, __compression)
+    # integer - partitions of the large classes when the objects are
+    # sharded one file per class in __shard_dir, 0 keeps the single file
+    __shards = int(getenv("HBNB_FILE_SHARDS", 0))
+    # string - directory of the shard files
+    __shard_dir = "file.shards"
+    # integer - worker processes reading the shard files on reload
+    __load_processes = int(getenv("HBNB_FILE_LOAD_PROCESSES",
+                                  os.cpu_count() or 1))
+    # dictionary - (signature, digest) of each shard file as last read or
+    # written by shard name
+    __shard_files = {}
+    # set - shards to rewrite at the next write whether or not their
+    # objects changed
+    __stale = set()
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects bucketed by <class name>
+    __classes = {}
+    # dictionary - the objects of the partitioned classes bucketed by
+    # shard name when sharded
+    __partitions = {}
+    # dictionary - objects by (<class name>, <attribute>, <parent id>)
+    __children = {}
+    # dictionary - parent ids indexed for each (<object key>, <attribute>)
+    __parents = {}
+    # dictionary - the __children dictionaries of each (<class name>,
+    # <attribute>) by parent id, tallying the children of every parent
+    __tallies = {}
+    # dictionary - SortedIndex of each (<class name>, <attribute>) of
+    # ranges, built on first use
+    __ranges = None
+    # dictionary - SortedIndex of the created_at of the objects of each
+    # class, ordering page() and walk() by (created_at, id), built on
+    # first use
+    __created = None
+    # dictionary - GeoGrid of the positions of each class of positions,
+    # built on first use
+    __grids = None
+    # float - degrees of latitude and longitude spanned by a grid cell
+    __grid_cell = float(getenv("HBNB_GEO_CELL", 0.5))
+    # TextIndex - the documents of the classes of text.fields, built on
+    # first use
+    __texts = None
+    # string - path to the file the text index is saved to
+    __text_path = getenv("HBNB_TEXT_INDEX", "file.text")
+    # NameIndex - the names of the objects of the classes of
+    # suggest.fields, built on first use
+    __names = None
+    # AmenityIndex - bitmaps of the places linked to each amenity
+    __amenities = AmenityIndex()
+    # dictionary - the __objects dictionary the indexes were built from
+    __indexed = None
+    # set - keys of the objects created or changed since the last save
+    __dirty = set()
+    # set - keys of the objects deleted since the last save
+    __deleted = set()
+    # dictionary - records by key as they are on disk: JSON encoded,
+    # snapshot rows, or still decoded when read from JSON and not written
+    # since
+    __records = {}
+    # tuple - (inode, mtime, size) of the file as last read or written
+    __signature = None
+    # string - sha1 digest of the file content as last read or written
+    __digest = None
+    # boolean - append changes to a journal instead of rewriting the
+    # file, unless sharded as the shards changed are the only ones written
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1" and not __shards
+    # string - path to the journal of changes since the last snapshot
+    __journal_path = __file_path + ".journal"
+    # integer - journal entries that trigger a background compaction
+    __compact_at = int(getenv("HBNB_FILE_JOURNAL_COMPACT", 1000))
+    # integer - bytes of the journal already applied to __records
+    __journal_offset = 0
+    # integer - entries in the journal since the last compaction
+    __journal_entries = 0
+    # lock - serializes the reads and writes of the files on disk
+    __disk_lock = threading.RLock()
+    # lock - serializes the changes to the objects and their indexes
+    __lock = threading.RLock()
+    # integer - bumped by every change to __objects
+    __version = 0
+    # dictionary - (version, dictionary) snapshots handed out by all()
+    __snapshots = {}
+    # thread - the running background compaction, if any
+    __compactor = None
+    # float - seconds the flusher waits to coalesce saves, 0 writes at once
+    __write_behind = float(getenv("HBNB_FILE_WRITE_BEHIND", 0)) / 1000
+    # condition - wakes the flusher when a save is requested
+    __pending = threading.Condition()
+    # integer - saves requested since the last flush
+    __requested = 0
+    # thread - the write-behind flusher, once started
+    __flusher = None
+    # dictionary - flush counts, failures, batch sizes and latencies
+    __metrics = {"flushes": 0, "saves": 0, "last_batch": 0, "max_batch": 0,
+                 "last_flush_seconds": 0.0, "flush_seconds": 0.0,
+                 "failures": 0}
+    # exception - the last failure of the flusher, raised by the next
+    # save() or close()
+    __flush_error = None
+
+    def __index(self):
+        """returns the class buckets, rebuilding every index if __objects
+        was replaced"""
+        if FileStorage.__indexed is FileStorage.__objects:
+            return FileStorage.__classes
+        with FileStorage.__lock:
+            if FileStorage.__indexed is FileStorage.__objects:
+                return FileStorage.__classes
+            FileStorage.__classes = {}
+            FileStorage.__partitions = {}
+            FileStorage.__children = {}
+            FileStorage.__parents = {}
+            FileStorage.__tallies = {}
+            FileStorage.__ranges = None
+            FileStorage.__created = None
+            FileStorage.__grids = None
+            FileStorage.__texts = None
+            FileStorage.__names = None
+            FileStorage.__amenities = AmenityIndex()
+            FileStorage.__indexed = FileStorage.__objects
+            for key, value in FileStorage.__objects.items():
+                self.__add_to_index(key, value)
+            FileStorage.__dirty = set(FileStorage.__objects)
+            FileStorage.__deleted = set(FileStorage.__records)
+            FileStorage.__version += 1
+            return FileStorage.__classes
+
+    def __add_to_index(self, key, obj):
+        """adds obj to the class bucket, shard and foreign key indexes"""
+        name = obj.__class__.__name__
+        FileStorage.__classes.setdefault(name, {})[key] = obj
+        if self.__shards > 1 and name in shards.partitioned:
+            FileStorage.__partitions.setdefault(shards.partition(
+                name, key[len(name) + 1:], self.__shards), {})[key] = obj
+        for attr in relations.get(name, ()):
+            self.__add_to_relation(key, obj, attr)
+        if FileStorage.__ranges is not None:
+            for attr in ranges.get(name, ()):
+                self.__add_to_range(key, obj, attr)
+        if FileStorage.__created is not None:
+            self.__add_to_created(key, obj)
+        if FileStorage.__grids is not None and name in positions:
+            self.__add_to_grid(key, obj)
+        if FileStorage.__names is not None and name in suggest.fields:
+            FileStorage.__names.add(key, getattr(obj, suggest.fields[name],
+                                                 None))
+        if FileStorage.__texts is not None and name in text.fields:
+            FileStorage.__texts.add(*text.document(name, obj.__dict__))
+
+    def __drop_from_index(self, key, obj):
+        """removes obj from the class bucket, shard and foreign key
+        indexes"""
+        name = obj.__class__.__name__
+        FileStorage.__classes.get(name, {}).pop(key, None)
+        if self.__shards > 1 and name in shards.partitioned:
+            FileStorage.__partitions.get(shards.partition(
+                name, key[len(name) + 1:], self.__shards), {}).pop(key, None)
+        for attr in relations.get(name, ()):
+            self.__drop_from_relation(key, obj, attr)
+        for attr in ranges.get(name, ()):
+            index = (FileStorage.__ranges or {}).get((name, attr))
+            if index is not None:
+                index.discard(key)
+        if name in (FileStorage.__created or {}):
+            FileStorage.__created[name].discard(key)
+        if name in (FileStorage.__grids or {}):
+            FileStorage.__grids[name].discard(key)
+        if FileStorage.__names is not None and name in suggest.fields:
+            FileStorage.__names.discard(key)
+        if FileStorage.__texts is not None and name in text.fields:
+            FileStorage.__texts.discard(key)
+
+    def __add_to_relation(self, key, obj, attr):
+        """indexes obj under the parent id(s) held by attr"""
+        value = getattr(obj, attr, None)
+        if type(value) is list:
+            parents = tuple(value)
+        else:
+            parents = (value,)
+        FileStorage.__parents[(key, attr)] = parents
+        name = obj.__class__.__name__
+        children = FileStorage.__children
+        for parent in parents:
+            found = children.get((name, attr, parent))
+            if found is None:
+                found = children[(name, attr, parent)] = {}
+                FileStorage.__tallies.setdefault((name, attr), {})[
+                    parent] = found
+            found[key] = obj
+        if attr == "amenity_ids" and parents:
+            FileStorage.__amenities.link(obj.id, *parents)
+
+    def __add_to_range(self, key, obj, attr):
+        """indexes obj under the value of attr in its sorted index"""
+        name = obj.__class__.__name__
+        index = FileStorage.__ranges.get((name, attr))
+        if index is None:
+            index = FileStorage.__ranges[(name, attr)] = SortedIndex()
+        index.add(key, getattr(obj, attr, None))
+
+    def __add_to_created(self, key, obj):
+        """indexes obj under its created_at in the sorted index of its
+        class"""
+        name = obj.__class__.__name__
+        index = FileStorage.__created.get(name)
+        if index is None:
+            index = FileStorage.__created[name] = SortedIndex()
+        index.add(key, getattr(obj, "created_at", None))
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def __add_to_grid(self, key, obj):
+        """indexes obj under its position in the grid of its class, read
+        from its own attributes: the class defaults are no position"""
+        name = obj.__class__.__name__
+        grid = FileStorage.__grids.get(name)
+        if grid is None:
+            grid = FileStorage.__grids[name] = GeoGrid(self.__grid_cell)
+        lat, lng = positions[name]
+        grid.add(key, obj.__dict__.get(lat), obj.__dict__.get(lng))
+
+    def __drop_from_relation(self, key, obj, attr):
+        """removes obj from under the parent id(s) it was indexed with"""
+        name = obj.__class__.__name__
+        for parent in FileStorage.__parents.pop((key, attr), ()):
+            if attr == "amenity_ids":
+                FileStorage.__amenities.unlink(obj.id, parent)
+            children = FileStorage.__children.get((name, attr, parent))
+            if children is not None:
+                children.pop(key, None)
+                if not children:
+                    del FileStorage.__children[(name, attr, parent)]
+                    del FileStorage.__tallies[(name, attr)][parent]
+
+    def __put(self, key, obj):
+        """stores obj under key and indexes it"""
+        self.__index()
+        old = self.__objects.get(key)
+        if old is not None:
+            self.__drop_from_index(key, old)
+        self.__add_to_index(key, obj)
+        self.__objects[key] = obj
+        FileStorage.__version += 1
+
+    def __pop(self, key):
+        """removes the object stored under key from __objects, returning
+        it or None"""
+        self.__index()
+        old = self.__objects.pop(key, None)
+        if old is not None:
+            self.__drop_from_index(key, old)
+            if type(old) is Place:
+                FileStorage.__amenities.drop_place(old.id)
+            FileStorage.__version += 1
+        return old
+
+    def all(self, cls=None, load=None):
+        """returns a read-only snapshot of __objects, or of the objects of
+        class cls, shared by every reader until the next change; load is
+        accepted like in DBStorage, the relationships are already
+        indexed"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        self.__index()
+        snapshot = FileStorage.__snapshots.get(cls)
+        if snapshot is not None and snapshot[0] == FileStorage.__version:
+            return snapshot[1]
+        # the version is bumped once a change is done, and changes hold
+        # the lock: read under it, a snapshot always matches its version
+        with FileStorage.__lock:
+            version = FileStorage.__version
+            snapshot = FileStorage.__snapshots.get(cls)
+            if snapshot is None or snapshot[0] != version:
+                if cls is None:
+                    snapshot = (version, dict(FileStorage.__objects))
+                else:
+                    snapshot = (version, dict(
+                        self.__index().get(cls, {})))
+                FileStorage.__snapshots[cls] = snapshot
+            return snapshot[1]
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with FileStorage.__lock:
+                self.__put(key, obj)
+                FileStorage.__dirty.add(key)
+                FileStorage.__deleted.discard(key)
+
+    def __stat(self, path=None):
+        """returns the (inode, mtime, size) signature of the file at path,
+        by default the file of the objects"""
+        st = os.stat(path or self.__file_path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __remember(self, digest):
+        """records the sha1 digest of the file content last read from or
+        written to disk"""
+        FileStorage.__digest = digest
+        FileStorage.__signature = None if digest is None else self.__stat()
+
+    @staticmethod
+    def __encoded(record):
+        """returns the JSON encoding of a record of __records"""
+        if type(record) is str:
+            return record
+        return json.dumps(snapshot.record(record))
+
+    def __dump(self, path, records, name=None, compression=None):
+        """atomically replaces the file at path with the records streamed
+        in the codec called name and the given compression, by default
+        the configured ones; returns the sha1 digest of the file"""
+        name = name or self.__codec
+        compression = compression or self.__compression
+        return self.__publish(path, lambda f: codec.dump(
+            records, f, name, compression))
+
+    @staticmethod
+    def __publish(path, write):
+        """atomically replaces the file at path with what write(f) writes
+        to the binary file f: it is written and synced to a temp file
+        which is then renamed; returns the sha1 digest of the content"""
+        tmp = path + ".tmp"
+        with open(tmp, 'wb', buffering=0) as raw:
+            hashed = codec.Hashed(raw)
+            with io.BufferedWriter(hashed, codec.chunk_size) as f:
+                write(f)
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return hashed.hexdigest()
+
+    def __read(self):
+        """returns the sha1 digest of the file and its records, streamed
+        from whatever codec and compression wrote it, with the journal
+        replayed over them in journal mode"""
+        try:
+            digest, jo = codec.read(self.__file_path, self.__codec)
+        except OSError:
+            if not self.__journal:
+                raise
+            digest, jo = None, {}
+        if self.__journal:
+            FileStorage.__journal_offset = 0
+            FileStorage.__journal_entries = 0
+            for key, record in self.__read_journal():
+                if record is None:
+                    jo.pop(key, None)
+                else:
+                    jo[key] = record
+        return digest, jo
+
+    def __shard_path(self, name):
+        """returns the path to the file of the shard called name"""
+        return shards.path(self.__shard_dir, name,
+                           codec.suffix(self.__codec, self.__compression))
+
+    def __shard_keys(self, name):
+        """returns the keys of the objects of the shard called name, from
+        its bucket"""
+        if "." in name:
+            return FileStorage.__partitions.get(name, {})
+        if self.__shards > 1 and name in shards.partitioned:
+            return {}
+        return FileStorage.__classes.get(name, {})
+
+    def __shard_records(self, name):
+        """returns the records of the shard called name by key"""
+        records = self.__records
+        return {key: records[key] for key in self.__shard_keys(name)
+                if key in records}
+
+    def __write_shards(self, found):
+        """writes the records of each shard in found to its file, and
+        removes the files of the shards left empty or written under
+        another extension"""
+        os.makedirs(self.__shard_dir, exist_ok=True)
+        files = shards.listing(self.__shard_dir)
+        for name, records in found.items():
+            path = self.__shard_path(name)
+            if records:
+                digest = self.__dump(path, records)
+                FileStorage.__shard_files[name] = (self.__stat(path), digest)
+            else:
+                FileStorage.__shard_files.pop(name, None)
+            old = files.get(name)
+            if old is not None and (old != path or not records):
+                os.remove(old)
+
+    def __reload_shards(self):
+        """loads every shard file, in parallel, marking for a rewrite the
+        shards holding objects that belong to another one, as after
+        HBNB_FILE_SHARDS changed"""
+        files = shards.listing(self.__shard_dir)
+        found = shards.read_all(files.values(), self.__codec,
+                                self.__load_processes)
+        for name, path in files.items():
+            digest, jo = found[path]
+            self.__load(jo)
+            FileStorage.__shard_files[name] = (self.__stat(path), digest)
+            keys = self.__shard_keys(name)
+            moved = [key for key in jo if key not in keys]
+            if moved:
+                FileStorage.__stale.add(name)
+                FileStorage.__dirty.update(moved)
+
+    def __close_shards(self):
+        """merges the shard files another process wrote or removed since
+        they were last read or written, reading only those"""
+        self.__index()
+        files = shards.listing(self.__shard_dir)
+        for name in set(FileStorage.__shard_files) | set(files):
+            path = files.get(name)
+            known = FileStorage.__shard_files.get(name)
+            if path is None:
+                FileStorage.__shard_files.pop(name)
+                jo = {}
+            else:
+                signature = self.__stat(path)
+                if known is not None and signature == known[0]:
+                    continue
+                if known is not None and codec.digest(path) == known[1]:
+                    FileStorage.__shard_files[name] = (signature, known[1])
+                    continue
+                digest, jo = shards.read(path, self.__codec)
+                FileStorage.__shard_files[name] = (signature, digest)
+            for key in [key for key in self.__shard_keys(name)
+                        if key not in jo and key in self.__records]:
+                self.__apply(key, None)
+            for key, record in jo.items():
+                self.__apply(key, record)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path),
+        encoding only the objects changed since the last save; in
+        write-behind mode the write is left to the flusher thread, and
+        the failure of its last write, if any, is raised here"""
+        self.__flush_failed()
+        with FileStorage.__pending:
+            FileStorage.__requested += 1
+            if self.__write_behind:
+                if (FileStorage.__flusher is None or
+                        not FileStorage.__flusher.is_alive()):
+                    FileStorage.__flusher = threading.Thread(
+                        target=self.__flush_behind, daemon=True)
+                    FileStorage.__flusher.start()
+                    atexit.register(self.flush)
+                FileStorage.__pending.notify()
+                return
+        self.flush()
+
+    def flush(self):
+        """writes every change made so far to disk before returning; if
+        that fails, the changes are kept to be written by the next
+        flush"""
+        with FileStorage.__pending:
+            batch, FileStorage.__requested = FileStorage.__requested, 0
+        start = time.perf_counter()
+        try:
+            self.__write()
+        except Exception:
+            with FileStorage.__pending:
+                FileStorage.__requested += batch
+                FileStorage.__metrics["failures"] += 1
+            raise
+        elapsed = time.perf_counter() - start
+        if batch:
+            with FileStorage.__pending:
+                metrics = FileStorage.__metrics
+                metrics["flushes"] += 1
+                metrics["saves"] += batch
+                metrics["last_batch"] = batch
+                metrics["max_batch"] = max(metrics["max_batch"], batch)
+                metrics["last_flush_seconds"] = elapsed
+                metrics["flush_seconds"] += elapsed
+
+    def __flush_behind(self):
+        """flusher thread: coalesces the saves requested during each
+        write-behind window into a single write, retried in the next
+        window when it fails"""
+        while True:
+            with FileStorage.__pending:
+                while not FileStorage.__requested:
+                    FileStorage.__pending.wait()
+            time.sleep(self.__write_behind)
+            with FileStorage.__pending:
+                if not FileStorage.__requested:
+                    continue
+            try:
+                self.flush()
+            except Exception as error:
+                with FileStorage.__pending:
+                    FileStorage.__flush_error = error
+
+    def __flush_failed(self):
+        """raises the last failure of the flusher, once"""
+        with FileStorage.__pending:
+            error, FileStorage.__flush_error = FileStorage.__flush_error, None
+        if error is not None:
+            raise error
+
+    def flush_stats(self):
+        """returns the number of flushes, failed flushes and saves, the
+        batch sizes and the flush latencies recorded so far"""
+        with FileStorage.__pending:
+            metrics = dict(FileStorage.__metrics)
+        flushes = metrics["flushes"]
+        metrics["avg_batch"] = metrics["saves"] / flushes if flushes else 0
+        metrics["avg_flush_seconds"] = (metrics["flush_seconds"] / flushes
+                                        if flushes else 0)
+        return metrics
+
+    def __write(self):
+        """writes the changes made since the last write to disk; in
+        journal mode, under the lock of the journal once the entries the
+        other processes appended are applied"""
+        with FileStorage.__disk_lock, self.__journal_flock():
+            with FileStorage.__lock:
+                self.__index()
+                if not self.__dirty and not self.__deleted:
+                    return
+                if self.__journal:
+                    self.__catch_up()
+                dirty, FileStorage.__dirty = FileStorage.__dirty, set()
+                deleted, FileStorage.__deleted = FileStorage.__deleted, set()
+                for key in deleted:
+                    self.__records.pop(key, None)
+                encoder = codec.codecs[self.__codec]
+                for key in dirty:
+                    obj = self.__objects.get(key)
+                    if obj is not None:
+                        self.__records[key] = encoder.record(obj)
+                stale, FileStorage.__stale = FileStorage.__stale, set()
+                if self.__journal:
+                    lines = self.__journal_lines(dirty, deleted)
+                elif self.__shards:
+                    touched = stale | {shards.shard(key, self.__shards)
+                                       for key in dirty | deleted}
+                    records = {name: self.__shard_records(name)
+                               for name in touched}
+                else:
+                    records = dict(self.__records)
+            try:
+                if self.__journal:
+                    self.__append(lines)
+                elif self.__shards:
+                    self.__write_shards(records)
+                else:
+                    self.__remember(self.__dump(self.__file_path, records))
+            except Exception:
+                with FileStorage.__lock:
+                    FileStorage.__dirty |= dirty - FileStorage.__deleted
+                    FileStorage.__deleted |= deleted - FileStorage.__dirty
+                    FileStorage.__stale |= stale
+                raise
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the file, or the shard files, to __objects,
+        streaming their records; the cyclic garbage collector is paused
+        meanwhile as the objects built hold no cycle for it to find"""
+        collecting = gc.isenabled()
+        gc.disable()
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            with FileStorage.__disk_lock, FileStorage.__lock:
+                if self.__shards:
+                    self.__reload_shards()
+                else:
+                    with self.__journal_flock(fcntl.LOCK_SH):
+                        digest, jo = self.__read()
+                    self.__load(jo)
+                    self.__remember(digest)
         except:
             pass
+        finally:
+            if collecting:
+                gc.enable()
+
+    def __load(self, jo):
+        """stores the objects of the records jo read from disk by key"""
+        for key, record in jo.items():
+            self.__put(key, self.__hydrate(record))
+            self.__records[key] = record
+            FileStorage.__dirty.discard(key)
+            FileStorage.__deleted.discard(key)
+
+    @staticmethod
+    def __hydrate(record):
+        """returns the instance of a record read from disk, a snapshot
+        row or a dictionary"""
+        if type(record) is tuple:
+            name, fields, values = record
+            return hydrate(name, dict(zip(fields, values)))
+        attrs = record.copy()
+        return hydrate(attrs.pop("__class__"), attrs)
+
+    def __apply(self, key, record):
+        """applies one record read from disk to __objects unless it is the
+        one already known, a None record deletes the object; the objects
+        changed or deleted here since the last write keep their change,
+        to be written over the record"""
+        if key in FileStorage.__dirty or key in FileStorage.__deleted:
+            if record is None:
+                self.__records.pop(key, None)
+            else:
+                self.__records[key] = record
+            return
+        if record is None:
+            if self.__records.pop(key, None) is not None:
+                self.__pop(key)
+            return
+        known = self.__records.get(key)
+        if known is not None:
+            known = snapshot.record(known)
+        if known != snapshot.record(record):
+            self.__records[key] = record
+            self.__put(key, self.__hydrate(record))
+
+    def __merge(self, jo):
+        """applies to __objects only the records that differ from the
+        ones last seen in the file"""
+        for key in [key for key in self.__records if key not in jo]:
+            self.__apply(key, None)
+        for key, record in jo.items():
+            self.__apply(key, record)
+
+    def __read_journal(self):
+        """returns the (key, record) entries appended to the journal past
+        __journal_offset, ignoring a trailing partially written line"""
+        try:
+            with open(self.__journal_path, 'rb') as f:
+                f.seek(self.__journal_offset)
+                data = f.read()
+        except OSError:
+            return []
+        data = data[:data.rfind(b"\n") + 1]
+        entries = []
+        for line in data.splitlines():
+            entry = json.loads(line)
+            entries.append((entry["key"], entry["record"]))
+        FileStorage.__journal_offset += len(data)
+        FileStorage.__journal_entries += len(entries)
+        return entries
+
+    def __journal_flock(self, operation=fcntl.LOCK_EX):
+        """returns the open lock file of the journal, locked against the
+        other processes, exclusively to append or compact and shared to
+        read; closing it releases the lock; a null context out of journal
+        mode"""
+        if not self.__journal:
+            return contextlib.nullcontext()
+        f = open(self.__journal_path + ".lock", "a")
+        fcntl.flock(f, operation)
+        return f
+
+    def __replay(self):
+        """applies the journal entries other processes appended since the
+        last read"""
+        for key, record in self.__read_journal():
+            self.__apply(key, record)
+
+    def __catch_up(self):
+        """applies the changes another process made to the file since it
+        was last read, replaying only the journal while the file is
+        unchanged and without decoding it while its content is"""
+        try:
+            signature = self.__stat()
+        except OSError:
+            signature = None
+        if signature != self.__signature and signature is not None:
+            if codec.digest(self.__file_path) != self.__digest:
+                digest, jo = self.__read()
+                self.__merge(jo)
+                self.__remember(digest)
+                return
+            FileStorage.__signature = signature
+        if self.__journal:
+            self.__replay()
+
+    def __journal_lines(self, dirty, deleted):
+        """returns the journal lines for the records created, updated or
+        deleted since the last write"""
+        lines = []
+        for key in dirty:
+            if key in self.__records:
+                lines.append('{"key": ' + json.dumps(key) +
+                             ', "record": ' +
+                             self.__encoded(self.__records[key]) + '}')
+        for key in deleted:
+            if key not in self.__records:
+                lines.append(json.dumps({"key": key, "record": None}))
+        return lines
+
+    def __append(self, lines):
+        """appends lines to the journal, caught up and locked by the
+        caller, compacting it in the background once it holds __compact_at
+        entries"""
+        if self.__signature is None:
+            self.__rewrite()
+            return
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode()
+        with open(self.__journal_path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            FileStorage.__journal_offset = f.tell()
+        FileStorage.__journal_entries += len(lines)
+        if (FileStorage.__journal_entries >= self.__compact_at and
+                (FileStorage.__compactor is None or
+                 not FileStorage.__compactor.is_alive())):
+            FileStorage.__compactor = threading.Thread(target=self.compact,
+                                                       daemon=True)
+            FileStorage.__compactor.start()
+
+    def export(self, path, codec="json", compression="none"):
+        """writes every object to the file at path in the given codec and
+        compression, after the pending changes are saved"""
+        self.flush()
+        with FileStorage.__disk_lock, FileStorage.__lock:
+            records = dict(self.__records)
+        self.__dump(path, records, codec, compression)
+
+    def compact(self):
+        """writes the current records to a fresh file snapshot and drops
+        the journal entries it now contains, and saves the text index;
+        sharded, every shard file is rewritten"""
+        self.save_text_index()
+        if self.__shards:
+            with FileStorage.__disk_lock, FileStorage.__lock:
+                found = {name: {} for name in FileStorage.__shard_files}
+                for key, record in self.__records.items():
+                    found.setdefault(shards.shard(key, self.__shards),
+                                     {})[key] = record
+                self.__write_shards(found)
+            return
+        with FileStorage.__disk_lock, self.__journal_flock():
+            self.__rewrite()
+
+    def __rewrite(self):
+        """writes the records to a fresh file snapshot and empties the
+        journal; the caller holds the disk and journal locks, so the other
+        processes neither append nor compact meanwhile and the records,
+        once caught up, hold every entry of the journal"""
+        with FileStorage.__lock:
+            self.__catch_up()
+            records = dict(self.__records)
+        self.__remember(self.__dump(self.__file_path, records))
+        self.__publish(self.__journal_path, lambda f: None)
+        FileStorage.__journal_offset = 0
+        FileStorage.__journal_entries = 0
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with FileStorage.__lock:
+                if self.__pop(key) is not None:
+                    FileStorage.__dirty.discard(key)
+                    FileStorage.__deleted.add(key)
+
+    def changed(self, obj, attr):
+        """marks a stored obj dirty, and reindexes it, after its attribute
+        attr was set"""
+        if "id" not in obj.__dict__:
+            return
+        key = obj.__class__.__name__ + "." + obj.id
+        with FileStorage.__lock:
+            self.__index()
+            if self.__objects.get(key) is not obj:
+                return
+            FileStorage.__dirty.add(key)
+            if attr in relations.get(obj.__class__.__name__, ()):
+                self.__drop_from_relation(key, obj, attr)
+                self.__add_to_relation(key, obj, attr)
+            name = obj.__class__.__name__
+            if FileStorage.__ranges is not None and \
+                    attr in ranges.get(name, ()):
+                self.__add_to_range(key, obj, attr)
+            if FileStorage.__created is not None and attr == "created_at":
+                self.__add_to_created(key, obj)
+            if FileStorage.__grids is not None and \
+                    attr in positions.get(name, ()):
+                self.__add_to_grid(key, obj)
+            if FileStorage.__names is not None and \
+                    attr == suggest.fields.get(name):
+                FileStorage.__names.add(key, getattr(obj, attr, None))
+            if FileStorage.__texts is not None and name in text.fields \
+                    and (attr in text.fields[name] or
+                         attr == text.owners.get(name, (None, None))[1]):
+                FileStorage.__texts.add(*text.document(name, obj.__dict__))
+
+    def related(self, cls, attr, id):
+        """returns the list of cls objects whose attr refers to id"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        self.__index()
+        return list(self.__children.get((cls, attr, id), {}).values())
+
+    def __select(self, cls, attr, id, after):
+        """returns the objects of class cls, or of those whose attr refers
+        to id, following the (created_at, id) cursor after unless it is
+        None"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        if attr is None:
+            objs = self.all(cls).values()
+        elif attr in relations.get(cls, ()):
+            with FileStorage.__lock:
+                self.__index()
+                objs = list(self.__children.get((cls, attr, id), {}).values())
+        else:
+            objs = [obj for obj in self.all(cls).values()
+                    if getattr(obj, attr, None) == id]
+        if after is not None:
+            objs = (obj for obj in objs if (obj.created_at, obj.id) > after)
+        return objs
+
+    def __ordered(self, cls, after):
+        """yields the objects of class cls ordered by created_at and id,
+        following the (created_at, id) cursor after unless it is None,
+        from the sorted index of the class: the cursor is found by
+        bisection"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        objs = self.all(cls)
+        index = self.__created_index().get(cls)
+        if index is None:
+            return
+        found = () if after is None else ((">=", after[0]),)
+        for value, key in index.items(found):
+            obj = objs.get(key)
+            if obj is None:
+                continue
+            if after is not None and (value, obj.id) <= after:
+                continue
+            yield obj
+
+    def page(self, cls, limit, after=None, attr=None, id=None):
+        """returns up to limit objects of class cls, or of those whose
+        attr refers to id, ordered by created_at and id and following
+        the (created_at, id) cursor after unless it is None"""
+        if attr is None:
+            return list(islice(self.__ordered(cls, after), limit))
+        return heapq.nsmallest(limit, self.__select(cls, attr, id, after),
+                               key=lambda obj: (obj.created_at, obj.id))
+
+    def walk(self, cls, after=None, attr=None, id=None):
+        """yields the objects page() would return, without a limit, from
+        a snapshot sorted once"""
+        if attr is None:
+            yield from self.__ordered(cls, after)
+            return
+        for obj in sorted(self.__select(cls, attr, id, after),
+                          key=lambda obj: (obj.created_at, obj.id)):
+            yield obj
+
+    def __has(self, name, id):
+        """tells if an object of the class called name has the given id"""
+        return type(id) is str and name + "." + id in self.__objects
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """returns the places in the given states or cities, or anywhere
+        when neither is given, that have every given amenity; the
+        amenities are matched with an AND of their bitmaps"""
+        self.__index()
+        with FileStorage.__lock:
+            children = FileStorage.__children
+            candidates = None
+            if states or cities:
+                city_ids = list(cities or ())
+                for state_id in states or ():
+                    if self.__has("State", state_id):
+                        city_ids.extend(city.id for city in children.get(
+                            ("City", "state_id", state_id), {}).values())
+                candidates = {}
+                for city_id in city_ids:
+                    if self.__has("City", city_id):
+                        candidates.update(children.get(
+                            ("Place", "city_id", city_id), {}))
+            if not amenities:
+                if candidates is None:
+                    candidates = self.__classes.get("Place", {})
+                return list(candidates.values())
+            if not all(self.__has("Amenity", id) for id in amenities):
+                return []
+            if candidates is not None:
+                candidates = [place.id for place in candidates.values()]
+            return [self.__objects["Place." + id] for id in
+                    FileStorage.__amenities.places(amenities, candidates)]
+
+    def __plan(self, name, found, order, limit):
+        """returns the plan of a query on the class called name: the
+        index giving the fewest candidates for the predicates found, or
+        the sorted index of the attribute of order when it holds every
+        object and a limit stops the walk early"""
+        plan = {"engine": "file", "class": name, "index": None,
+                "kind": None,
+                "candidates": len(FileStorage.__classes.get(name, {}))}
+        for attr in dict.fromkeys(attr for attr, op, operand in found):
+            on = [(op, operand) for a, op, operand in found if a == attr]
+            option = None
+            if attr in relations.get(name, ()) and \
+                    type(getattr(classes[name], attr, None)) is not list:
+                option = self.__hash_option(name, attr, on)
+            elif attr in ranges.get(name, ()):
+                option = self.__range_option(name, attr, on)
+            if option is not None and \
+                    option["candidates"] < plan["candidates"]:
+                plan.update(option, index=attr)
+        index = None
+        if len(order) == 1:
+            index = FileStorage.__ranges.get((name, order[0][0]))
+        if plan["index"] is None and index is not None and \
+                limit is not None and \
+                len(index) == len(FileStorage.__classes.get(name, {})):
+            plan.update(index=order[0][0], kind="sorted", on=[])
+        plan["order"] = None
+        if order:
+            plan["order"] = "index" if plan["kind"] == "sorted" and \
+                plan["index"] == order[0][0] and len(order) == 1 else "sort"
+        return plan
+
+    def __hash_option(self, name, attr, on):
+        """returns the hash index option of the equality and in
+        predicates on attr, or None"""
+        values = None
+        try:
+            for op, operand in on:
+                if op == "==":
+                    operand = [operand]
+                elif op != "in":
+                    continue
+                values = set(operand) if values is None else \
+                    values & set(operand)
+        except TypeError:
+            return None
+        if values is None:
+            return None
+        children = FileStorage.__children
+        return {"kind": "hash", "values": values,
+                "candidates": sum(len(children.get((name, attr, value), ()))
+                                  for value in values)}
+
+    def __range_option(self, name, attr, on):
+        """returns the sorted index option of the predicates on attr it
+        answers, or None"""
+        on = [(op, operand) for op, operand in on if op != "!=" and
+              all(query.rank(value) is not None for value in
+                  (operand if op == "in" else [operand]))]
+        if not on:
+            return None
+        index = FileStorage.__ranges.get((name, attr))
+        return {"kind": "sorted", "on": on,
+                "candidates": 0 if index is None else index.count(on)}
+
+    def __query(self, cls, where, order_by, limit, run=True):
+        """returns the objects of query(), or None unless run, and the
+        plan that finds them"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        found = query.predicates(where)
+        order = query.ordering(order_by)
+        if cls not in classes:
+            return [], {"engine": "file", "class": cls, "index": None,
+                        "kind": None, "candidates": 0, "order": None}
+        with FileStorage.__lock:
+            self.__range_index()
+            plan = self.__plan(cls, found, order, limit)
+            values, on = plan.pop("values", ()), plan.pop("on", [])
+            if not run:
+                return None, plan
+            if plan["kind"] == "hash":
+                children = FileStorage.__children
+                objs = [obj for value in values for obj in
+                        children.get((cls, plan["index"], value),
+                                     {}).values()]
+            elif plan["kind"] == "sorted":
+                index = FileStorage.__ranges.get((cls, plan["index"]))
+                keys = [] if index is None else index.keys(
+                    on, bool(order) and order[0][1])
+                objs = (self.__objects[key] for key in keys
+                        if key in self.__objects)
+            else:
+                objs = FileStorage.__classes.get(cls, {}).values()
+            objs = (obj for obj in objs if query.match(obj, found))
+            if plan["order"] == "sort":
+                objs = query.sort(objs, order)
+            return list(islice(objs, limit)), plan
+
+    def query(self, cls, where=None, order_by=None, limit=None):
+        """returns the list of the cls objects satisfying every predicate
+        of where, ordered by order_by and up to limit of them, as
+        described in models/engine/query.py; the candidates come from the
+        hash or sorted index giving the fewest"""
+        return self.__query(cls, where, order_by, limit)[0]
+
+    def nearby(self, cls, lat, lng, radius, limit=None):
+        """returns the (distance, object) of the cls objects positioned
+        within radius kilometers of (lat, lng), nearest first, and up to
+        limit of them, searched on the grid of their class"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        if cls not in positions:
+            return []
+        with FileStorage.__lock:
+            grid = self.__grid_index().get(cls)
+            if grid is None:
+                return []
+            return [(far, self.__objects[key]) for far, key in
+                    grid.nearest(lat, lng, radius, limit)
+                    if key in self.__objects]
+
+    def __range_index(self):
+        """returns the sorted indexes of ranges, built from the objects on
+        first use"""
+        self.__index()
+        with FileStorage.__lock:
+            if FileStorage.__ranges is None:
+                FileStorage.__ranges = {}
+                for name in ranges:
+                    for key, obj in FileStorage.__classes.get(
+                            name, {}).items():
+                        for attr in ranges[name]:
+                            self.__add_to_range(key, obj, attr)
+            return FileStorage.__ranges
+
+    def __created_index(self):
+        """returns the sorted indexes of created_at, built from the
+        objects on first use"""
+        self.__index()
+        with FileStorage.__lock:
+            if FileStorage.__created is None:
+                FileStorage.__created = {}
+                for key, obj in FileStorage.__objects.items():
+                    self.__add_to_created(key, obj)
+            return FileStorage.__created
+
+    def __grid_index(self):
+        """returns the grids of positions, built from the objects on first
+        use"""
+        self.__index()
+        with FileStorage.__lock:
+            if FileStorage.__grids is None:
+                FileStorage.__grids = {}
+                for name in positions:
+                    for key, obj in FileStorage.__classes.get(
+                            name, {}).items():
+                        self.__add_to_grid(key, obj)
+            return FileStorage.__grids
+
+    def __name_index(self):
+        """returns the name index, built from the objects on first use"""
+        self.__index()
+        with FileStorage.__lock:
+            if FileStorage.__names is None:
+                names = NameIndex()
+                for name, attr in suggest.fields.items():
+                    for key, obj in FileStorage.__classes.get(
+                            name, {}).items():
+                        names.add(key, getattr(obj, attr, None))
+                FileStorage.__names = names
+            return FileStorage.__names
+
+    def __text_index(self):
+        """returns the text index, read back from __text_path and brought
+        up to date with the objects on first use, then saved if that
+        took any tokenizing"""
+        self.__index()
+        with FileStorage.__lock:
+            if FileStorage.__texts is None:
+                index = text.read(self.__text_path)
+                index.sync(text.document(name, obj.__dict__)
+                           for name in text.fields
+                           for obj in
+                           FileStorage.__classes.get(name, {}).values())
+                FileStorage.__texts = index
+                self.save_text_index()
+                atexit.register(self.save_text_index)
+            return FileStorage.__texts
+
+    def save_text_index(self):
+        """saves the text index to __text_path if it changed since it was
+        read or saved"""
+        index = FileStorage.__texts
+        if index is not None:
+            text.write(index, self.__text_path)
+
+    def search_text(self, cls, q, limit=None):
+        """returns the (score, object) of the cls objects credited with
+        the documents matching the words of q, best first by their BM25
+        score and up to limit of them"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        index = self.__text_index()
+        prefix = cls + "."
+        with FileStorage.__lock:
+            found = [(score, self.__objects.get(key))
+                     for score, key in index.search(q, limit, prefix)]
+            if any(obj is None for score, obj in found):
+                found = [(score, self.__objects.get(key))
+                         for score, key in index.search(q, None, prefix)]
+        return [(score, obj) for score, obj in found
+                if obj is not None][:limit]
+
+    def suggest(self, prefix, types=None, limit=10):
+        """returns the (class name, id, name) of the first limit objects
+        of the classes of types, or of every class of suggest.fields,
+        whose name starts with prefix whatever the case, ordered by
+        name"""
+        if types is not None:
+            types = {cls if type(cls) is str else cls.__name__
+                     for cls in types}
+        return self.__name_index().suggest(prefix, types, limit)
+
+    def explain(self, cls, where=None, order_by=None, limit=None):
+        """returns how query() finds its objects: the attribute and kind
+        of the index used, None for a scan of the class, the number of
+        candidates it gives and whether the index or a sort orders them,
+        without running it"""
+        return self.__query(cls, where, order_by, limit, False)[1]
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """picks up the changes another process made to the file, or to
+        the shard files, without reading one at all while it is unchanged
+        and without decoding it while its content is; the failure of the
+        last write of the flusher, if any, is raised here"""
+        self.__flush_failed()
+        try:
+            with FileStorage.__disk_lock:
+                if self.__shards:
+                    with FileStorage.__lock:
+                        self.__close_shards()
+                else:
+                    with self.__journal_flock(fcntl.LOCK_SH):
+                        with FileStorage.__lock:
+                            self.__catch_up()
+        except (OSError, ValueError):
+            pass
 
-    def get(self, cls, id):
-        """ gets """
+    def get(self, cls, id, load=None):
+        """returns the object of class cls with the given id, or None;
+        load is accepted like in DBStorage"""
         if cls in classes.values() and id and type(id) == str:
-            d_obj = self.all(cls)
-            for k, v in d_obj.items():
-                if k.split(".")[1] == id:
-                    return v
+            return self.__objects.get(cls.__name__ + "." + id)
         return None
 
+    def counts(self):
+        """returns the number of objects of every class"""
+        buckets = self.__index()
+        return {name: len(buckets.get(name, {})) for name in classes}
+
     def count(self, cls=None):
-        """ counts """
-        data = self.all(cls)
-        if cls in classes.values():
-            data = self.all(cls)
-        return len(data)
+        """returns the number of objects in storage, optionally of cls"""
+        if cls is None:
+            return len(self.__objects)
+        if type(cls) is not str:
+            cls = cls.__name__
+        return len(self.__index().get(cls, {}))
+
+    def tally(self, cls, attr):
+        """returns the number of cls objects referring to each parent id
+        through attr, from the sizes of its foreign key index when attr is
+        one of relations, or by a scan otherwise"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        if attr in relations.get(cls, ()):
+            with FileStorage.__lock:
+                self.__index()
+                return {parent: len(children) for parent, children in
+                        self.__tallies.get((cls, attr), {}).items()
+                        if parent is not None}
+        found = {}
+        for value in self.column(cls, attr).values():
+            if type(value) is not list:
+                value = [value]
+            for parent in set(value):
+                if parent is not None:
+                    found[parent] = found.get(parent, 0) + 1
+        return found
+
+    def column(self, cls, attr):
+        """returns the value of attr of every cls object by id"""
+        return {obj.id: getattr(obj, attr, None)
+                for obj in self.all(cls).values()}
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+"""
+Contains the great-circle helpers of storage.nearby() and the GeoGrid
+class, the spatial index of the place coordinates.
+
+Latitudes and longitudes are in degrees and distances in kilometers; a
+place holding no coordinates, or coordinates out of range, is left out.
+"""
+
+import heapq
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+import threading
+
+# float - mean radius of the Earth in kilometers
+earth_radius = 6371.0088
+# dictionary - (latitude, longitude) attributes of the classes holding a
+# position
+positions = {"Place": ("latitude", "longitude")}
+
+
+def coordinates(lat, lng):
+    """returns (lat, lng) as floats when they are a valid position, or
+    None"""
+    if type(lat) not in (int, float) or type(lng) not in (int, float):
+        return None
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return None
+    return float(lat), float(lng)
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """returns the great-circle distance between two positions"""
+    lat1, lat2 = radians(lat1), radians(lat2)
+    h = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin(radians(lng2 - lng1) / 2) ** 2
+    return 2 * earth_radius * asin(min(1.0, sqrt(h)))
+
+
+def bounds(lat, lng, radius):
+    """returns the (south, north) latitudes and the (west, east)
+    longitude ranges of the box holding every position within radius of
+    (lat, lng); the box is split in two ranges when it crosses the
+    antimeridian"""
+    angle = degrees(radius / earth_radius)
+    south, north = max(-90.0, lat - angle), min(90.0, lat + angle)
+    if south == -90 or north == 90 or \
+            sin(radians(angle)) >= cos(radians(lat)):
+        return (south, north), [(-180.0, 180.0)]
+    spread = degrees(asin(sin(radians(angle)) / cos(radians(lat))))
+    west, east = lng - spread, lng + spread
+    if west < -180:
+        return (south, north), [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return (south, north), [(west, 180.0), (-180.0, east - 360)]
+    return (south, north), [(west, east)]
+
+
+def nearest(lat, lng, south, north, west, east):
+    """returns a lower bound of the distance from (lat, lng) to any
+    position of the box between the given latitudes and longitudes"""
+    gap = max(south - lat, lat - north, 0.0)
+    if west <= lng <= east:
+        spread = 0.0
+    else:
+        spread = min((west - lng) % 360, (lng - east) % 360)
+    low = min(cos(radians(south)), cos(radians(north)))
+    h = sin(radians(gap) / 2) ** 2 + \
+        cos(radians(lat)) * max(low, 0.0) * \
+        sin(radians(min(spread, 180.0)) / 2) ** 2
+    return 2 * earth_radius * asin(min(1.0, sqrt(h)))
+
+
+class Descending:
+    """orders keys the other way round, so that the heap of the nearest
+    keys drops the greatest key among those equally far"""
+
+    def __init__(self, key):
+        """wraps key"""
+        # string - the key wrapped
+        self.key = key
+
+    def __lt__(self, other):
+        """is less than other when its key is greater"""
+        return self.key > other.key
+
+    def __eq__(self, other):
+        """is equal to other when their keys are"""
+        return self.key == other.key
+
+
+class GeoGrid:
+    """the keys of the objects holding a position, bucketed in cells of
+    size degrees of latitude by size degrees of longitude. A search
+    visits the cells around a position by increasing lower bound of
+    their distance and stops once no further cell can hold a nearer
+    key"""
+
+    def __init__(self, size=0.5):
+        """Instantiate an empty grid of cells of size degrees"""
+        # float - degrees of latitude and of longitude spanned by a cell
+        self.size = size
+        # dictionary - {key: (lat, lng)} of each (row, column) cell
+        self.__cells = {}
+        # dictionary - (lat, lng, cell) of each key indexed
+        self.__points = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of keys indexed"""
+        return len(self.__points)
+
+    def __cell(self, lat, lng):
+        """returns the (row, column) of the cell holding (lat, lng)"""
+        rows = int(180 / self.size)
+        columns = int(360 / self.size)
+        return (min(int(floor((lat + 90) / self.size)), rows - 1),
+                min(int(floor((lng + 180) / self.size)), columns - 1))
+
+    def add(self, key, lat, lng):
+        """indexes key at (lat, lng), replacing its previous position, or
+        removes it when the position is not valid"""
+        found = coordinates(lat, lng)
+        with self.__lock:
+            self.__discard(key)
+            if found is None:
+                return
+            cell = self.__cell(*found)
+            self.__points[key] = found + (cell,)
+            self.__cells.setdefault(cell, {})[key] = found
+
+    def discard(self, key):
+        """removes key from the grid"""
+        with self.__lock:
+            self.__discard(key)
+
+    def __discard(self, key):
+        """removes key from its cell"""
+        point = self.__points.pop(key, None)
+        if point is None:
+            return
+        cell = self.__cells.get(point[2])
+        if cell is not None:
+            cell.pop(key, None)
+            if not cell:
+                del self.__cells[point[2]]
+
+    def __candidates(self, lat, lng, radius):
+        """returns the (bound, row, column) of the non empty cells the
+        circle of radius around (lat, lng) may reach"""
+        (south, north), spans = bounds(lat, lng, radius)
+        size = self.size
+        low, high = self.__cell(south, 0)[0], self.__cell(north, 0)[0]
+        columns = set()
+        for west, east in spans:
+            start, stop = self.__cell(0, west)[1], self.__cell(0, east)[1]
+            columns.update(range(start, stop + 1))
+        if (high - low + 1) * len(columns) > len(self.__cells):
+            cells = [cell for cell in self.__cells
+                     if low <= cell[0] <= high and cell[1] in columns]
+        else:
+            cells = [(row, column) for row in range(low, high + 1)
+                     for column in columns
+                     if (row, column) in self.__cells]
+        found = []
+        for row, column in cells:
+            bound = nearest(lat, lng, row * size - 90, (row + 1) * size - 90,
+                            column * size - 180, (column + 1) * size - 180)
+            if bound <= radius:
+                found.append((bound, row, column))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lng, radius, limit=None):
+        """returns the (distance, key) of the keys within radius of
+        (lat, lng), nearest first, and up to limit of them"""
+        found = []
+        with self.__lock:
+            for bound, row, column in self.__candidates(lat, lng, radius):
+                if limit is not None and len(found) >= limit and \
+                        bound > -found[0][0]:
+                    break
+                for key, point in self.__cells[(row, column)].items():
+                    far = distance(lat, lng, *point)
+                    if far > radius:
+                        continue
+                    entry = (-far, Descending(key))
+                    if limit is None or len(found) < limit:
+                        heapq.heappush(found, entry)
+                    elif entry > found[0]:
+                        heapq.heapreplace(found, entry)
+        return sorted((-far, key.key) for far, key in found)
@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""
+Contains the predicates of storage.query() and the SortedIndex class.
+
+A where dictionary maps each attribute to the value it must equal, or to
+a dictionary of operators and operands, every one of which must hold:
+
+    {"user_id": "1234", "price_by_night": {">=": 50, "<": 100},
+     "max_guest": {"in": [2, 4]}}
+
+order_by names an attribute, or a list of them, each sorted in
+descending order when prefixed by "-". The objects that compare equal
+are ordered by id, in the direction of the first attribute.
+"""
+
+from bisect import bisect_left
+import heapq
+import operator
+import threading
+
+# dictionary - the comparison of each operator of a predicate
+operators = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+             "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+             "in": lambda value, operand: value in operand}
+# dictionary - rank of each type a sorted index holds, values of other
+# types being left out
+ranks = {int: 0, float: 0, str: 1}
+# tuple - types an operand may have, the JSON scalars
+scalars = (str, int, float, bool, type(None))
+
+
+def predicates(where):
+    """returns the (attribute, operator, operand) triples of the where
+    dictionary, raising ValueError on an unknown operator or an operand
+    that is not a scalar"""
+    found = []
+    for attr, value in (where or {}).items():
+        if type(value) is not dict:
+            value = {"==": value}
+        for op, operand in value.items():
+            if op not in operators:
+                raise ValueError("unknown operator {}".format(op))
+            if op == "in":
+                if type(operand) in (str, dict) or \
+                        not hasattr(operand, "__iter__"):
+                    raise ValueError("in needs a list of values")
+                operand = list(operand)
+                values = operand
+            else:
+                values = [operand]
+            for item in values:
+                if type(item) not in scalars:
+                    raise ValueError("{} is not a scalar".format(
+                        type(item).__name__))
+            found.append((attr, op, operand))
+    return found
+
+
+def ordering(order_by):
+    """returns the (attribute, descending) pairs of order_by"""
+    if order_by is None:
+        return []
+    if type(order_by) is str:
+        order_by = [order_by]
+    return [(name[1:], True) if name.startswith("-") else (name, False)
+            for name in order_by]
+
+
+def rank(value):
+    """returns the (type rank, value) sort key of value, or None when a
+    sorted index does not hold values of its type"""
+    found = ranks.get(type(value))
+    if found is None:
+        if hasattr(value, "isoformat"):
+            return (2, value)
+        return None
+    return (found, value)
+
+
+def test(value, op, operand):
+    """tells if value satisfies the predicate of operator op and operand;
+    like in SQL, a missing value or one of another type satisfies no
+    comparison"""
+    if value is None and op != "==":
+        return False
+    try:
+        return operators[op](value, operand)
+    except TypeError:
+        return False
+
+
+def match(obj, found):
+    """tells if obj satisfies every (attribute, operator, operand) of
+    found"""
+    for attr, op, operand in found:
+        if not test(getattr(obj, attr, None), op, operand):
+            return False
+    return True
+
+
+def sort(objs, order):
+    """returns objs ordered by the (attribute, descending) pairs of order,
+    then by id; missing values come first like in SQL"""
+    objs = sorted(objs, key=lambda obj: obj.id,
+                  reverse=bool(order) and order[0][1])
+    for attr, descending in reversed(order):
+        objs.sort(key=lambda obj: rank(getattr(obj, attr, None)) or (-1,),
+                  reverse=descending)
+    return objs
+
+
+def run(objs, where=None, order_by=None, limit=None):
+    """returns the objs matching where, ordered by order_by and up to
+    limit, without any index"""
+    found = predicates(where)
+    objs = [obj for obj in objs if match(obj, found)]
+    if order_by is not None:
+        objs = sort(objs, ordering(order_by))
+    return objs if limit is None else objs[:limit]
+
+
+class Top:
+    """sorts after every key, bounding the entries of a value"""
+
+    def __lt__(self, other):
+        """is never less than another object"""
+        return False
+
+    def __gt__(self, other):
+        """is always greater than another object"""
+        return True
+
+
+# Top - bound past the last entry of a value
+top = Top()
+
+
+class SortedIndex:
+    """the keys of the objects holding a value of an indexed type for one
+    attribute, sorted by that value then by key. Changes are queued and
+    sorted by the next read into a run of recent entries, merged into the
+    sorted entries once it grows past a fraction of them, so that a read
+    after a few changes does not sort the whole index again; the entries
+    of the keys changed or removed since are skipped, and dropped once
+    they outnumber the others"""
+
+    def __init__(self):
+        """Instantiate an empty index"""
+        # dictionary - (type rank, value) of each key indexed
+        self.__ranks = {}
+        # list - (type rank, value, key) entries in order, some stale,
+        # replaced rather than changed so that keys() walks a snapshot
+        self.__entries = []
+        # list - entries sorted since the last merge into __entries,
+        # replaced rather than changed too
+        self.__recent = []
+        # list - entries added since the last read
+        self.__pending = []
+        # integer - stale entries in __entries, __recent and __pending
+        self.__stale = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of keys indexed"""
+        return len(self.__ranks)
+
+    def add(self, key, value):
+        """indexes key under value, replacing its previous value"""
+        found = rank(value)
+        with self.__lock:
+            self.__discard(key)
+            if found is not None:
+                self.__ranks[key] = found
+                self.__pending.append(found + (key,))
+
+    def discard(self, key):
+        """removes key from the index"""
+        with self.__lock:
+            self.__discard(key)
+
+    def __discard(self, key):
+        """removes key, leaving its entry stale"""
+        if self.__ranks.pop(key, None) is not None:
+            self.__stale += 1
+
+    def __settle(self):
+        """sorts the queued entries into the recent ones, merging those
+        into the sorted entries once they outnumber a sixteenth of them,
+        or rebuilds the entries without the stale ones once those
+        outnumber the others; returns the sorted runs of entries"""
+        if self.__stale > len(self.__ranks):
+            self.__entries = sorted(found + (key,) for key, found in
+                                    self.__ranks.items())
+            self.__recent = []
+            self.__pending = []
+            self.__stale = 0
+        elif self.__pending:
+            self.__recent = sorted(self.__recent + self.__pending)
+            self.__pending = []
+            if len(self.__recent) > max(256, len(self.__entries) // 16):
+                self.__entries = sorted(self.__entries + self.__recent)
+                self.__recent = []
+        if self.__recent:
+            return [self.__entries, self.__recent]
+        return [self.__entries]
+
+    @staticmethod
+    def __span(entries, op, operand):
+        """returns the (start, stop) ranges of the entries satisfying the
+        predicate of operator op and operand"""
+        if op == "in":
+            spans = []
+            for value in sorted({rank(value) for value in operand} -
+                                {None}):
+                spans.extend(SortedIndex.__span(entries, "==", value[1]))
+            return spans
+        found = rank(operand)
+        if found is None:
+            return []
+        start = bisect_left(entries, found[:1])
+        stop = bisect_left(entries, found[:1] + (top,))
+        if op in ("==", ">="):
+            start = max(start, bisect_left(entries, found))
+        elif op == ">":
+            start = max(start, bisect_left(entries, found + (top,)))
+        if op in ("==", "<="):
+            stop = min(stop, bisect_left(entries, found + (top,)))
+        elif op == "<":
+            stop = min(stop, bisect_left(entries, found))
+        return [(start, stop)] if start < stop else []
+
+    def __spans(self, found):
+        """returns the (entries, ranges) of each sorted run of entries,
+        the ranges holding those satisfying every (operator, operand) of
+        found"""
+        runs = []
+        for entries in self.__settle():
+            spans = [(0, len(entries))]
+            for op, operand in found:
+                spans = [(max(start, low), min(stop, high))
+                         for start, stop in spans
+                         for low, high in self.__span(entries, op, operand)
+                         if max(start, low) < min(stop, high)]
+            runs.append((entries, spans))
+        return runs
+
+    @staticmethod
+    def __walk(entries, spans, descending):
+        """yields the entries within spans, in order or the other way
+        round when descending"""
+        if descending:
+            for start, stop in reversed(spans):
+                for i in range(stop - 1, start - 1, -1):
+                    yield entries[i]
+        else:
+            for start, stop in spans:
+                for i in range(start, stop):
+                    yield entries[i]
+
+    def count(self, found=()):
+        """returns an estimate of the number of keys satisfying every
+        (operator, operand) of found: stale entries are counted"""
+        with self.__lock:
+            return sum(stop - start for entries, spans in self.__spans(found)
+                       for start, stop in spans)
+
+    def keys(self, found=(), descending=False):
+        """yields the keys satisfying every (operator, operand) of found,
+        ordered by value then key, or the other way round when
+        descending; the entries are read as they were on the first
+        call to next()"""
+        for value, key in self.items(found, descending):
+            yield key
+
+    def items(self, found=(), descending=False):
+        """yields the (value, key) of the keys keys() yields, in the same
+        order"""
+        with self.__lock:
+            runs = self.__spans(found)
+            seen = set() if self.__stale else None
+        ranked = self.__ranks
+        walks = [self.__walk(entries, spans, descending)
+                 for entries, spans in runs]
+        if len(walks) > 1:
+            walks = [heapq.merge(*walks, reverse=descending)]
+        for entry in walks[0]:
+            key = entry[2]
+            if ranked.get(key) != entry[:2]:
+                continue
+            if seen is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            yield entry[1], key
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Contains the layout of a sharded FileStorage: a directory holding one
+file per class, the large classes being hash partitioned over several
+files, and the process pool reading the files in parallel.
+
+A shard is named after its class, followed by its partition for the
+partitioned classes, and its file after the shard and the extension of
+the codec and compression that wrote it: State.json, Place.3.json.gz.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import gc
+from itertools import repeat
+from models.engine import codec
+import os
+import zlib
+
+# tuple - names of the classes hash partitioned over several shards
+partitioned = ("Place", "Review")
+
+
+def shard(key, partitions):
+    """returns the name of the shard holding the <class name>.id key when
+    the partitioned classes are spread over partitions shards"""
+    return partition(*key.split(".", 1), partitions)
+
+
+def partition(name, id, partitions):
+    """returns the name of the shard holding the object of the class
+    called name with the given id"""
+    if partitions > 1 and name in partitioned:
+        return name + "." + str(zlib.crc32(id.encode()) % partitions)
+    return name
+
+
+def path(directory, name, suffix):
+    """returns the path to the file of the shard called name"""
+    return os.path.join(directory, name + "." + suffix)
+
+
+def listing(directory):
+    """returns the paths to the shard files in directory by shard name,
+    leaving out the temp files of a write in progress"""
+    try:
+        files = os.listdir(directory)
+    except OSError:
+        return {}
+    found = {}
+    for file in files:
+        parts = file.split(".")
+        if len(parts) < 2 or file.endswith(".tmp"):
+            continue
+        name = parts[0]
+        if len(parts) > 2 and parts[1].isdigit():
+            name += "." + parts[1]
+        found[name] = os.path.join(directory, file)
+    return found
+
+
+def read(path, json_codec="json"):
+    """returns the sha1 digest and the records by key of the shard file
+    at path; the cyclic garbage collector is paused meanwhile"""
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return codec.read(path, json_codec)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def read_all(paths, json_codec="json", processes=1):
+    """returns the (digest, records) of each shard file in paths, by
+    path, read by a pool of up to processes worker processes, the
+    largest files first"""
+    paths = sorted(paths, key=lambda found: -os.path.getsize(found))
+    processes = min(processes, len(paths))
+    if processes <= 1:
+        return {found: read(found, json_codec) for found in paths}
+    with ProcessPoolExecutor(processes) as pool:
+        return dict(zip(paths, pool.map(read, paths, repeat(json_codec))))
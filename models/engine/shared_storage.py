@@ -0,0 +1,652 @@
+#!/usr/bin/python3
+"""
+Contains the SharedStorage class
+"""
+
+import fcntl
+import heapq
+from itertools import islice
+import os
+import threading
+import weakref
+from models.engine import codec, columns, geo, query, snapshot, suggest
+from models.engine import text
+from models.engine.suggest import NameIndex
+from models.engine.file_storage import classes, hydrate, relations
+
+
+class SharedStorage:
+    """serves the objects of a column snapshot that every process maps
+    read-only, materializing them on access; the objects created, changed
+    or deleted are kept in an overlay until save() republishes the
+    snapshot"""
+
+    # string - path to the column snapshot
+    __file_path = "file.cols"
+    # string - path to the FileStorage file the column snapshot is built
+    # from when it does not exist
+    __source_path = os.getenv("HBNB_SHARED_SOURCE", "file.json")
+    # Columns - the mapped column snapshot
+    __columns = None
+    # tuple - (inode, mtime, size) of the mapped column snapshot
+    __signature = None
+    # dictionary - objects created or changed since the last save by key
+    __overlay = {}
+    # set - keys of the objects deleted since the last save
+    __removed = set()
+    # WeakValueDictionary - objects materialized from the snapshot by key,
+    # kept only while something else refers to them
+    __cache = weakref.WeakValueDictionary()
+    # WeakSet - objects materialized or saved, from this snapshot or an
+    # earlier one, whose edits are added to the overlay while their key
+    # is still stored
+    __tracked = weakref.WeakSet()
+    # TextIndex - the documents of the classes of text.fields, synced
+    # with the mapped column snapshot on first use and after a remap
+    __texts = None
+    # Columns - the column snapshot the text index was synced with
+    __texts_columns = None
+    # string - path to the file the text index is saved to
+    __text_path = os.getenv("HBNB_TEXT_INDEX", "file.cols.text")
+    # NameIndex - the names of the objects of the classes of
+    # suggest.fields, synced with the mapped column snapshot on first use
+    # and after a remap
+    __names = None
+    # Columns - the column snapshot the name index was synced with
+    __names_columns = None
+    # dictionary - {parent id: rows} of each (class name, attribute) of
+    # the mapped column snapshot, tallied on first use
+    __tallies = {}
+    # Columns - the column snapshot __tallies was tallied from
+    __tallies_columns = None
+    # lock - serializes the changes to the overlay and the remapping
+    __lock = threading.RLock()
+
+    def __stat(self):
+        """returns the (inode, mtime, size) signature of the snapshot"""
+        st = os.stat(self.__file_path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __flock(self):
+        """returns the open lock file of the snapshot, locked exclusively
+        against the other processes; closing it releases the lock"""
+        f = open(self.__file_path + ".lock", "a")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return f
+
+    def __map(self):
+        """maps the current column snapshot, forgetting the objects
+        materialized from the previous one"""
+        SharedStorage.__columns = columns.Columns(self.__file_path)
+        SharedStorage.__signature = self.__stat()
+        SharedStorage.__cache = weakref.WeakValueDictionary()
+
+    def __refresh(self):
+        """maps the snapshot again if another process republished it"""
+        if self.__stat() != self.__signature:
+            self.__map()
+
+    def __source(self):
+        """returns the records of the FileStorage file the column snapshot
+        is built from, whatever codec and compression wrote it"""
+        try:
+            digest, records = codec.read(self.__source_path)
+        except OSError:
+            return []
+        return [snapshot.record(record) for record in records.values()]
+
+    def reload(self):
+        """maps the column snapshot, building it first from the JSON file
+        if it does not exist"""
+        with SharedStorage.__lock:
+            if not os.path.exists(self.__file_path):
+                with self.__flock():
+                    if not os.path.exists(self.__file_path):
+                        columns.write(self.__file_path, self.__source(),
+                                      relations)
+            self.__map()
+
+    def close(self):
+        """picks up the snapshot another process republished, keeping the
+        changes not saved yet"""
+        with SharedStorage.__lock:
+            try:
+                self.__refresh()
+            except (OSError, ValueError):
+                pass
+
+    def __table(self, name):
+        """returns the mapped table of the class called name, or None"""
+        if self.__columns is None:
+            return None
+        return self.__columns.table(name)
+
+    def __materialize(self, table, row):
+        """returns the object stored in row of table, from the cache if it
+        is still there"""
+        key = table.name + "." + table.ids[row]
+        obj = self.__cache.get(key)
+        if obj is None:
+            obj = hydrate(table.name, table.record(row))
+            self.__cache[key] = obj
+            self.__tracked.add(obj)
+        return obj
+
+    def __base(self, name):
+        """returns the (key, row) of the rows of the class called name that
+        the overlay does not replace or delete"""
+        table = self.__table(name)
+        if table is None:
+            return []
+        prefix = name + "."
+        found = []
+        for row in range(table.rows):
+            key = prefix + table.ids[row]
+            if key not in self.__overlay and key not in self.__removed:
+                found.append((key, row))
+        return found
+
+    def all(self, cls=None, load=None):
+        """returns a dictionary of the objects, or of the objects of class
+        cls, materializing them; load is accepted like in DBStorage"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        names = classes if cls is None else [cls]
+        found = {}
+        with SharedStorage.__lock:
+            for name in names:
+                table = self.__table(name)
+                for key, row in self.__base(name):
+                    found[key] = self.__materialize(table, row)
+            for key, obj in self.__overlay.items():
+                if cls is None or obj.__class__.__name__ == cls:
+                    found[key] = obj
+        return found
+
+    def new(self, obj):
+        """adds obj to the overlay of objects to save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with SharedStorage.__lock:
+                self.__overlay[key] = obj
+                self.__removed.discard(key)
+
+    def delete(self, obj=None):
+        """marks obj deleted until the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with SharedStorage.__lock:
+                self.__overlay.pop(key, None)
+                self.__cache.pop(key, None)
+                self.__removed.add(key)
+
+    def changed(self, obj, attr):
+        """adds a materialized or saved obj to the overlay after its
+        attribute attr was set, unless its key was deleted"""
+        if "id" not in obj.__dict__:
+            return
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        with SharedStorage.__lock:
+            if obj not in self.__tracked or key in self.__removed:
+                return
+            table = self.__table(name)
+            if key in self.__overlay or (table is not None and
+                                         table.find(obj.id) is not None):
+                self.__overlay[key] = obj
+
+    def save(self):
+        """republishes the snapshot with the overlay applied over the
+        latest one, under a lock shared with the other processes"""
+        with SharedStorage.__lock:
+            if not self.__overlay and not self.__removed:
+                return
+            with self.__flock():
+                if os.path.exists(self.__file_path):
+                    self.__refresh()
+                records = []
+                for name in classes:
+                    table = self.__table(name)
+                    for key, row in self.__base(name):
+                        record = table.record(row)
+                        record["__class__"] = name
+                        records.append(record)
+                records.extend(obj.to_dict(secure_pwd=False)
+                               for obj in self.__overlay.values())
+                columns.write(self.__file_path, records, relations)
+                saved = self.__overlay
+                SharedStorage.__overlay = {}
+                SharedStorage.__removed = set()
+                self.__map()
+                for key, obj in saved.items():
+                    self.__cache[key] = obj
+                    self.__tracked.add(obj)
+
+    def get(self, cls, id, load=None):
+        """returns the object of class cls with the given id, or None;
+        load is accepted like in DBStorage"""
+        if cls not in classes.values() or not id or type(id) != str:
+            return None
+        key = cls.__name__ + "." + id
+        with SharedStorage.__lock:
+            if key in self.__overlay:
+                return self.__overlay[key]
+            if key in self.__removed:
+                return None
+            table = self.__table(cls.__name__)
+            row = None if table is None else table.find(id)
+            if row is None:
+                return None
+            return self.__materialize(table, row)
+
+    def count(self, cls=None):
+        """returns the number of objects in storage, optionally of cls"""
+        if cls is None:
+            return sum(self.counts().values())
+        if type(cls) is not str:
+            cls = cls.__name__
+        return self.counts().get(cls, 0)
+
+    def __replaced(self):
+        """returns the (class name, row) of the rows of the snapshot that
+        the overlay replaces or deletes"""
+        found = []
+        for key in self.__removed | set(self.__overlay):
+            name, id = key.split(".", 1)
+            table = self.__table(name)
+            row = None if table is None else table.find(id)
+            if row is not None:
+                found.append((name, row))
+        return found
+
+    def counts(self):
+        """returns the number of objects of every class, from the number
+        of rows of each table corrected by the overlay"""
+        with SharedStorage.__lock:
+            found = {}
+            for name in classes:
+                table = self.__table(name)
+                found[name] = 0 if table is None else table.rows
+            for name, row in self.__replaced():
+                found[name] -= 1
+            for obj in self.__overlay.values():
+                found[obj.__class__.__name__] += 1
+        return found
+
+    @staticmethod
+    def __parents(value):
+        """returns the parent ids a foreign key attribute value refers
+        to"""
+        if type(value) is list:
+            return [item for item in set(value) if type(item) is str]
+        return [value] if type(value) is str else []
+
+    def tally(self, cls, attr):
+        """returns the number of cls objects referring to each parent id
+        through attr, tallied once per snapshot then corrected by the
+        overlay; a row without attr holds the default of the class, as a
+        materialized object would"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        default = getattr(classes.get(cls), attr, None)
+        with SharedStorage.__lock:
+            if SharedStorage.__tallies_columns is not self.__columns:
+                SharedStorage.__tallies = {}
+                SharedStorage.__tallies_columns = self.__columns
+            table = self.__table(cls)
+            base = self.__tallies.get((cls, attr))
+            if base is None:
+                base = {}
+                for row in range(0 if table is None else table.rows):
+                    for parent in self.__parents(table.value(row, attr,
+                                                             default)):
+                        base[parent] = base.get(parent, 0) + 1
+                self.__tallies[(cls, attr)] = base
+            found = dict(base)
+            for name, row in self.__replaced():
+                if name == cls:
+                    for parent in self.__parents(table.value(row, attr,
+                                                             default)):
+                        found[parent] -= 1
+                        if not found[parent]:
+                            del found[parent]
+            for obj in self.__overlay.values():
+                if obj.__class__.__name__ == cls:
+                    for parent in self.__parents(getattr(obj, attr, None)):
+                        found[parent] = found.get(parent, 0) + 1
+        return found
+
+    def column(self, cls, attr):
+        """returns the value of attr of every cls object by id, read from
+        the column without materializing the objects, or the default of
+        the class when a row does not hold it"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        default = getattr(classes.get(cls), attr, None)
+        with SharedStorage.__lock:
+            table = self.__table(cls)
+            found = {key[len(cls) + 1:]: table.value(row, attr, default)
+                     for key, row in self.__base(cls)}
+            for obj in self.__overlay.values():
+                if obj.__class__.__name__ == cls:
+                    found[obj.id] = getattr(obj, attr, None)
+        return found
+
+    @staticmethod
+    def __refers(value, id):
+        """tells if the value of a foreign key attribute refers to id"""
+        return id in value if type(value) is list else value == id
+
+    def __related_overlay(self, cls, attr, id):
+        """returns the cls objects of the overlay whose attr refers to id,
+        or all of them when attr is None"""
+        return [obj for obj in self.__overlay.values()
+                if obj.__class__.__name__ == cls and
+                (attr is None or self.__refers(getattr(obj, attr, None), id))]
+
+    def __related_rows(self, cls, attr, id):
+        """returns the table of class cls and the (key, row) of its rows
+        whose attr refers to id, the overlay left out"""
+        table = self.__table(cls)
+        if table is None:
+            return None, []
+        rows = table.related(attr, id)
+        if rows is None:
+            rows = [row for row in range(table.rows)
+                    if self.__refers(table.value(row, attr), id)]
+        prefix = cls + "."
+        found = []
+        for row in rows:
+            key = prefix + table.ids[row]
+            if key not in self.__overlay and key not in self.__removed:
+                found.append((key, row))
+        return table, found
+
+    def related(self, cls, attr, id):
+        """returns the list of cls objects whose attr refers to id"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        with SharedStorage.__lock:
+            table, rows = self.__related_rows(cls, attr, id)
+            found = [self.__materialize(table, row) for key, row in rows]
+            found.extend(self.__related_overlay(cls, attr, id))
+        return found
+
+    def __related_ids(self, cls, attr, id):
+        """returns the set of the ids of the cls objects whose attr refers
+        to id, without materializing them"""
+        with SharedStorage.__lock:
+            table, rows = self.__related_rows(cls, attr, id)
+            found = {table.ids[row] for key, row in rows}
+            found.update(obj.id for obj in
+                         self.__related_overlay(cls, attr, id))
+        return found
+
+    def walk(self, cls, after=None, attr=None, id=None):
+        """yields the objects of class cls, or those whose attr refers to
+        id, ordered by created_at and id and following the (created_at,
+        id) cursor after unless it is None"""
+        if type(cls) is not str:
+            cls = cls.__name__
+
+        def key(obj):
+            """the paging key of obj"""
+            return (obj.created_at, obj.id)
+        with SharedStorage.__lock:
+            overlay = sorted((obj for obj in
+                              self.__related_overlay(cls, attr, id)
+                              if after is None or key(obj) > after), key=key)
+            if attr is None:
+                base = self.__ordered(cls, after)
+            else:
+                table, rows = self.__related_rows(cls, attr, id)
+                base = sorted((obj for obj in
+                               (self.__materialize(table, row)
+                                for key_, row in rows)
+                               if after is None or key(obj) > after),
+                              key=key)
+        for obj in heapq.merge(base, overlay, key=key):
+            yield obj
+
+    def __ordered(self, cls, after):
+        """yields the objects of the snapshot of class cls in order,
+        following the cursor after, unless the overlay replaces or deletes
+        them"""
+        table = self.__table(cls)
+        if table is None:
+            return
+        cursor = None
+        if after is not None:
+            cursor = (after[0].isoformat(timespec="microseconds"), after[1])
+        prefix = cls + "."
+        for row in table.ordered(cursor):
+            with SharedStorage.__lock:
+                key = prefix + table.ids[row]
+                if key in self.__overlay or key in self.__removed:
+                    continue
+                if self.__table(cls) is table:
+                    obj = self.__materialize(table, row)
+                else:
+                    obj = hydrate(cls, table.record(row))
+            yield obj
+
+    def page(self, cls, limit, after=None, attr=None, id=None):
+        """returns up to limit objects walk() would yield"""
+        return list(islice(self.walk(cls, after, attr, id), limit))
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """returns the places in the given states or cities, or anywhere
+        when neither is given, that have every given amenity; the ids are
+        matched on the postings before any place is materialized"""
+        from models.amenity import Amenity
+        from models.city import City
+        from models.place import Place
+        from models.state import State
+        with SharedStorage.__lock:
+            place_ids = None
+            if states or cities:
+                city_ids = list(cities or ())
+                for state_id in states or ():
+                    if self.get(State, state_id) is not None:
+                        city_ids.extend(self.__related_ids(
+                            "City", "state_id", state_id))
+                place_ids = set()
+                for city_id in city_ids:
+                    if self.get(City, city_id) is not None:
+                        place_ids |= self.__related_ids("Place", "city_id",
+                                                        city_id)
+            for amenity_id in amenities or ():
+                if self.get(Amenity, amenity_id) is None:
+                    return []
+                found = self.__related_ids("Place", "amenity_ids",
+                                           amenity_id)
+                place_ids = found if place_ids is None else place_ids & found
+            if place_ids is None:
+                return list(self.all(Place).values())
+            return [place for place in
+                    (self.get(Place, id) for id in place_ids)
+                    if place is not None]
+
+    def __query(self, cls, where, order_by, limit, run=True):
+        """returns the objects of query(), or None unless run, and the
+        plan that finds them"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        found = query.predicates(where)
+        order = query.ordering(order_by)
+        plan = {"engine": "shared", "class": cls, "index": None,
+                "kind": None, "candidates": 0, "order": None}
+        if cls not in classes:
+            return [], plan
+        if order:
+            plan["order"] = "sort"
+        with SharedStorage.__lock:
+            ids = None
+            for attr in dict.fromkeys(attr for attr, op, operand in found):
+                if attr not in relations.get(cls, ()) or \
+                        type(getattr(classes[cls], attr, None)) is list:
+                    continue
+                values = None
+                try:
+                    for a, op, operand in found:
+                        if a == attr and op in ("==", "in"):
+                            operand = [operand] if op == "==" else operand
+                            values = set(operand) if values is None else \
+                                values & set(operand)
+                except TypeError:
+                    continue
+                if values is None:
+                    continue
+                option = set()
+                for value in values:
+                    option |= self.__related_ids(cls, attr, value)
+                if ids is None or len(option) < len(ids):
+                    ids = option
+                    plan.update(index=attr, kind="hash")
+            if ids is None:
+                plan["candidates"] = self.count(cls)
+            else:
+                plan["candidates"] = len(ids)
+            if not run:
+                return None, plan
+            if ids is None:
+                objs = self.all(cls).values()
+            else:
+                objs = (self.get(classes[cls], id) for id in sorted(ids))
+            objs = [obj for obj in objs
+                    if obj is not None and query.match(obj, found)]
+        if order:
+            objs = query.sort(objs, order)
+        return objs if limit is None else objs[:limit], plan
+
+    def query(self, cls, where=None, order_by=None, limit=None):
+        """returns the list of the cls objects satisfying every predicate
+        of where, ordered by order_by and up to limit of them, as
+        described in models/engine/query.py; the equality predicates on
+        foreign keys are matched on the postings first"""
+        return self.__query(cls, where, order_by, limit)[0]
+
+    def explain(self, cls, where=None, order_by=None, limit=None):
+        """returns how query() finds its objects, without running it"""
+        return self.__query(cls, where, order_by, limit, False)[1]
+
+    def nearby(self, cls, lat, lng, radius, limit=None):
+        """returns the (distance, object) of the cls objects positioned
+        within radius kilometers of (lat, lng), nearest first, and up to
+        limit of them; the positions are read from the columns and only
+        the objects found are materialized, those without one are
+        skipped"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        if cls not in geo.positions:
+            return []
+        attrs = geo.positions[cls]
+        found = []
+        with SharedStorage.__lock:
+            table = self.__table(cls)
+            for key, row in self.__base(cls):
+                position = geo.coordinates(*(table.value(row, attr)
+                                             for attr in attrs))
+                if position is not None:
+                    far = geo.distance(lat, lng, *position)
+                    if far <= radius:
+                        found.append((far, table.ids[row], row))
+            for obj in self.__related_overlay(cls, None, None):
+                position = geo.coordinates(*(obj.__dict__.get(attr)
+                                             for attr in attrs))
+                if position is not None:
+                    far = geo.distance(lat, lng, *position)
+                    if far <= radius:
+                        found.append((far, obj.id, obj))
+            if limit is None:
+                found.sort(key=lambda item: item[:2])
+            else:
+                found = heapq.nsmallest(limit, found,
+                                        key=lambda item: item[:2])
+            return [(far, self.__materialize(table, row)
+                     if type(row) is int else row)
+                    for far, id, row in found]
+
+    def __text_index(self):
+        """returns the text index, read back from __text_path and synced
+        with the rows of the column snapshot whenever another one is
+        mapped, then brought up to date with the overlay"""
+        with SharedStorage.__lock:
+            index = SharedStorage.__texts
+            if index is None or \
+                    SharedStorage.__texts_columns is not self.__columns:
+                if index is None:
+                    index = text.read(self.__text_path)
+                documents = []
+                for name, attrs in text.fields.items():
+                    table = self.__table(name)
+                    attrs = ("id",) + attrs + \
+                        text.owners.get(name, (None,))[1:]
+                    for key, row in self.__base(name):
+                        documents.append(text.document(name, {
+                            attr: table.value(row, attr) for attr in attrs}))
+                index.sync(documents)
+                SharedStorage.__texts = index
+                SharedStorage.__texts_columns = self.__columns
+                text.write(index, self.__text_path)
+            for key, obj in self.__overlay.items():
+                name = obj.__class__.__name__
+                if name in text.fields:
+                    index.add(*text.document(name, obj.__dict__))
+            for key in self.__removed:
+                index.discard(key)
+            return index
+
+    def search_text(self, cls, q, limit=None):
+        """returns the (score, object) of the cls objects credited with
+        the documents matching the words of q, best first by their BM25
+        score and up to limit of them"""
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        if cls not in classes:
+            return []
+        index = self.__text_index()
+        prefix = cls + "."
+        for found in [index.search(q, limit, prefix),
+                      index.search(q, None, prefix)]:
+            objs = [(score, self.get(classes[cls], key[len(prefix):]))
+                    for score, key in found]
+            if limit is None or all(obj is not None for score, obj in objs):
+                break
+        return [(score, obj) for score, obj in objs
+                if obj is not None][:limit]
+
+    def __name_index(self):
+        """returns the name index, synced with the rows of the column
+        snapshot whenever another one is mapped, then brought up to date
+        with the overlay"""
+        with SharedStorage.__lock:
+            index = SharedStorage.__names
+            if index is None or \
+                    SharedStorage.__names_columns is not self.__columns:
+                index = index or NameIndex()
+                names = []
+                for name, attr in suggest.fields.items():
+                    table = self.__table(name)
+                    names.extend((key, table.value(row, attr))
+                                 for key, row in self.__base(name))
+                index.sync(names)
+                SharedStorage.__names = index
+                SharedStorage.__names_columns = self.__columns
+            for key, obj in self.__overlay.items():
+                name = obj.__class__.__name__
+                if name in suggest.fields:
+                    index.add(key, getattr(obj, suggest.fields[name], None))
+            for key in self.__removed:
+                index.discard(key)
+            return index
+
+    def suggest(self, prefix, types=None, limit=10):
+        """returns the (class name, id, name) of the first limit objects
+        of the classes of types, or of every class of suggest.fields,
+        whose name starts with prefix whatever the case, ordered by
+        name"""
+        if types is not None:
+            types = {cls if type(cls) is str else cls.__name__
+                     for cls in types}
+        return self.__name_index().suggest(prefix, types, limit)
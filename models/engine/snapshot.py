@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Contains the binary snapshot format of FileStorage: a magic number, a
+format version, then lists of rows, one row per record, each encoded by
+marshal after its length. A row is the tuple (class name, attribute
+names, values) with the id first. marshal stores a string object once
+and refers to it after that, so the rows of a list share one instance of
+each class name, set of attribute names and repeated id, which makes
+each list its own string table. Version 1 held all the rows in a single
+list with no length.
+"""
+
+import io
+import json
+import marshal
+import struct
+
+# bytes - the first bytes of every binary snapshot
+magic = b"HBNB"
+# integer - version of the layout written after the magic number
+version = 2
+# integer - rows per marshal list
+chunk = 4096
+# Struct - length of the marshal encoding of each list
+length = struct.Struct("<I")
+# dictionary - the one tuple of each set of attribute names in use
+shapes = {}
+
+
+def is_snapshot(data):
+    """tells if data is a binary snapshot rather than JSON"""
+    return data[:len(magic)] == magic
+
+
+def row(record, strings=None):
+    """returns the row of a record given as a row, a dictionary or its
+    JSON encoding; its string values are replaced by the equal ones
+    already in the dictionary strings, if given"""
+    if type(record) is tuple:
+        return record
+    if type(record) is str:
+        record = json.loads(record)
+    attrs = dict(record)
+    name = attrs.pop("__class__")
+    values = [attrs.pop("id")]
+    fields = ("id",) + tuple(attrs)
+    values.extend(attrs.values())
+    if strings is not None:
+        name = strings.setdefault(name, name)
+        values = [strings.setdefault(value, value)
+                  if type(value) is str else value for value in values]
+    return (name, shapes.setdefault(fields, fields), tuple(values))
+
+
+def record(value):
+    """returns the dictionary of a record given as a row, a dictionary or
+    its JSON encoding"""
+    if type(value) is tuple:
+        name, fields, values = value
+        found = dict(zip(fields, values))
+        found["__class__"] = name
+        return found
+    if type(value) is str:
+        return json.loads(value)
+    return value
+
+
+def dump(records, f):
+    """writes the binary snapshot of records, a dictionary of records by
+    <class name>.id key given in any form row() accepts, to the binary
+    file f; the records of a list that are not rows yet share their
+    equal strings"""
+    f.write(magic + bytes((version,)))
+    strings = {}
+    rows = []
+    for value in records.values():
+        rows.append(row(value, strings))
+        if len(rows) == chunk:
+            data = marshal.dumps(rows, 4)
+            f.write(length.pack(len(data)) + data)
+            strings = {}
+            rows = []
+    if rows:
+        data = marshal.dumps(rows, 4)
+        f.write(length.pack(len(data)) + data)
+
+
+def load(f):
+    """yields the (<class name>.id key, row) of the records of the binary
+    snapshot read from the binary file f"""
+    head = f.read(len(magic) + 1)
+    if not is_snapshot(head):
+        raise ValueError("not a binary snapshot")
+    if len(head) <= len(magic) or head[len(magic)] not in (1, version):
+        raise ValueError("unsupported snapshot version {}".format(
+            head[len(magic):]))
+    if head[len(magic)] == 1:
+        lists = [f.read()]
+    else:
+        lists = iter(lambda: read_list(f), b"")
+    for data in lists:
+        try:
+            rows = marshal.loads(data)
+        except EOFError:
+            raise ValueError("truncated snapshot")
+        for found in rows:
+            yield found[0] + "." + found[2][0], found
+
+
+def read_list(f):
+    """returns the marshal encoding of the next list of rows read from
+    the binary file f, or b"" at its end"""
+    size = f.read(length.size)
+    if not size:
+        return b""
+    if len(size) < length.size:
+        raise ValueError("truncated snapshot")
+    return f.read(length.unpack(size)[0])
+
+
+def encode(records):
+    """returns the binary snapshot of records"""
+    f = io.BytesIO()
+    dump(records, f)
+    return f.getvalue()
+
+
+def decode(data):
+    """returns the rows of the binary snapshot data by <class name>.id
+    key"""
+    return dict(load(io.BytesIO(data)))
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from os import getenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with a SQLite database file, through the same SQLAlchemy
+    mapping as DBStorage"""
+
+    def __init__(self):
+        """Instantiate a SQLiteStorage object on HBNB_SQLITE_PATH"""
+        path = getenv('HBNB_SQLITE_PATH', 'hbnb.db')
+        # a shared pool of connections handed from thread to thread, each
+        # keeping the compiled form of the statements it ran so they are
+        # only prepared once whichever request thread borrows it
+        engine = create_engine('sqlite:///{}'.format(path),
+                               poolclass=QueuePool,
+                               connect_args={"check_same_thread": False,
+                                             "cached_statements": 256})
+        event.listen(engine, "connect", self.__configure)
+        super().__init__(engine)
+
+    @staticmethod
+    def __configure(dbapi_connection, connection_record):
+        """sets up every new connection: WAL journal so readers never
+        block the writer, and enforced foreign keys"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
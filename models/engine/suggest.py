@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Contains the NameIndex class, the prefix index of storage.suggest().
+
+The names of the objects of each class of fields are kept in a
+SortedIndex by their casefolded value, so that the names starting with a
+prefix are a single range of it, found by bisection and walked in order;
+the ranges of the classes asked for are merged.
+"""
+
+import heapq
+from models.engine.query import SortedIndex
+import threading
+
+# dictionary - attribute holding the name suggested of each class
+fields = {"Amenity": "name", "City": "name", "Place": "name",
+          "State": "name"}
+# string - the greatest character, bounding the names of a prefix
+last = chr(0x10ffff)
+
+
+class NameIndex:
+    """the names of the objects of the classes of fields, each class
+    sorted by casefolded name then by key"""
+
+    def __init__(self):
+        """Instantiate an empty index"""
+        # dictionary - SortedIndex of the casefolded names of each class
+        self.__indexes = {}
+        # dictionary - name of each key indexed
+        self.__names = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of keys indexed"""
+        return len(self.__names)
+
+    def add(self, key, name):
+        """indexes key under name, replacing its previous name, or
+        removes it when name is not a string"""
+        if type(name) is not str:
+            self.discard(key)
+            return
+        cls = key.partition(".")[0]
+        with self.__lock:
+            index = self.__indexes.get(cls)
+            if index is None:
+                index = self.__indexes[cls] = SortedIndex()
+            index.add(key, name.casefold())
+            self.__names[key] = name
+
+    def discard(self, key):
+        """removes key from the index"""
+        with self.__lock:
+            if self.__names.pop(key, None) is not None:
+                self.__indexes[key.partition(".")[0]].discard(key)
+
+    def sync(self, names):
+        """brings the index up to date with the (key, name) of names,
+        dropping the keys not among them"""
+        keys = set()
+        for key, name in names:
+            if self.__names.get(key) != name:
+                self.add(key, name)
+            keys.add(key)
+        for key in list(self.__names):
+            if key not in keys:
+                self.discard(key)
+
+    def suggest(self, prefix, types=None, limit=10):
+        """returns the (class name, id, name) of the first limit keys whose
+        name starts with prefix, whatever the case, among the classes of
+        types or of all of them, ordered by casefolded name then by key"""
+        prefix = prefix.casefold()
+        found = ((">=", prefix), ("<", prefix + last))
+        with self.__lock:
+            walks = [index.items(found) for cls, index in
+                     self.__indexes.items() if types is None or cls in types]
+        suggested = []
+        if limit is not None and limit < 1:
+            return suggested
+        for value, key in heapq.merge(*walks):
+            name = self.__names.get(key)
+            if name is not None:
+                cls, dot, id = key.partition(".")
+                suggested.append((cls, id, name))
+                if len(suggested) == limit:
+                    break
+        return suggested
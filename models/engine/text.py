@@ -0,0 +1,308 @@
+#!/usr/bin/python3
+"""
+Contains the tokenizer, the TextIndex class and the file format of the
+full-text search of storage.search_text().
+
+Each object of a class of fields is a document made of the text of those
+fields, and its score is credited to the object named by owners, by
+default itself: the text of a review counts toward its place. Documents
+are ranked by BM25.
+
+The index is saved to a file marshal encodes: a magic number, a format
+version, then the documents and the posting lists. Each document keeps
+the crc32 of its text, so that on load only the documents whose text
+changed since are tokenized again.
+"""
+
+import heapq
+from math import log
+import marshal
+import os
+import re
+import sys
+import threading
+import zlib
+
+# dictionary - attributes holding the text of the objects of each class
+fields = {"Place": ("name", "description"), "Review": ("text",)}
+# dictionary - (class name, attribute) of the object credited with the
+# score of the documents of each class, instead of the object itself
+owners = {"Review": ("Place", "place_id")}
+# float - BM25 term frequency saturation
+k1 = 1.2
+# float - BM25 document length normalization
+b = 0.75
+# bytes - the first bytes of every text index file
+magic = b"HBTX"
+# integer - version of the layout written after the magic number
+version = 1
+# pattern - a token: a run of letters and digits
+word = re.compile(r"[^\W_]+")
+
+
+def tokens(text):
+    """returns the lowercase tokens of text"""
+    return word.findall(text.casefold())
+
+
+def document(name, values):
+    """returns the key, the text and the owner key of the document of the
+    object of the class called name whose attributes are the mapping
+    values"""
+    key = name + "." + values["id"]
+    text = " ".join(value for value in (values.get(attr)
+                                        for attr in fields[name])
+                    if type(value) is str)
+    owner = key
+    if name in owners:
+        owner_name, attr = owners[name]
+        owner = owner_name + "." + str(values.get(attr))
+    return key, text, owner
+
+
+class TextIndex:
+    """posting lists of the tokens of every document, giving the number
+    of times each document holds each token. A search with a limit skips
+    the postings of the tokens too common to change the best scores,
+    like MaxScore: once the best limit scores exceed what the remaining
+    tokens can add, those are only looked up for the owners found"""
+
+    def __init__(self):
+        """Instantiate an empty index"""
+        # dictionary - (crc32, length, tokens, owner key) of each document
+        # by key, tokens holding each distinct token once
+        self.__documents = {}
+        # dictionary - {key: occurrences} of the documents of each token
+        self.__postings = {}
+        # dictionary - {key: None} of the documents of each owner key
+        self.__owned = {}
+        # dictionary - number of owners holding each number of documents
+        self.__shares = {}
+        # integer - tokens in all the documents
+        self.__total = 0
+        # integer - documents added or removed since the index was saved
+        self.changes = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of documents indexed"""
+        return len(self.__documents)
+
+    def __contains__(self, key):
+        """tells if key is indexed"""
+        return key in self.__documents
+
+    def keys(self):
+        """returns the keys of the documents indexed"""
+        with self.__lock:
+            return list(self.__documents)
+
+    def add(self, key, text, owner=None):
+        """indexes text as the document key credited to owner, by default
+        key, unless it is already indexed with the same text and owner"""
+        owner = owner or key
+        crc = zlib.crc32(owner.encode(), zlib.crc32(text.encode()))
+        with self.__lock:
+            known = self.__documents.get(key)
+            if known is not None and known[0] == crc and known[3] == owner:
+                return
+            self.__discard(key)
+            found = tokens(text)
+            counts = {}
+            for token in found:
+                counts[token] = counts.get(token, 0) + 1
+            postings = self.__postings
+            for token, count in counts.items():
+                token = sys.intern(token)
+                posting = postings.get(token)
+                if posting is None:
+                    posting = postings[token] = {}
+                posting[key] = count
+            self.__documents[key] = (crc, len(found), tuple(counts), owner)
+            self.__own(owner, key, True)
+            self.__total += len(found)
+            self.changes += 1
+
+    def discard(self, key):
+        """removes the document key"""
+        with self.__lock:
+            self.__discard(key)
+
+    def sync(self, documents):
+        """brings the index up to date with the (key, text, owner) of
+        documents, dropping the documents not among them"""
+        keys = set()
+        for key, text, owner in documents:
+            self.add(key, text, owner)
+            keys.add(key)
+        for key in self.keys():
+            if key not in keys:
+                self.discard(key)
+
+    def __discard(self, key):
+        """removes the document key from the postings of its tokens"""
+        known = self.__documents.pop(key, None)
+        if known is None:
+            return
+        for token in known[2]:
+            posting = self.__postings.get(token)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.__postings[token]
+        self.__own(known[3], key, False)
+        self.__total -= known[1]
+        self.changes += 1
+
+    def __own(self, owner, key, added):
+        """adds or removes key from the documents of owner"""
+        owned = self.__owned.get(owner)
+        if owned is None:
+            owned = self.__owned[owner] = {}
+        shares = self.__shares
+        if owned:
+            shares[len(owned)] -= 1
+            if not shares[len(owned)]:
+                del shares[len(owned)]
+        if added:
+            owned[key] = None
+        else:
+            owned.pop(key, None)
+        if owned:
+            shares[len(owned)] = shares.get(len(owned), 0) + 1
+        else:
+            del self.__owned[owner]
+
+    def __terms(self, query):
+        """returns the (bound, idf, posting) of the tokens of query that
+        are indexed, bound being the most a token adds to the score of an
+        owner, the highest bound first"""
+        documents = len(self.__documents)
+        most = max(self.__shares, default=1)
+        terms = []
+        for token in set(tokens(query)):
+            posting = self.__postings.get(token)
+            if posting:
+                idf = log(1 + (documents - len(posting) + 0.5) /
+                          (len(posting) + 0.5))
+                terms.append((idf * (k1 + 1) * most, idf, posting))
+        terms.sort(key=lambda term: -term[0])
+        return terms
+
+    def scores(self, query, limit=None, prefix=None):
+        """returns the BM25 score of each owner of the documents holding a
+        token of query, summed over its documents, of the owners whose
+        key starts with prefix if given; with a limit, only the scores
+        that may be among the best limit ones are returned"""
+        found = {}
+        with self.__lock:
+            documents = self.__documents
+            if not documents:
+                return found
+            base = k1 * (1 - b)
+            scale = k1 * b / (self.__total / len(documents) or 1.0)
+            terms = self.__terms(query)
+            remaining = sum(term[0] for term in terms)
+            threshold = None
+            while terms:
+                if limit is not None:
+                    best = heapq.nlargest(limit, (
+                        value for owner, value in found.items()
+                        if prefix is None or owner.startswith(prefix)))
+                    if len(best) == limit and best[-1] > remaining:
+                        threshold = best[-1]
+                        break
+                bound, idf, posting = terms.pop(0)
+                remaining -= bound
+                weight = idf * (k1 + 1)
+                get = found.get
+                for key, count in posting.items():
+                    document = documents[key]
+                    owner = document[3]
+                    found[owner] = get(owner, 0.0) + weight * count / (
+                        count + base + scale * document[1])
+            if prefix is not None:
+                found = {owner: value for owner, value in found.items()
+                         if owner.startswith(prefix)}
+            if threshold is None:
+                return found
+            owned = self.__owned
+            for owner, value in list(found.items()):
+                if value + remaining < threshold:
+                    del found[owner]
+                    continue
+                for bound, idf, posting in terms:
+                    for key in owned[owner]:
+                        count = posting.get(key)
+                        if count is not None:
+                            value += idf * (k1 + 1) * count / (
+                                count + base + scale * documents[key][1])
+                found[owner] = value
+        return found
+
+    def search(self, query, limit=None, prefix=None):
+        """returns the (score, owner key) of the owners of the documents
+        matching query, best first then by key, up to limit of them and
+        only those whose key starts with prefix if given"""
+        found = self.scores(query, limit, prefix).items()
+        if limit is None:
+            found = sorted(found, key=lambda item: (-item[1], item[0]))
+        else:
+            found = heapq.nsmallest(limit, found,
+                                    key=lambda item: (-item[1], item[0]))
+        return [(score, key) for key, score in found]
+
+    def dump(self, f):
+        """writes the index to the binary file f"""
+        with self.__lock:
+            data = marshal.dumps((self.__documents, self.__postings,
+                                  self.__owned, self.__shares,
+                                  self.__total))
+            self.changes = 0
+        f.write(magic + bytes([version]))
+        f.write(data)
+
+    @classmethod
+    def load(cls, f):
+        """returns the index read from the binary file f, raising
+        ValueError when it is not a text index of this version"""
+        head = f.read(len(magic) + 1)
+        if head[:len(magic)] != magic or head[len(magic):] != \
+                bytes([version]):
+            raise ValueError("not a text index")
+        try:
+            documents, postings, owned, shares, total = \
+                marshal.loads(f.read())
+        except (EOFError, TypeError) as e:
+            raise ValueError("truncated text index") from e
+        index = cls()
+        index.__documents = documents
+        index.__postings = postings
+        index.__owned = owned
+        index.__shares = shares
+        index.__total = total
+        return index
+
+
+def read(path):
+    """returns the index saved to the file at path, or an empty index
+    when it cannot be read"""
+    try:
+        with open(path, "rb") as f:
+            return TextIndex.load(f)
+    except (OSError, ValueError):
+        return TextIndex()
+
+
+def write(index, path):
+    """saves index to the file at path if it changed since it was read or
+    saved, replacing the file atomically"""
+    if not index.changes:
+        return
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            index.dump(f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
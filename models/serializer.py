@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the class Serializer and the serializer() lookup: the
+dictionary and JSON forms of the instances of a model class, compiled
+once from the fields the class declares
+"""
+
+from datetime import datetime
+import json
+import math
+from json.encoder import encode_basestring_ascii
+import sqlalchemy
+
+# dictionary - the Serializer of each model class, compiled on first use
+serializers = {}
+
+
+def serializer(cls):
+    """returns the Serializer of the model class cls"""
+    found = serializers.get(cls)
+    if found is None:
+        found = serializers[cls] = Serializer(cls)
+    return found
+
+
+def fields(cls):
+    """returns the (name, python type) of each field of the model class
+    cls: its columns, or its public class attributes in file mode, and
+    the names of its relationships to leave out"""
+    if hasattr(cls, "__table__"):
+        sqlalchemy.orm.configure_mappers()
+        columns = []
+        for column in cls.__table__.columns:
+            try:
+                kind = column.type.python_type
+            except NotImplementedError:
+                kind = object
+            columns.append((column.key, kind))
+        return columns, tuple(sqlalchemy.inspect(cls).relationships.keys())
+    found = {"id": str, "created_at": datetime, "updated_at": datetime}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith("_") or callable(value) or \
+                    isinstance(value, (property, staticmethod, classmethod)):
+                continue
+            found.setdefault(name, type(value))
+    return list(found.items()), ()
+
+
+class Serializer:
+    """to_dict and to_json of the instances of one model class; to_json
+    is generated from the fields of the class so that each known field is
+    encoded by the fastest encoder for its type"""
+
+    def __init__(self, cls):
+        """Compiles the serializer of the model class cls"""
+        self.cls = cls
+        self.fields, self.relationships = fields(cls)
+        self.to_json = self.__compile()
+
+    def to_dict(self, obj, secure_pwd=True):
+        """returns the dictionary of the instance attributes of obj, with
+        formatted datetimes and without its password unless secure_pwd
+        is False"""
+        new_dict = obj.__dict__.copy()
+        for name in ("created_at", "updated_at"):
+            value = new_dict.get(name)
+            if type(value) is datetime:
+                new_dict[name] = value.isoformat(timespec="microseconds")
+        new_dict["__class__"] = self.cls.__name__
+        new_dict.pop("_sa_instance_state", None)
+        for name in self.relationships:
+            new_dict.pop(name, None)
+        if secure_pwd:
+            new_dict.pop("password", None)
+        return new_dict
+
+    def __compile(self):
+        """returns the to_json function of the class, generated from its
+        fields"""
+        lines = ["def to_json(obj, secure_pwd=True):",
+                 "    d = obj.__dict__",
+                 "    parts = []",
+                 "    append = parts.append",
+                 "    n = '_sa_instance_state' in d"]
+        for name, kind in self.fields:
+            key = encode_basestring_ascii(name) + ": "
+            if kind is str:
+                value = "(_str(v) if type(v) is str else _dumps(v))"
+            elif kind is datetime:
+                value = ("('\"' + v.isoformat(timespec='microseconds') + "
+                         "'\"' if type(v) is _datetime else _dumps(v))")
+            elif kind is int:
+                value = "(_int(v) if type(v) is int else _dumps(v))"
+            elif kind is float:
+                value = ("(_float(v) if type(v) is float and _finite(v) "
+                         "else _dumps(v))")
+            elif kind is list:
+                value = ("('[' + ', '.join(map(_str, v)) + ']' if "
+                         "type(v) is list and all(type(i) is str for i in v) "
+                         "else _dumps(v))")
+            else:
+                value = "_dumps(v)"
+            indent = "    "
+            lines.append("    v = d.get({!r}, _missing)".format(name))
+            lines.append("    if v is not _missing:")
+            lines.append("        n += 1")
+            if name == "password":
+                lines.append("        if not secure_pwd:")
+                indent += "    "
+            lines.append(indent + "    append({!r} + {})".format(key, value))
+        skipped = {name for name, kind in self.fields}
+        skipped.update(self.relationships)
+        skipped.add("_sa_instance_state")
+        lines += ["    if len(d) > n:",
+                  "        for k, v in d.items():",
+                  "            if k not in _skipped and (k != 'password' or",
+                  "                                      not secure_pwd):",
+                  "                append(_str(k) + ': ' + _dumps(v))",
+                  "    append({!r})".format(
+                      '"__class__": ' + json.dumps(self.cls.__name__)),
+                  "    return '{' + ', '.join(parts) + '}'"]
+        scope = {"_missing": object(), "_str": encode_basestring_ascii,
+                 "_dumps": json.JSONEncoder().encode, "_int": int.__repr__,
+                 "_float": float.__repr__, "_finite": math.isfinite,
+                 "_datetime": datetime, "_skipped": frozenset(skipped)}
+        exec("\n".join(lines), scope)
+        return scope["to_json"]
@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+"""
+the test suite, whose modules building a text index save it to a
+temporary directory rather than next to file.json through
+move_text_index()
+"""
+
+import atexit
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.shared_storage import SharedStorage
+import os
+import shutil
+import tempfile
+
+# string - the temporary directory the text indexes are saved to
+directory = None
+
+
+def move_text_index():
+    """points the text index of every storage engine at the temporary
+    directory, created on first call and removed at exit"""
+    global directory
+    if directory is None:
+        directory = tempfile.mkdtemp()
+        atexit.register(shutil.rmtree, directory, True)
+    for engine in [DBStorage, FileStorage, SharedStorage]:
+        setattr(engine, "_{}__text_path".format(engine.__name__),
+                os.path.join(directory, engine.__name__ + ".text"))
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Contains the TestIndexDocs and TestStats classes
+"""
+
+from api.v1.app import app
+from api.v1.views import index
+import inspect
+import models
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the index views"""
+
+    def test_pep8_conformance_index(self):
+        """Test that api/v1/views/index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_index(self):
+        """Test that tests/test_api/test_v1/test_views/test_index.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_index_module_docstring(self):
+        """Test for the index.py module docstring"""
+        self.assertIsNot(index.__doc__, None,
+                         "index.py needs a docstring")
+
+    def test_index_func_docstrings(self):
+        """Test for the presence of docstrings in index functions"""
+        for name, func in inspect.getmembers(index, inspect.isfunction):
+            if func.__module__ == index.__name__:
+                self.assertIsNot(func.__doc__, None,
+                                 "{:s} needs a docstring".format(name))
+
+
+class TestStats(unittest.TestCase):
+    """Test the stats view"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates a state of two cities, one of them holding places"""
+        cls.client = app.test_client()
+        cls.user = User(email="stats@hbnb.io", password="pwd")
+        cls.user.save()
+        cls.state = State(name="Counted")
+        cls.state.save()
+        cls.cities = [City(name="Counted", state_id=cls.state.id)
+                      for i in range(2)]
+        for city in cls.cities:
+            city.save()
+        cls.places = [Place(name="Counted", city_id=cls.cities[0].id,
+                            user_id=cls.user.id) for i in range(3)]
+        for place in cls.places:
+            place.save()
+        models.storage.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Deletes the places, cities, state and user"""
+        for obj in cls.places + cls.cities + [cls.state, cls.user]:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    def get(self, args=""):
+        """returns the stats for the query string args"""
+        response = self.client.get('/api/v1/stats' + args)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_stats(self):
+        """Test that stats gives the number of objects of each class"""
+        counts = models.storage.counts()
+        self.assertEqual(self.get(), {
+            "amenities": counts["Amenity"], "cities": counts["City"],
+            "places": counts["Place"], "reviews": counts["Review"],
+            "states": counts["State"], "users": counts["User"]})
+
+    def test_stats_by(self):
+        """Test that by=state and by=city add the cities and places of
+        each state and the places of each city, following a move"""
+        stats = self.get("?by=state,city")
+        self.assertEqual(stats["by_state"][self.state.id],
+                         {"cities": 2, "places": 3})
+        self.assertEqual(stats["by_city"][self.cities[0].id],
+                         {"places": 3})
+        self.assertNotIn(self.cities[1].id, stats["by_city"])
+        self.assertEqual(stats["places"], sum(
+            found["places"] for found in stats["by_city"].values()))
+        self.assertNotIn("by_city", self.get("?by=state"))
+        place = models.storage.get(Place, self.places[0].id)
+        place.city_id = self.cities[1].id
+        place.save()
+        stats = self.get("?by=city")
+        self.assertEqual(stats["by_city"][self.cities[1].id],
+                         {"places": 1})
+        self.assertNotIn("by_state", stats)
+
+    def test_stats_invalid_by(self):
+        """Test that an unknown breakdown is rejected"""
+        response = self.client.get('/api/v1/stats?by=user')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "Invalid by"})
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""
+Contains the TestPaginationDocs and TestPagination classes
+"""
+
+from api.v1.app import app
+from api.v1.views import pagination
+from datetime import datetime, timedelta
+import inspect
+import json
+import models
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the pagination
+    module"""
+
+    def test_pep8_conformance_pagination(self):
+        """Test that api/v1/views/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pagination(self):
+        """Test that tests/test_api/test_v1/test_views/test_pagination.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_module_docstring(self):
+        """Test for the pagination.py module docstring"""
+        self.assertIsNot(pagination.__doc__, None,
+                         "pagination.py needs a docstring")
+
+    def test_pagination_func_docstrings(self):
+        """Test for the presence of docstrings in pagination functions"""
+        for name, func in inspect.getmembers(pagination,
+                                             inspect.isfunction):
+            if func.__module__ == pagination.__name__:
+                self.assertIsNot(func.__doc__, None,
+                                 "{:s} needs a docstring".format(name))
+
+
+class TestPagination(unittest.TestCase):
+    """Test the cursor pagination of the list views"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates a state holding 5 cities, 2 of them created at the same
+        time"""
+        cls.client = app.test_client()
+        cls.state = State(name="Paged")
+        cls.state.save()
+        start = datetime(2020, 1, 1)
+        cls.cities = []
+        for i in range(5):
+            city = City(name="City {}".format(i), state_id=cls.state.id)
+            city.created_at = start + timedelta(seconds=min(i, 3))
+            city.save()
+            cls.cities.append(city)
+        cls.cities.sort(key=lambda city: (city.created_at, city.id))
+        models.storage.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Deletes the state and its cities"""
+        for city in cls.cities:
+            models.storage.delete(models.storage.get(City, city.id))
+        models.storage.delete(models.storage.get(State, cls.state.id))
+        models.storage.save()
+
+    def url(self):
+        """returns the url listing the cities of the state"""
+        return '/api/v1/states/{}/cities'.format(self.state.id)
+
+    def test_walk_pages(self):
+        """Test that following the cursors lists every city once, in
+        order"""
+        ids = []
+        url = self.url() + '?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            self.assertLessEqual(len(page), 2)
+            ids.extend(city["id"] for city in page)
+            link = response.headers.get('Link')
+            url = None
+            if link:
+                url = link[link.index('/api'):link.index('>')]
+                self.assertIn(response.headers['X-Next-Cursor'], url)
+        self.assertEqual(ids, [city.id for city in self.cities])
+
+    def test_last_page_has_no_link(self):
+        """Test that the last page does not link to a next one"""
+        response = self.client.get(self.url() + '?limit=5')
+        self.assertEqual(len(response.get_json()), 5)
+        self.assertNotIn('Link', response.headers)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_limit_is_capped(self):
+        """Test that limit never goes over the page limit"""
+        limit = pagination.page_limit
+        try:
+            pagination.page_limit = 3
+            response = self.client.get(self.url() + '?limit=50')
+            self.assertEqual(len(response.get_json()), 3)
+            response = self.client.get(self.url())
+            self.assertEqual(len(response.get_json()), 3)
+        finally:
+            pagination.page_limit = limit
+
+    def test_invalid_arguments(self):
+        """Test that an invalid limit or cursor is a bad request"""
+        for query in ['limit=0', 'limit=a', 'cursor=abc', 'cursor=MTI=']:
+            with self.subTest(query=query):
+                response = self.client.get(self.url() + '?' + query)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(),
+                                 {"error": "Invalid limit or cursor"})
+
+    def test_list_states(self):
+        """Test that the top level lists are paged too"""
+        response = self.client.get('/api/v1/states?limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 1)
+
+    def test_stream_ndjson(self):
+        """Test that accepting NDJSON streams one city per line"""
+        response = self.client.get(
+            self.url(), headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines],
+                         [city.id for city in self.cities])
+
+    def test_stream_json_array(self):
+        """Test that ?stream=1 streams a JSON array in small chunks,
+        without a page limit"""
+        limit = pagination.page_limit
+        size = pagination.chunk_size
+        try:
+            pagination.page_limit = 2
+            pagination.chunk_size = 1
+            response = self.client.get(self.url() + '?stream=1')
+            self.assertTrue(response.is_streamed)
+            chunks = list(response.response)
+            self.assertGreater(len(chunks), 1)
+            cities = json.loads(b"".join(chunks))
+            self.assertEqual([city["id"] for city in cities],
+                             [city.id for city in self.cities])
+        finally:
+            pagination.page_limit = limit
+            pagination.chunk_size = size
+
+    def test_stream_after_cursor(self):
+        """Test that streaming starts after the cursor and stops at the
+        limit"""
+        cursor = pagination.cursor(self.cities[0])
+        response = self.client.get(self.url() + '?stream=1&limit=2&cursor=' +
+                                   cursor)
+        self.assertEqual([city["id"] for city in response.get_json()],
+                         [city.id for city in self.cities[1:3]])
+        response = self.client.get(self.url() + '?stream=1&cursor=' +
+                                   pagination.cursor(self.cities[-1]))
+        self.assertEqual(response.get_json(), [])
+
+    def test_stream_places_search(self):
+        """Test that places_search streams its results too"""
+        response = self.client.post(
+            '/api/v1/places_search', json={"states": [self.state.id]},
+            headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(response.get_data(as_text=True), "")
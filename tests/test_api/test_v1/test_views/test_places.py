@@ -0,0 +1,334 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs, TestPlacesSearch and TestPlacesNearby classes
+"""
+
+from api.v1.app import app
+from api.v1.views import places
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import pep8
+from sqlalchemy import event
+from tests import move_text_index
+import unittest
+
+
+def setUpModule():
+    """saves the text index of the storage to a temporary directory"""
+    move_text_index()
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the places views"""
+
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/views/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_places(self):
+        """Test that tests/test_api/test_v1/test_views/test_places.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_module_docstring(self):
+        """Test for the places.py module docstring"""
+        self.assertIsNot(places.__doc__, None,
+                         "places.py needs a docstring")
+
+
+class TestPlacesSearch(unittest.TestCase):
+    """Test the places_search view"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates a user, an amenity and a state to search in"""
+        cls.client = app.test_client()
+        cls.user = User(email="search@hbnb.io", password="pwd")
+        cls.user.save()
+        cls.amenity = Amenity(name="Wifi")
+        cls.amenity.save()
+        cls.state = State(name="Searchable")
+        cls.state.save()
+        cls.places = []
+
+    @classmethod
+    def tearDownClass(cls):
+        """Deletes everything the searches were run on"""
+        for id in cls.places:
+            models.storage.delete(models.storage.get(Place, id))
+        for city in list(models.storage.all(City).values()):
+            if city.state_id == cls.state.id:
+                models.storage.delete(city)
+        for obj in [cls.state, cls.amenity, cls.user]:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def add_cities(self, cities, places):
+        """adds cities to the state, each holding places linked to the
+        amenity"""
+        for i in range(cities):
+            city = City(name="City", state_id=self.state.id)
+            city.save()
+            for j in range(places):
+                place = Place(name="Place", city_id=city.id,
+                              user_id=self.user.id)
+                if models.storage_t == 'db':
+                    place.amenities.append(self.amenity)
+                else:
+                    place.amenities = self.amenity
+                place.save()
+                self.places.append(place.id)
+        models.storage.close()
+
+    def search(self, body):
+        """returns the ids found by places_search and the number of SQL
+        statements it issued"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        engine = getattr(models.storage, "_DBStorage__engine", None)
+        if engine is not None:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = self.client.post('/api/v1/places_search', json=body)
+        finally:
+            if engine is not None:
+                event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(response.status_code, 200)
+        return {p["id"] for p in response.get_json()}, len(statements)
+
+    def test_search_by_state_and_amenity(self):
+        """Test that places_search finds the places of a state having an
+        amenity"""
+        self.add_cities(2, 2)
+        body = {"states": [self.state.id], "amenities": [self.amenity.id]}
+        found, statements = self.search(body)
+        self.assertEqual(found, set(self.places))
+
+    def test_search_states_and_cities_once(self):
+        """Test that a place in both a listed state and a listed city is
+        returned once"""
+        self.add_cities(1, 1)
+        city = models.storage.get(Place, self.places[-1]).city_id
+        body = {"states": [self.state.id], "cities": [city]}
+        response = self.client.post('/api/v1/places_search', json=body)
+        ids = [p["id"] for p in response.get_json()]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), set(self.places))
+
+    def test_search_unknown_state_with_amenity(self):
+        """Test that places outside the listed states are not returned"""
+        self.add_cities(1, 1)
+        body = {"states": ["missing"], "amenities": [self.amenity.id]}
+        self.assertEqual(self.search(body)[0], set())
+
+    def test_search_empty_body(self):
+        """Test that an empty body returns every place, following the
+        cursor of each page to the next"""
+        self.add_cities(1, 1)
+        ids = []
+        url = '/api/v1/places_search'
+        while url:
+            response = self.client.post(url, json={})
+            self.assertEqual(response.status_code, 200)
+            ids.extend(place["id"] for place in response.get_json())
+            link = response.headers.get('Link')
+            url = link[link.index('/api'):link.index('>')] if link else None
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {place.id for place in
+                                    models.storage.all(Place).values()})
+
+    def test_search_follows_amenity_links(self):
+        """Test that linking and unlinking an amenity through the API is
+        seen by the next search"""
+        self.add_cities(1, 1)
+        pool = Amenity(name="Pool")
+        pool.save()
+        place_id = self.places[-1]
+        url = '/api/v1/places/{}/amenities/{}'.format(place_id, pool.id)
+        body = {"amenities": [self.amenity.id, pool.id]}
+        self.assertEqual(self.search(body)[0], set())
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.search(body)[0], {place_id})
+        self.assertEqual(self.client.delete(url).status_code, 200)
+        self.assertEqual(self.search(body)[0], set())
+        models.storage.delete(pool)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_statements_do_not_grow(self):
+        """Test that the statements issued by places_search do not grow
+        with the number of cities and places"""
+        self.add_cities(1, 1)
+        body = {"states": [self.state.id], "amenities": [self.amenity.id]}
+        self.search(body)
+        found, small = self.search(body)
+        self.add_cities(3, 4)
+        found, large = self.search(body)
+        self.assertEqual(found, set(self.places))
+        self.assertEqual(small, large)
+
+    def test_search_where(self):
+        """Test that the where of places_search filters the places found,
+        with or without states"""
+        self.add_cities(1, 4)
+        for price, id in enumerate(self.places[-4:]):
+            place = models.storage.get(Place, id)
+            place.price_by_night = price * 10
+            place.save()
+        models.storage.close()
+        where = {"price_by_night": {">=": 10, "<": 30},
+                 "user_id": self.user.id}
+        expected = set(self.places[-3:-1])
+        self.assertEqual(self.search({"where": where})[0], expected)
+        body = {"states": [self.state.id], "where": where}
+        self.assertEqual(self.search(body)[0], expected)
+        body = {"where": {"max_guest": {"in": [0]},
+                          "user_id": self.user.id}}
+        self.assertEqual(self.search(body)[0], set(self.places))
+
+    def test_search_invalid_where(self):
+        """Test that an unknown attribute or operator, or an operand that
+        is not a scalar, in where is rejected"""
+        for where in [{"name": "Place"}, {"price_by_night": {"~": 1}},
+                      {"max_guest": {"in": 2}}, ["max_guest"],
+                      {"user_id": {"in": [{"a": 1}]}},
+                      {"max_guest": {">": [1]}}]:
+            with self.subTest(where=where):
+                response = self.client.post('/api/v1/places_search',
+                                            json={"where": where})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(),
+                                 {"error": "Invalid where"})
+
+    def test_search_invalid_lists(self):
+        """Test that states, cities or amenities which are not a list are
+        rejected"""
+        for key in ["states", "cities", "amenities"]:
+            for value in [5, "abc", {"a": 1}]:
+                with self.subTest(key=key, value=value):
+                    response = self.client.post('/api/v1/places_search',
+                                                json={key: value})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.get_json(),
+                                     {"error": "Invalid " + key})
+
+    def test_search_text(self):
+        """Test that q ranks the places by the words of their text and of
+        their reviews, with their score, within the filters given"""
+        self.add_cities(1, 3)
+        first, second, third = self.places[-3:]
+        texts = {first: "Quokka cottage", second: "Quokka quokka hut",
+                 third: "Plain hut"}
+        for id, description in texts.items():
+            place = models.storage.get(Place, id)
+            place.description = description
+            place.save()
+        review = Review(place_id=third, user_id=self.user.id,
+                        text="quokka everywhere, quokka quokka")
+        review.save()
+        models.storage.close()
+        response = self.client.post('/api/v1/places_search?limit=2',
+                                    json={"q": "QUOKKA"})
+        self.assertEqual(response.status_code, 200)
+        found = response.get_json()
+        self.assertEqual([place["id"] for place in found], [third, second])
+        self.assertTrue(found[0]["score"] > found[1]["score"] > 0)
+        body = {"q": "quokka hut", "where": {"max_guest": 0},
+                "cities": [models.storage.get(Place, first).city_id]}
+        response = self.client.post('/api/v1/places_search', json=body)
+        found = response.get_json()
+        self.assertEqual({place["id"] for place in found},
+                         {first, second, third})
+        scores = [place["score"] for place in found]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        body["where"] = {"max_guest": 1}
+        response = self.client.post('/api/v1/places_search', json=body)
+        self.assertEqual(response.get_json(), [])
+        models.storage.delete(models.storage.get(Review, review.id))
+        models.storage.save()
+
+    def test_search_invalid_q(self):
+        """Test that a q which is not a string is rejected"""
+        for body, args in [({"q": 3}, ""), ({"q": ["a"]}, ""),
+                           ({"q": "a"}, "?limit=0")]:
+            with self.subTest(body=body, args=args):
+                response = self.client.post('/api/v1/places_search' + args,
+                                            json=body)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(),
+                                 {"error": "Invalid q or limit"})
+
+
+class TestPlacesNearby(unittest.TestCase):
+    """Test the places_nearby view"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates places a kilometer apart along a meridian"""
+        cls.client = app.test_client()
+        cls.user = User(email="nearby@hbnb.io", password="pwd")
+        cls.user.save()
+        cls.state = State(name="Nearby")
+        cls.state.save()
+        cls.city = City(name="Nearby", state_id=cls.state.id)
+        cls.city.save()
+        cls.places = []
+        for i in range(4):
+            place = Place(name=str(i), city_id=cls.city.id,
+                          user_id=cls.user.id, latitude=-45 + i / 111.195,
+                          longitude=170.0)
+            place.save()
+            cls.places.append(place.id)
+        models.storage.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Deletes the places and their city, state and user"""
+        for id in cls.places:
+            models.storage.delete(models.storage.get(Place, id))
+        for obj in [cls.city, cls.state, cls.user]:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    def test_nearest_first(self):
+        """Test that the places within radius are listed nearest first with
+        their distance, up to limit"""
+        response = self.client.get('/api/v1/places_nearby?lat=-44.9925&'
+                                   'lng=170&radius=2&limit=2')
+        self.assertEqual(response.status_code, 200)
+        found = response.get_json()
+        self.assertEqual([place["id"] for place in found],
+                         [self.places[1], self.places[0]])
+        self.assertEqual([place["distance"] for place in found],
+                         [0.166, 0.834])
+        response = self.client.get('/api/v1/places_nearby?lat=-44.9925&'
+                                   'lng=170&radius=2')
+        self.assertEqual(len(response.get_json()), 3)
+        response = self.client.get('/api/v1/places_nearby?lat=-45&lng=170')
+        self.assertEqual(len(response.get_json()), 4)
+
+    def test_invalid_arguments(self):
+        """Test that a missing or invalid argument is rejected"""
+        for args in ["lng=170", "lat=-45&lng=190", "lat=a&lng=1",
+                     "lat=1&lng=1&radius=-1", "lat=1&lng=1&radius=nan",
+                     "lat=1&lng=1&limit=0"]:
+            with self.subTest(args=args):
+                response = self.client.get('/api/v1/places_nearby?' + args)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {
+                    "error": "Invalid lat, lng, radius or limit"})
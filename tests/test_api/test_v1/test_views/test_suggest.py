@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestSuggestDocs and TestSuggest classes
+"""
+
+from api.v1.app import app
+from api.v1.views import suggest
+import inspect
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.state import State
+import pep8
+from tests import move_text_index
+import unittest
+
+
+def setUpModule():
+    """saves the text index of the storage to a temporary directory"""
+    move_text_index()
+
+
+class TestSuggestDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the suggest view"""
+
+    def test_pep8_conformance_suggest(self):
+        """Test that api/v1/views/suggest.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/suggest.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_suggest(self):
+        """Test that tests/test_api/test_v1/test_views/test_suggest.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_suggest.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_suggest_module_docstring(self):
+        """Test for the suggest.py module docstring"""
+        self.assertIsNot(suggest.__doc__, None,
+                         "suggest.py needs a docstring")
+
+    def test_suggest_func_docstrings(self):
+        """Test for the presence of docstrings in suggest functions"""
+        for name, func in inspect.getmembers(suggest, inspect.isfunction):
+            if func.__module__ == suggest.__name__:
+                self.assertIsNot(func.__doc__, None,
+                                 "{:s} needs a docstring".format(name))
+
+
+class TestSuggest(unittest.TestCase):
+    """Test the suggest view"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates a state, a city and an amenity of names starting
+        alike"""
+        cls.client = app.test_client()
+        cls.state = State(name="Quebec")
+        cls.state.save()
+        cls.city = City(name="quebec City", state_id=cls.state.id)
+        cls.city.save()
+        cls.amenity = Amenity(name="Queen bed")
+        cls.amenity.save()
+        models.storage.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Deletes the state, city and amenity"""
+        for obj in [cls.city, cls.state, cls.amenity]:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    def get(self, args):
+        """returns the names suggested for the query string args"""
+        response = self.client.get('/api/v1/suggest?' + args)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_suggest(self):
+        """Test that the names starting with prefix are listed in order,
+        up to limit"""
+        self.assertEqual(self.get("prefix=QUE"), [
+            {"__class__": "State", "id": self.state.id, "name": "Quebec"},
+            {"__class__": "City", "id": self.city.id, "name": "quebec City"},
+            {"__class__": "Amenity", "id": self.amenity.id,
+             "name": "Queen bed"}])
+        self.assertEqual([found["id"] for found in
+                          self.get("prefix=que&limit=1")], [self.state.id])
+        self.assertEqual(self.get("prefix=queb&types=Amenity"), [])
+        self.assertEqual([found["id"] for found in
+                          self.get("prefix=que&types=City,%20Amenity")],
+                         [self.city.id, self.amenity.id])
+
+    def test_invalid_arguments(self):
+        """Test that an unknown type or invalid limit is rejected"""
+        for args in ["prefix=a&types=User", "prefix=a&limit=0",
+                     "prefix=a&limit=x"]:
+            with self.subTest(args=args):
+                response = self.client.get('/api/v1/suggest?' + args)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(),
+                                 {"error": "Invalid types or limit"})
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Contains the TestAmenityIndexDocs and TestAmenityIndex classes
+"""
+
+from array import array
+import inspect
+from models.engine import amenity_index
+import pep8
+import unittest
+AmenityIndex = amenity_index.AmenityIndex
+
+
+class TestAmenityIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of AmenityIndex class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.ai_f = inspect.getmembers(AmenityIndex, inspect.isfunction)
+
+    def test_pep8_conformance_amenity_index(self):
+        """Test that models/engine/amenity_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/amenity_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_amenity_index(self):
+        """Test tests/test_models/test_amenity_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_amenity_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_amenity_index_module_docstring(self):
+        """Test for the amenity_index.py module docstring"""
+        self.assertIsNot(amenity_index.__doc__, None,
+                         "amenity_index.py needs a docstring")
+        self.assertTrue(len(amenity_index.__doc__) >= 1,
+                        "amenity_index.py needs a docstring")
+
+    def test_amenity_index_class_docstring(self):
+        """Test for the AmenityIndex class docstring"""
+        self.assertIsNot(AmenityIndex.__doc__, None,
+                         "AmenityIndex class needs a docstring")
+        self.assertTrue(len(AmenityIndex.__doc__) >= 1,
+                        "AmenityIndex class needs a docstring")
+
+    def test_ai_func_docstrings(self):
+        """Test for the presence of docstrings in AmenityIndex methods"""
+        for func in self.ai_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestAmenityIndex(unittest.TestCase):
+    """Test the AmenityIndex class"""
+    def setUp(self):
+        """Links 20 places: every place to wifi, even ones to pool"""
+        self.index = AmenityIndex()
+        for i in range(20):
+            self.index.link("p{}".format(i), "wifi")
+            if i % 2 == 0:
+                self.index.link("p{}".format(i), "pool")
+
+    def test_places(self):
+        """Test that places ANDs the bitmaps of the amenities"""
+        self.assertEqual(len(self.index.places(["wifi"])), 20)
+        self.assertEqual(self.index.places(["wifi", "pool"]),
+                         ["p{}".format(i) for i in range(0, 20, 2)])
+        self.assertEqual(self.index.places(["wifi", "missing"]), [])
+
+    def test_places_among_candidates(self):
+        """Test that places only keeps the given candidate places"""
+        self.assertEqual(self.index.places(["pool"], ["p1", "p2", "x"]),
+                         ["p2"])
+        self.assertEqual(self.index.places(["pool"], []), [])
+
+    def test_count(self):
+        """Test that count returns the number of bits set"""
+        self.assertEqual(self.index.count(["wifi"]), 20)
+        self.assertEqual(self.index.count(["wifi", "pool"]), 10)
+        self.assertEqual(self.index.count(["pool"], ["p0", "p1"]), 1)
+
+    def test_unlink(self):
+        """Test that unlink clears a single bit"""
+        self.index.unlink("p0", "pool")
+        self.index.unlink("p0", "missing")
+        self.assertNotIn("p0", self.index.places(["pool"]))
+        self.assertIn("p0", self.index.places(["wifi"]))
+
+    def test_drop(self):
+        """Test that dropped places and amenities are never matched"""
+        self.index.drop_place("p2")
+        self.assertNotIn("p2", self.index.places(["wifi"]))
+        self.index.link("p2", "wifi")
+        self.assertIn("p2", self.index.places(["wifi"]))
+        self.index.drop_amenity("pool")
+        self.assertEqual(self.index.places(["pool"]), [])
+
+    def test_churn(self):
+        """Test that the ordinals of dropped places are reused, so the
+        index does not grow while places are created and deleted"""
+        live = {"p{}".format(i) for i in range(20)}
+        for i in range(20, 1000):
+            dropped = "p{}".format(i - 20)
+            self.index.drop_place(dropped)
+            live.discard(dropped)
+            self.index.link("p{}".format(i), "wifi", "pool")
+            live.add("p{}".format(i))
+        self.assertEqual(len(self.index._AmenityIndex__places), 20)
+        self.assertTrue(len(self.index._AmenityIndex__bitmaps["wifi"]) <= 3)
+        self.assertEqual(set(self.index.places(["wifi"])), live)
+        self.assertEqual(self.index.count(["wifi", "pool"]), 20)
+        self.assertEqual(self.index.places(["pool"], ["p0", "p999"]),
+                         ["p999"])
+
+    def test_containers(self):
+        """Test that a chunk is held in an array until it gets more than
+        DENSE places, in a bitmap beyond, and in an array again once
+        most of them are dropped"""
+        index = AmenityIndex()
+        count = amenity_index.CHUNK + amenity_index.DENSE + 10
+        for i in range(count):
+            index.link("p{}".format(i), "wifi")
+            if i % 3 == 0:
+                index.link("p{}".format(i), "pool")
+        wifi = index._AmenityIndex__bitmaps["wifi"]
+        pool = index._AmenityIndex__bitmaps["pool"]
+        self.assertIs(type(wifi[0]), bytearray)
+        self.assertIs(type(wifi[1]), bytearray)
+        self.assertIs(type(pool[0]), bytearray)
+        self.assertIs(type(pool[1]), array)
+        self.assertEqual(index.count(["wifi"]), count)
+        found = index.places(["pool", "wifi"])
+        self.assertEqual(found, ["p{}".format(i)
+                                 for i in range(0, count, 3)])
+        self.assertEqual(index.places(["pool"], ["p3", "p4", "p65537"]),
+                         ["p3"])
+        for i in range(amenity_index.CHUNK, count - 100):
+            index.unlink("p{}".format(i), "wifi")
+        self.assertIs(type(wifi[1]), array)
+        self.assertEqual(index.count(["wifi"]), amenity_index.CHUNK + 100)
+        self.assertEqual(index.places(["wifi"], [
+            "p{}".format(amenity_index.CHUNK), "p{}".format(count - 1)]),
+            ["p{}".format(count - 1)])
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""
+Contains the TestCodecDocs and TestCodec classes
+"""
+
+import hashlib
+import inspect
+import io
+import json
+from models.engine import codec
+import os
+import pep8
+import tempfile
+import unittest
+from unittest import mock
+
+
+class TestCodecDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the codec module"""
+
+    def test_pep8_conformance_codec(self):
+        """Test that models/engine/codec.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_codec(self):
+        """Test tests/test_models/test_codec.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_codec_module_docstring(self):
+        """Test for the codec.py module docstring"""
+        self.assertIsNot(codec.__doc__, None,
+                         "codec.py needs a docstring")
+        self.assertTrue(len(codec.__doc__) >= 1,
+                        "codec.py needs a docstring")
+
+    def test_codec_func_docstrings(self):
+        """Test for the presence of docstrings in codec functions"""
+        for name, func in inspect.getmembers(codec, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+    def test_codec_class_docstrings(self):
+        """Test for the docstrings of the codec classes and methods"""
+        for name, cls in inspect.getmembers(codec, inspect.isclass):
+            if cls.__module__ != codec.__name__:
+                continue
+            self.assertIsNot(cls.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+            for method, func in inspect.getmembers(cls, inspect.isfunction):
+                self.assertIsNot(func.__doc__, None,
+                                 "{:s} needs a docstring".format(method))
+
+
+class TestCodec(unittest.TestCase):
+    """Test the codecs and compressions of the FileStorage file"""
+    def setUp(self):
+        """Makes the records of a state and of two of its cities"""
+        self.records = {
+            "State.s1": {"__class__": "State", "name": "Nevada",
+                         "id": "s1", "created_at": "2017-06-14T22:31:03"},
+            "City.c1": {"__class__": "City", "id": "c1", "state_id": "s1",
+                        "name": "Reno é", "tags": ["a", "b"]},
+            "City.c2": json.dumps({"__class__": "City", "id": "c2",
+                                   "state_id": "s1", "name": "Ely"}),
+        }
+        self.expected = {key: codec.snapshot.record(record)
+                         for key, record in self.records.items()}
+
+    def load(self, data):
+        """returns the records decoded from data by key"""
+        f = io.BufferedReader(io.BytesIO(data))
+        return {key: codec.snapshot.record(record)
+                for key, record in codec.load(f)}
+
+    def dump(self, name, compression):
+        """returns the records encoded in the given codec and
+        compression"""
+        f = io.BytesIO()
+        codec.dump(self.records, f, name, compression)
+        return f.getvalue()
+
+    def test_round_trip(self):
+        """Test that every installed codec and compression gives back the
+        records, whichever codec is configured to decode JSON"""
+        for name, found in codec.codecs.items():
+            for compression, stream in codec.compressions.items():
+                with self.subTest(codec=name, compression=compression):
+                    if found.package is None or stream.package is None:
+                        with self.assertRaises(ValueError):
+                            self.dump(name, compression)
+                        continue
+                    data = self.dump(name, compression)
+                    self.assertEqual(self.load(data), self.expected)
+
+    def test_json_is_json(self):
+        """Test that the JSON codec writes one record per line of a
+        valid JSON object"""
+        data = self.dump("json", "none")
+        self.assertEqual(json.loads(data), self.expected)
+        self.assertEqual(len(data.splitlines()), len(self.records) + 2)
+
+    def test_json_layouts(self):
+        """Test that JSON written on a single line or pretty printed, as
+        before, is read"""
+        for layout in [json.dumps(self.expected),
+                       json.dumps(self.expected, indent=4),
+                       "{}", "{\n}\n"]:
+            with self.subTest(layout=layout[:20]):
+                self.assertEqual(self.load(layout.encode()),
+                                 json.loads(layout))
+
+    def test_small_chunks(self):
+        """Test that values and characters split across chunks are read
+        whole"""
+        layouts = [json.dumps(self.expected).encode(),
+                   json.dumps(self.expected, indent=2,
+                              ensure_ascii=False).encode(),
+                   self.dump("json", "zlib"), self.dump("binary", "none")]
+        with mock.patch.object(codec, "chunk_size", 3):
+            for data in layouts:
+                with self.subTest(data=data[:20]):
+                    self.assertEqual(self.load(data), self.expected)
+
+    def test_compressed_is_smaller(self):
+        """Test that the compressions shrink a repetitive file"""
+        self.records = {"City.{}".format(i): {
+            "__class__": "City", "id": str(i), "state_id": "s1",
+            "name": "City", "created_at": "2017-06-14T22:31:03.000000"}
+            for i in range(200)}
+        plain = len(self.dump("json", "none"))
+        for compression in ["zlib", "lzma"]:
+            with self.subTest(compression=compression):
+                self.assertLess(len(self.dump("json", compression)),
+                                plain / 4)
+
+    def test_invalid_data(self):
+        """Test that truncated or unknown data raises ValueError"""
+        for data in [b"", b"[]", b'{"City.c1": {"id"',
+                     self.dump("json", "none")[:-10],
+                     self.dump("binary", "none")[:-3],
+                     self.dump("json", "zlib")[:-12]]:
+            with self.subTest(data=data[:20]):
+                with self.assertRaises(ValueError):
+                    self.load(data)
+
+    def test_unknown_names(self):
+        """Test that unknown codecs or compressions are rejected"""
+        with self.assertRaises(ValueError):
+            codec.get("yaml")
+        with self.assertRaises(ValueError):
+            codec.get("json", "bz3")
+        self.assertEqual(codec.suffix("json", "zlib"), "json.gz")
+        self.assertEqual(codec.suffix("binary"), "hbnb")
+
+    def test_read_and_digest(self):
+        """Test that read() gives the digest of the whole file with its
+        records"""
+        data = self.dump("json", "lzma")
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            digest, records = codec.read(path)
+            self.assertEqual(digest, hashlib.sha1(data).hexdigest())
+            self.assertEqual(codec.digest(path), digest)
+            self.assertEqual(records, self.expected)
+        finally:
+            os.remove(path)
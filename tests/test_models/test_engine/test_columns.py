@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""
+Contains the TestColumnsDocs and TestColumns classes
+"""
+
+import inspect
+from models.engine import columns
+import os
+import pep8
+import tempfile
+import unittest
+
+
+class TestColumnsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the columns module"""
+
+    def test_pep8_conformance_columns(self):
+        """Test that models/engine/columns.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_columns(self):
+        """Test tests/test_models/test_columns.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_columns_module_docstring(self):
+        """Test for the columns.py module docstring"""
+        self.assertIsNot(columns.__doc__, None,
+                         "columns.py needs a docstring")
+        self.assertTrue(len(columns.__doc__) >= 1,
+                        "columns.py needs a docstring")
+
+    def test_columns_docstrings(self):
+        """Test for the presence of docstrings in the functions, classes
+        and methods"""
+        members = inspect.getmembers(columns, inspect.isfunction)
+        for name, cls in inspect.getmembers(columns, inspect.isclass):
+            members.append((name, cls))
+            members += inspect.getmembers(cls, inspect.isfunction)
+        for name, member in members:
+            if member.__module__ == columns.__name__:
+                self.assertIsNot(member.__doc__, None,
+                                 "{:s} needs a docstring".format(name))
+
+
+class TestColumns(unittest.TestCase):
+    """Test writing and mapping a column snapshot"""
+    def setUp(self):
+        """Writes the snapshot of a state, three places and a city"""
+        self.path = os.path.join(tempfile.mkdtemp(), "file.cols")
+        records = [
+            {"__class__": "State", "id": "s1", "name": "Nevada",
+             "created_at": "2017-06-14T22:31:03.000000"},
+            {"__class__": "Place", "id": "p2", "city_id": "c1",
+             "name": "Loft", "number_rooms": 2, "latitude": 1.5,
+             "amenity_ids": ["a1", "a2"], "description": None,
+             "created_at": "2017-06-14T22:31:05.000000"},
+            {"__class__": "Place", "id": "p1", "city_id": "c1",
+             "name": "Café", "number_rooms": 3, "latitude": 2.5,
+             "amenity_ids": ["a1"], "flag": True,
+             "created_at": "2017-06-14T22:31:04.000000"},
+            {"__class__": "Place", "id": "p3", "city_id": "c2",
+             "amenity_ids": [],
+             "created_at": "2017-06-14T22:31:04.000000"},
+            {"__class__": "City", "id": "c1", "state_id": "s1"},
+        ]
+        columns.write(self.path, records,
+                      {"Place": ("city_id", "amenity_ids")})
+        self.columns = columns.Columns(self.path)
+        self.places = self.columns.table("Place")
+
+    def test_records(self):
+        """Test that the rows give back the attributes of each type"""
+        self.assertEqual(self.places.rows, 3)
+        self.assertEqual(self.places.record(self.places.find("p1")), {
+            "id": "p1", "city_id": "c1", "name": "Café", "number_rooms": 3,
+            "latitude": 2.5, "amenity_ids": ["a1"], "flag": True,
+            "created_at": "2017-06-14T22:31:04.000000"})
+        record = self.places.record(self.places.find("p2"))
+        self.assertIsNone(record["description"])
+        self.assertNotIn("flag", record)
+        self.assertNotIn("name", self.places.record(self.places.find("p3")))
+        self.assertEqual(self.places.columns["number_rooms"].kind, "int")
+        self.assertEqual(self.places.columns["latitude"].kind, "float")
+        self.assertEqual(self.places.columns["flag"].kind, "json")
+
+    def test_find(self):
+        """Test that find() looks the ids up, rows being sorted by id"""
+        self.assertEqual([self.places.find(id) for id in ["p1", "p2", "p3"]],
+                         [0, 1, 2])
+        self.assertIsNone(self.places.find("p0"))
+        self.assertIsNone(self.places.find("p4"))
+        self.assertIsNone(self.columns.table("Review"))
+
+    def test_related(self):
+        """Test that the postings find the rows referring to an id"""
+        ids = self.places.ids
+        self.assertEqual([ids[row] for row in
+                          self.places.related("city_id", "c1")], ["p1", "p2"])
+        self.assertEqual([ids[row] for row in
+                          self.places.related("amenity_ids", "a2")], ["p2"])
+        self.assertEqual(self.places.related("city_id", "c9"), [])
+        self.assertIsNone(self.places.related("name", "Loft"))
+
+    def test_ordered(self):
+        """Test that the rows are ordered by created_at and id, after a
+        cursor"""
+        ids = self.places.ids
+        self.assertEqual([ids[row] for row in self.places.ordered()],
+                         ["p1", "p3", "p2"])
+        cursor = ("2017-06-14T22:31:04.000000", "p1")
+        self.assertEqual([ids[row] for row in self.places.ordered(cursor)],
+                         ["p3", "p2"])
+
+    def test_invalid_file(self):
+        """Test that a file that is not a column snapshot is rejected"""
+        with open(self.path, "wb") as f:
+            f.write(b"{}" + bytes(columns.header.size))
+        with self.assertRaises(ValueError):
+            columns.Columns(self.path)
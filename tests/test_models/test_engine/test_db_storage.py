@@ -17,12 +17,22 @@ from models.user import User
 import json
 import os
 import pep8
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+from tests import move_text_index
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
 
 
+def setUpModule():
+    """saves the text index of the storage to a temporary directory"""
+    move_text_index()
+
+
 class TestDBStorageDocs(unittest.TestCase):
     """Tests to check the documentation and style of DBStorage class"""
     @classmethod
@@ -99,8 +109,7 @@ class TestDbStorage(unittest.TestCase):
 class TestDBStorage(unittest.TestCase):
     """Test the DBStorage class"""
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db',
-                     "not testing db storage")
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_get(self):
         """Test that get returns specific object, or none"""
         new_state = State(name="New York")
@@ -112,8 +121,7 @@ class TestDBStorage(unittest.TestCase):
         self.assertIs(None, models.storage.get("blah", "blah"))
         self.assertIs(new_user, models.storage.get(User, new_user.id))
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db',
-                     "not testing db storage")
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_count(self):
         """test that new adds an object to the database"""
         initial_count = models.storage.count()
@@ -124,3 +132,231 @@ class TestDBStorage(unittest.TestCase):
         new_user.save()
         self.assertEqual(models.storage.count("State"), initial_count + 1)
         self.assertEqual(models.storage.count(), initial_count + 2)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counts(self):
+        """Test that counts returns the count of every class"""
+        new_state = State(name="Oregon")
+        new_state.save()
+        counts = models.storage.counts()
+        for name in classes:
+            with self.subTest(name=name):
+                self.assertEqual(counts[name], models.storage.count(name))
+        self.assertEqual(sum(counts.values()), models.storage.count())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counters(self):
+        """Test that counts and tally follow the commits without querying
+        the database, forget what is rolled back and are counted again
+        once expired"""
+        state, other = State(name="Tallied"), State(name="Other")
+        state.save()
+        other.save()
+        counts = models.storage.counts()
+        self.assertNotIn(state.id, models.storage.tally(City, "state_id"))
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the counting statements sent to the database"""
+            if "count(" in statement.lower():
+                statements.append(statement)
+        engine = models.storage._DBStorage__engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            cities = [City(name="Tallied", state_id=state.id)
+                      for i in range(2)]
+            for city in cities:
+                city.save()
+            self.assertEqual(models.storage.count(City),
+                             counts["City"] + 2)
+            self.assertEqual(models.storage.tally(City, "state_id"),
+                             dict(models.storage.tally(City, "state_id"),
+                                  **{state.id: 2}))
+            models.storage.new(City(name="Tallied", state_id=state.id))
+            self.assertEqual(models.storage.counts()["City"],
+                             counts["City"] + 3)
+            models.storage.close()
+            cities[0].state_id = other.id
+            models.storage.new(cities[0])
+            cities[1].delete()
+            models.storage.save()
+            self.assertEqual(statements, [])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(models.storage.count("City"), counts["City"] + 1)
+        self.assertNotIn(state.id, models.storage.tally(City, "state_id"))
+        self.assertEqual(models.storage.tally(City, "state_id")[other.id], 1)
+        with mock.patch.object(DBStorage, "_DBStorage__counts_ttl", -1):
+            self.assertEqual(models.storage.counts(), dict(
+                counts, City=counts["City"] + 1))
+            self.assertEqual(models.storage.tally(City, "state_id")[other.id],
+                             1)
+        with self.assertRaises(ValueError):
+            models.storage.tally(City, "missing")
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_uses_identity_map(self):
+        """Test that get does not query objects already in the session"""
+        new_state = State(name="Texas")
+        new_state.save()
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            self.assertIs(models.storage.get(State, new_state.id), new_state)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(statements, [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_query(self):
+        """Test that query compiles its predicates and order to SQL and
+        that explain shows the index the database uses"""
+        state = State(name="Queried")
+        state.save()
+        city = City(name="Ely", state_id=state.id)
+        city.save()
+        user = User(email="query@hbnb.io", password="pwd")
+        user.save()
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id,
+                        price_by_night=i * 10 % 70, max_guest=i % 4)
+                  for i in range(12)]
+        for place in places:
+            place.save()
+        where = {"user_id": user.id, "max_guest": {"in": [1, 3]},
+                 "price_by_night": {">=": 10}}
+        found = models.storage.query(Place, where, "-price_by_night", 3)
+        expected = sorted((place for place in places
+                           if place.max_guest in (1, 3) and
+                           place.price_by_night >= 10),
+                          key=lambda place: (place.price_by_night,
+                                             place.id), reverse=True)
+        self.assertEqual(found, expected[:3])
+        self.assertEqual(models.storage.query("Nowhere"), [])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, {"amenities": 1})
+        plan = models.storage.explain(Place, {"user_id": user.id})
+        self.assertEqual(plan["engine"], "db")
+        self.assertIn("WHERE places.user_id = ", plan["sql"])
+        self.assertTrue(plan["plan"])
+        self.assertIn("user_id", plan["index"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_nearby(self):
+        """Test that nearby selects the nearest places of the bounding box,
+        across the antimeridian"""
+        state = State(name="Nearby")
+        state.save()
+        city = City(name="Suva", state_id=state.id)
+        city.save()
+        user = User(email="nearby@hbnb.io", password="pwd")
+        user.save()
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id,
+                        latitude=-18.1, longitude=179.9 + i * 0.05 -
+                        (360 if i > 1 else 0)) for i in range(4)]
+        for place in places:
+            place.save()
+        found = models.storage.nearby(Place, -18.1, 179.95, 8)
+        self.assertEqual(sorted(place.id for far, place in found),
+                         sorted(place.id for place in places[:3]))
+        self.assertIs(found[0][1], places[1])
+        self.assertAlmostEqual(found[0][0], 0)
+        found = models.storage.nearby("Place", -18.1, -179.9, 100, 1)
+        self.assertEqual([place for far, place in found], [places[3]])
+        self.assertEqual(models.storage.nearby(State, 0, 0, 10), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_timestamps_keep_microseconds(self):
+        """Test that MySQL stores created_at and updated_at to the
+        microsecond, as the page cursors hold them"""
+        for cls in classes.values():
+            sql = str(CreateTable(cls.__table__).compile(
+                dialect=mysql.dialect()))
+            self.assertIn("created_at DATETIME(6)", sql)
+            self.assertIn("updated_at DATETIME(6)", sql)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_places_rollback(self):
+        """Test that the amenity bitmaps only follow the links committed,
+        and that the links flushed are matched before the commit"""
+        state = State(name="Links")
+        state.save()
+        city = City(name="Ubud", state_id=state.id)
+        city.save()
+        user = User(email="links@hbnb.io", password="pwd")
+        user.save()
+        place = Place(name="Villa", city_id=city.id, user_id=user.id)
+        place.save()
+        amenity = Amenity(name="Plunge pool")
+        amenity.save()
+        search = models.storage.search_places
+        self.assertEqual(search(amenities=[amenity.id]), [])
+        place.amenities.append(amenity)
+        self.assertEqual(search(cities=[city.id], amenities=[amenity.id]),
+                         [place])
+        models.storage._DBStorage__session.rollback()
+        self.assertEqual(search(amenities=[amenity.id]), [])
+        place.amenities.append(amenity)
+        place.save()
+        self.assertEqual(search(amenities=[amenity.id]), [place])
+        place.amenities.remove(amenity)
+        models.storage._DBStorage__session.rollback()
+        self.assertEqual(search(amenities=[amenity.id]), [place])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_text(self):
+        """Test that search_text ranks the places by their text and that of
+        their reviews, following the rows written and deleted"""
+        state = State(name="Texts")
+        state.save()
+        city = City(name="Okapi", state_id=state.id)
+        city.save()
+        user = User(email="texts@hbnb.io", password="pwd")
+        user.save()
+        places = [Place(name="Loft", description="quiet okapi burrow",
+                        city_id=city.id, user_id=user.id),
+                  Place(name="Hut", description="noisy road",
+                        city_id=city.id, user_id=user.id)]
+        for place in places:
+            place.save()
+        found = models.storage.search_text(Place, "OKAPI")
+        self.assertEqual([place for score, place in found], [places[0]])
+        review = Review(place_id=places[1].id, user_id=user.id,
+                        text="okapi okapi")
+        review.save()
+        found = models.storage.search_text("Place", "okapi", 1)
+        self.assertEqual([place for score, place in found], [places[1]])
+        places[0].description = "quiet burrow"
+        places[0].save()
+        review.delete()
+        models.storage.save()
+        self.assertEqual(models.storage.search_text(Place, "okapi"), [])
+        self.assertEqual(models.storage.search_text(State, "okapi"), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_suggest(self):
+        """Test that suggest finds the names starting with a prefix,
+        following the rows written and deleted"""
+        state = State(name="Yukon")
+        state.save()
+        city = City(name="yellowknife", state_id=state.id)
+        city.save()
+        self.assertEqual(models.storage.suggest("YUK"),
+                         [("State", state.id, "Yukon")])
+        self.assertEqual(models.storage.suggest("y", [City]),
+                         [("City", city.id, "yellowknife")])
+        amenity = Amenity(name="Yurt")
+        amenity.save()
+        state.name = "Nunavut"
+        state.save()
+        self.assertEqual(models.storage.suggest("yu"),
+                         [("Amenity", amenity.id, "Yurt")])
+        amenity.delete()
+        models.storage.save()
+        self.assertEqual(models.storage.suggest("yu"), [])
+        self.assertEqual(models.storage.suggest("nunav", None, 1),
+                         [("State", state.id, "Nunavut")])
@@ -4,9 +4,10 @@ Contains the TestFileStorageDocs classes
 """
 
 from datetime import datetime
+import gzip
 import inspect
 import models
-from models.engine import file_storage
+from models.engine import file_storage, query, shards, text
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,7 +18,14 @@ from models.user import User
 import json
 import os
 import pep8
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -70,15 +78,19 @@ test_file_storage.py'])
 
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
     def test_all_returns_dict(self):
-        """Test that all returns the FileStorage.__objects attr"""
+        """Test that all returns a snapshot of the FileStorage.__objects
+        attr"""
         storage = FileStorage()
         new_dict = storage.all()
         self.assertEqual(type(new_dict), dict)
-        self.assertIs(new_dict, storage._FileStorage__objects)
+        self.assertEqual(new_dict, storage._FileStorage__objects)
+        self.assertIs(new_dict, storage.all())
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
     def test_new(self):
         """test that new adds an object to the FileStorage.__objects attr"""
         storage = FileStorage()
@@ -94,7 +106,8 @@ class TestFileStorage(unittest.TestCase):
                 self.assertEqual(test_dict, storage._FileStorage__objects)
         FileStorage._FileStorage__objects = save
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
     def test_save(self):
         """Test that save properly saves objects to file.json"""
         storage = FileStorage()
@@ -114,7 +127,7 @@ class TestFileStorage(unittest.TestCase):
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db',
+    @unittest.skipIf(type(models.storage) is not FileStorage,
                      "not testing file storage")
     def test_get(self):
         """Test that the get method properly retrievs objects"""
@@ -125,7 +138,7 @@ class TestFileStorage(unittest.TestCase):
         new_user.save()
         self.assertIs(storage.get(User, new_user.id), new_user)
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db',
+    @unittest.skipIf(type(models.storage) is not FileStorage,
                      "not testing file storage")
     def test_count(self):
         storage = FileStorage()
@@ -137,3 +150,814 @@ class TestFileStorage(unittest.TestCase):
         new_state.save()
         self.assertEqual(storage.count(), initial_length + 1)
         self.assertEqual(storage.count("State"), state_len + 1)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_all_cls_uses_buckets(self):
+        """Test that all(cls) only returns objects of that class"""
+        storage = FileStorage()
+        state = State()
+        city = City()
+        storage.new(state)
+        storage.new(city)
+        for cls in [State, "State"]:
+            with self.subTest(cls=cls):
+                states = storage.all(cls)
+                self.assertIn("State." + state.id, states)
+                self.assertNotIn("City." + city.id, states)
+                for value in states.values():
+                    self.assertIs(type(value), State)
+        storage.delete(state)
+        storage.delete(city)
+        self.assertNotIn("State." + state.id, storage.all(State))
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_buckets_follow_replaced_objects(self):
+        """Test that the class buckets follow a replaced __objects dict"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        state = State()
+        FileStorage._FileStorage__objects = {"State." + state.id: state}
+        self.assertEqual(storage.all(State), {"State." + state.id: state})
+        self.assertEqual(storage.count(State), 1)
+        self.assertEqual(storage.count(City), 0)
+        FileStorage._FileStorage__objects = save
+        self.assertNotIn("State." + state.id, storage.all(State))
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """Test that related() tracks foreign key changes and deletes"""
+        storage = FileStorage()
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(city)
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        city.state_id = other.id
+        self.assertEqual(storage.related(City, "state_id", state.id), [])
+        self.assertEqual(storage.related("City", "state_id", other.id),
+                         [city])
+        storage.delete(city)
+        self.assertEqual(storage.related(City, "state_id", other.id), [])
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_related_amenity_links(self):
+        """Test that related() indexes every id held in amenity_ids"""
+        storage = FileStorage()
+        amenity = Amenity()
+        storage.new(amenity)
+        place = Place()
+        storage.new(place)
+        place.amenities = amenity
+        self.assertEqual(place.amenities, [amenity])
+        self.assertEqual(storage.related(Place, "amenity_ids", amenity.id),
+                         [place])
+        place.amenity_ids = []
+        self.assertEqual(storage.related(Place, "amenity_ids", amenity.id),
+                         [])
+        self.assertEqual(Place.amenity_ids, [])
+        storage.delete(place)
+        storage.delete(amenity)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_search_places(self):
+        """Test that search_places intersects the state, city and amenity
+        id sets"""
+        storage = FileStorage()
+        state = State()
+        city = City(state_id=state.id)
+        other = City()
+        wifi = Amenity()
+        pool = Amenity()
+        both = Place(city_id=city.id, amenity_ids=[wifi.id, pool.id])
+        one = Place(city_id=other.id, amenity_ids=[wifi.id])
+        objs = [state, city, other, wifi, pool, both, one]
+        for obj in objs:
+            storage.new(obj)
+        try:
+            self.assertEqual(storage.search_places([state.id]), [both])
+            self.assertCountEqual(storage.search_places(
+                [state.id], [city.id, other.id]), [both, one])
+            self.assertCountEqual(storage.search_places(
+                amenities=[wifi.id]), [both, one])
+            self.assertEqual(storage.search_places(
+                cities=[other.id], amenities=[wifi.id, pool.id]), [])
+            self.assertEqual(storage.search_places(
+                amenities=[wifi.id, pool.id]), [both])
+            self.assertEqual(storage.search_places(
+                ["missing"], amenities=[wifi.id]), [])
+            self.assertEqual(storage.search_places(
+                amenities=["missing"]), [])
+        finally:
+            for obj in objs:
+                storage.delete(obj)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_close_merges_only_changed_records(self):
+        """Test that close() keeps unchanged objects and merges the
+        records another writer changed or removed"""
+        storage = FileStorage()
+        kept = State(name="Kept")
+        changed = State(name="Before")
+        removed = State(name="Removed")
+        for obj in [kept, changed, removed]:
+            storage.new(obj)
+        storage.save()
+        storage.close()
+        self.assertIs(storage.get(State, changed.id), changed)
+        with open("file.json", "r") as f:
+            jo = json.load(f)
+        jo["State." + changed.id]["name"] = "After"
+        del jo["State." + removed.id]
+        with open("file.json", "w") as f:
+            json.dump(jo, f)
+        storage.close()
+        self.assertIs(storage.get(State, kept.id), kept)
+        self.assertEqual(storage.get(State, changed.id).name, "After")
+        self.assertIsNone(storage.get(State, removed.id))
+        storage.delete(kept)
+        storage.delete(storage.get(State, changed.id))
+        storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_reload_hydrates_records(self):
+        """Test that reload() builds the objects without marking them
+        changed, parses their datetimes and keeps the stored password"""
+        storage = FileStorage()
+        objects = FileStorage._FileStorage__objects
+        user = User(email="a@b.c", password="pwd")
+        storage.new(user)
+        storage.save()
+        try:
+            FileStorage._FileStorage__objects = {}
+            with mock.patch.object(FileStorage, "changed") as changed:
+                storage.reload()
+            changed.assert_not_called()
+            loaded = storage.get(User, user.id)
+            self.assertIsNot(loaded, user)
+            self.assertIs(type(loaded), User)
+            self.assertEqual(loaded.password, user.password)
+            self.assertEqual(loaded.created_at, user.created_at)
+            self.assertIs(type(loaded.updated_at), datetime)
+            self.assertEqual(loaded.to_dict(False), user.to_dict(False))
+        finally:
+            FileStorage._FileStorage__objects = objects
+            storage.delete(storage.get(User, user.id))
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_binary_snapshot(self):
+        """Test that the binary format saves a snapshot that reloads to
+        the same objects, and that JSON can still be exported"""
+        storage = FileStorage()
+        objects = FileStorage._FileStorage__objects
+        records = FileStorage._FileStorage__records
+        state = State(name="Binary")
+        storage.new(state)
+        storage.save()
+        FileStorage._FileStorage__codec = "binary"
+        FileStorage._FileStorage__file_path = "file.hbnb"
+        try:
+            storage.export("file.hbnb", "binary")
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__records = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).to_dict(),
+                             state.to_dict())
+            city = City(name="Ely", state_id=state.id)
+            storage.new(city)
+            storage.save()
+            with open("file.hbnb", "rb") as f:
+                self.assertTrue(f.read().startswith(b"HBNB"))
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(City, city.id).name, "Ely")
+            self.assertEqual(storage.related(City, "state_id", state.id),
+                             [storage.get(City, city.id)])
+            storage.export("export.json")
+            with open("export.json", "r") as f:
+                self.assertEqual(json.load(f)["City." + city.id]["name"],
+                                 "Ely")
+        finally:
+            FileStorage._FileStorage__codec = "json"
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__objects = objects
+            FileStorage._FileStorage__records = records
+            for path in ["file.hbnb", "export.json"]:
+                if os.path.exists(path):
+                    os.remove(path)
+            storage.delete(state)
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_compressed_codec(self):
+        """Test that a compressed file is saved, reloaded and picked up by
+        close() when another process changes it"""
+        storage = FileStorage()
+        objects = FileStorage._FileStorage__objects
+        records = FileStorage._FileStorage__records
+        digest = FileStorage._FileStorage__digest
+        signature = FileStorage._FileStorage__signature
+        state = State(name="Compressed")
+        storage.new(state)
+        storage.save()
+        FileStorage._FileStorage__compression = "zlib"
+        FileStorage._FileStorage__file_path = "file.json.gz"
+        try:
+            storage.export("file.json.gz", "json", "zlib")
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__records = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).to_dict(),
+                             state.to_dict())
+            city = City(name="Ely", state_id=state.id)
+            storage.new(city)
+            storage.save()
+            with open("file.json.gz", "rb") as f:
+                self.assertEqual(json.loads(gzip.decompress(f.read()))[
+                    "City." + city.id]["name"], "Ely")
+            storage.close()
+            self.assertIs(storage.get(City, city.id), city)
+            with open("file.json.gz", "rb") as f:
+                data = json.loads(gzip.decompress(f.read()))
+            data["City." + city.id]["name"] = "Reno"
+            with open("file.json.gz", "wb") as f:
+                f.write(gzip.compress(json.dumps(data).encode()))
+            storage.close()
+            self.assertEqual(storage.get(City, city.id).name, "Reno")
+        finally:
+            FileStorage._FileStorage__compression = "none"
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__objects = objects
+            FileStorage._FileStorage__records = records
+            FileStorage._FileStorage__digest = digest
+            FileStorage._FileStorage__signature = signature
+            if os.path.exists("file.json.gz"):
+                os.remove("file.json.gz")
+            storage.delete(state)
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_sharded_storage(self):
+        """Test that sharded, each class gets its own file and the places
+        and reviews hash partitioned ones, that a save rewrites only the
+        shards changed and that a pool of processes reloads them"""
+        storage = FileStorage()
+        saved = {attr: getattr(FileStorage, "_FileStorage__" + attr)
+                 for attr in ["objects", "records", "shards", "shard_dir",
+                              "shard_files", "stale", "load_processes"]}
+        directory = tempfile.mkdtemp()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__records = {}
+        FileStorage._FileStorage__shards = 4
+        FileStorage._FileStorage__shard_dir = directory
+        FileStorage._FileStorage__shard_files = {}
+        FileStorage._FileStorage__stale = set()
+        FileStorage._FileStorage__load_processes = 2
+        try:
+            state = State(name="Sharded")
+            city = City(name="Ely", state_id=state.id)
+            places = [Place(name=str(i), city_id=city.id) for i in range(20)]
+            review = Review(text="Nice", place_id=places[0].id)
+            for obj in [state, city, review] + places:
+                storage.new(obj)
+            storage.save()
+            files = sorted(os.listdir(directory))
+            self.assertIn("State.json", files)
+            self.assertIn("City.json", files)
+            self.assertEqual(len([file for file in files
+                                  if file.startswith("Place.")]), 4)
+            for file in files:
+                with open(os.path.join(directory, file)) as f:
+                    for key in json.load(f):
+                        self.assertEqual(shards.shard(key, 4),
+                                         file[:-len(".json")])
+            inodes = {file: os.stat(os.path.join(directory, file)).st_ino
+                      for file in files}
+            review.text = "Great"
+            storage.save()
+            changed = [file for file in files if os.stat(os.path.join(
+                directory, file)).st_ino != inodes[file]]
+            self.assertEqual(changed, [shards.shard(
+                "Review." + review.id, 4) + ".json"])
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__records = {}
+            storage.reload()
+            self.assertEqual(storage.count(Place), 20)
+            self.assertEqual(storage.get(Review, review.id).text, "Great")
+            self.assertEqual(len(storage.related(Place, "city_id",
+                                                 city.id)), 20)
+            path = os.path.join(directory, "City.json")
+            with open(path) as f:
+                data = json.load(f)
+            data["City." + city.id]["name"] = "Reno"
+            with open(path, "w") as f:
+                json.dump(data, f)
+            os.remove(os.path.join(directory, "State.json"))
+            storage.close()
+            self.assertEqual(storage.get(City, city.id).name, "Reno")
+            self.assertIsNone(storage.get(State, state.id))
+            FileStorage._FileStorage__shards = 2
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__records = {}
+            storage.reload()
+            storage.save()
+            self.assertEqual(sorted(file for file in os.listdir(directory)
+                                    if file.startswith("Place.")),
+                             ["Place.0.json", "Place.1.json"])
+            self.assertEqual(storage.count(Place), 20)
+        finally:
+            for attr, value in saved.items():
+                setattr(FileStorage, "_FileStorage__" + attr, value)
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_journal_appends_replays_and_compacts(self):
+        """Test that journal mode appends only the changed records, that
+        reload() replays them and that compact() folds them in the file"""
+        storage = FileStorage()
+        journal = FileStorage._FileStorage__journal
+        objects = FileStorage._FileStorage__objects
+        kept = State(name="Kept")
+        removed = State(name="Removed")
+        FileStorage._FileStorage__journal = True
+        try:
+            storage.save()
+            size = os.path.getsize("file.json")
+            start = 0
+            if os.path.exists("file.json.journal"):
+                start = os.path.getsize("file.json.journal")
+            storage.new(kept)
+            storage.new(removed)
+            storage.save()
+            storage.delete(removed)
+            storage.save()
+            self.assertEqual(os.path.getsize("file.json"), size)
+            with open("file.json.journal", "r") as f:
+                f.seek(start)
+                entries = [json.loads(line) for line in f]
+            self.assertEqual(len(entries), 3)
+            self.assertEqual(entries[-1],
+                             {"key": "State." + removed.id, "record": None})
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, kept.id).name, "Kept")
+            self.assertIsNone(storage.get(State, removed.id))
+            storage.compact()
+            self.assertEqual(os.path.getsize("file.json.journal"), 0)
+            with open("file.json", "r") as f:
+                self.assertIn("State." + kept.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__objects = objects
+            FileStorage._FileStorage__journal = journal
+            storage.delete(kept)
+            storage.save()
+            os.remove("file.json.journal")
+            os.remove("file.json.journal.lock")
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_journal_shared_by_processes(self):
+        """Test that two processes appending to the same journal, and
+        compacting it meanwhile, lose none of the other's records"""
+        directory = tempfile.mkdtemp()
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, PYTHONPATH=root, HBNB_FILE_JOURNAL="1",
+                   HBNB_FILE_JOURNAL_COMPACT="15")
+        env.pop("HBNB_TYPE_STORAGE", None)
+        writer = ("import models, sys\n"
+                  "from models.state import State\n"
+                  "for i in range(60):\n"
+                  "    State(name=sys.argv[1]).save()\n"
+                  "models.storage.compact()\n")
+        counter = ("import models\n"
+                   "from models.state import State\n"
+                   "print(len(models.storage.all(State)))\n")
+        try:
+            writers = [subprocess.Popen([sys.executable, "-c", writer, name],
+                                        cwd=directory, env=env)
+                       for name in ["A", "B"]]
+            for process in writers:
+                self.assertEqual(process.wait(), 0)
+            found = subprocess.run([sys.executable, "-c", counter],
+                                   cwd=directory, env=env, check=True,
+                                   stdout=subprocess.PIPE).stdout
+            self.assertEqual(int(found), 120)
+        finally:
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_save_encodes_only_dirty_objects(self):
+        """Test that save() does nothing while no object changed, then
+        re-encodes only the changed object and replaces the file"""
+        storage = FileStorage()
+        state = State(name="Before")
+        storage.new(state)
+        storage.save()
+        inode = os.stat("file.json").st_ino
+        storage.save()
+        self.assertEqual(os.stat("file.json").st_ino, inode)
+        encoded = []
+        to_json = BaseModel.to_json
+
+        def spy(obj, *args, **kwargs):
+            """records the objects being encoded"""
+            encoded.append(obj)
+            return to_json(obj, *args, **kwargs)
+        with mock.patch.object(BaseModel, "to_json", spy):
+            state.name = "After"
+            storage.save()
+        self.assertEqual(encoded, [state])
+        self.assertNotEqual(os.stat("file.json").st_ino, inode)
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        with open("file.json", "r") as f:
+            self.assertEqual(json.load(f)["State." + state.id]["name"],
+                             "After")
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_write_behind_coalesces_saves(self):
+        """Test that write-behind saves are coalesced and that flush()
+        writes them before returning"""
+        storage = FileStorage()
+        window = FileStorage._FileStorage__write_behind
+        FileStorage._FileStorage__write_behind = 0.5
+        before = storage.flush_stats()
+        states = [State(name=str(i)) for i in range(5)]
+        try:
+            for state in states:
+                storage.new(state)
+                storage.save()
+            with open("file.json", "r") as f:
+                self.assertNotIn("State." + states[-1].id, json.load(f))
+            storage.flush()
+            with open("file.json", "r") as f:
+                jo = json.load(f)
+            for state in states:
+                self.assertIn("State." + state.id, jo)
+            after = storage.flush_stats()
+            self.assertEqual(after["saves"] - before["saves"], 5)
+            self.assertEqual(after["flushes"] - before["flushes"], 1)
+            self.assertEqual(after["last_batch"], 5)
+        finally:
+            FileStorage._FileStorage__write_behind = window
+            for state in states:
+                storage.delete(state)
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_write_behind_failure(self):
+        """Test that a failed write-behind flush keeps its changes to be
+        written, is counted and is raised by the next save()"""
+        storage = FileStorage()
+        window = FileStorage._FileStorage__write_behind
+        FileStorage._FileStorage__write_behind = 0.05
+        before = storage.flush_stats()["failures"]
+        state = State(name="Unwritten")
+        key = "State." + state.id
+        try:
+            with mock.patch.object(FileStorage, "_FileStorage__dump",
+                                   side_effect=OSError("disk full")):
+                storage.new(state)
+                storage.save()
+                for i in range(100):
+                    if storage.flush_stats()["failures"] > before:
+                        break
+                    time.sleep(0.02)
+                self.assertGreater(storage.flush_stats()["failures"],
+                                   before)
+                self.assertIn(key, FileStorage._FileStorage__dirty)
+                with self.assertRaises(OSError):
+                    storage.save()
+            storage.flush()
+            with open("file.json", "r") as f:
+                self.assertIn(key, json.load(f))
+        finally:
+            FileStorage._FileStorage__write_behind = window
+            FileStorage._FileStorage__flush_error = None
+            storage.delete(state)
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_all_snapshots_survive_concurrent_writes(self):
+        """Test that all() snapshots can be iterated while another thread
+        adds and deletes objects"""
+        storage = FileStorage()
+        snapshot = storage.all(State)
+        added = []
+        errors = []
+
+        def writer():
+            """adds then deletes states"""
+            for i in range(200):
+                state = State()
+                storage.new(state)
+                added.append(state)
+            for state in added:
+                storage.delete(state)
+
+        def reader():
+            """iterates fresh snapshots"""
+            try:
+                for i in range(200):
+                    for key, value in storage.all().items():
+                        pass
+            except RuntimeError as e:
+                errors.append(e)
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertNotIn("State." + added[0].id, snapshot)
+        self.assertNotIn("State." + added[0].id, storage.all(State))
+        self.assertEqual(storage.all(State), snapshot)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_all_read_during_a_change(self):
+        """Test that a snapshot taken while an object is being stored or
+        deleted is not served once the change is done"""
+        storage = FileStorage()
+        state = State()
+        index = FileStorage._FileStorage__add_to_index
+        drop = FileStorage._FileStorage__drop_from_index
+
+        def reading(change):
+            """returns change, reading every snapshot before it"""
+            def changed(self, key, obj):
+                """reads the snapshots, then changes the indexes"""
+                storage.all()
+                storage.all(State)
+                return change(self, key, obj)
+            return changed
+        with mock.patch.object(FileStorage, "_FileStorage__add_to_index",
+                               reading(index)):
+            storage.new(state)
+        self.assertIn("State." + state.id, storage.all())
+        self.assertIn("State." + state.id, storage.all(State))
+        with mock.patch.object(FileStorage, "_FileStorage__drop_from_index",
+                               reading(drop)):
+            storage.delete(state)
+        self.assertNotIn("State." + state.id, storage.all())
+        self.assertNotIn("State." + state.id, storage.all(State))
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_page_follows_cursor(self):
+        """Test that pages follow the (created_at, id) cursor from the
+        sorted index, ties and changes included, without scanning the
+        class"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            states = [State() for i in range(25)]
+            for i, state in enumerate(states):
+                state.created_at = datetime(2017, 1, 1 + i % 6)
+                storage.new(state)
+            storage.delete(states[0])
+            states[1].created_at = datetime(2016, 1, 1)
+            expected = sorted(states[1:], key=lambda obj:
+                              (obj.created_at, obj.id))
+            found = []
+            after = None
+            with mock.patch.object(file_storage.heapq, "nsmallest",
+                                   side_effect=AssertionError("scan")):
+                while True:
+                    page = storage.page(State, 4, after)
+                    if not page:
+                        break
+                    found.extend(page)
+                    after = (page[-1].created_at, page[-1].id)
+            self.assertEqual(found, expected)
+            self.assertEqual(list(storage.walk(State, after=(
+                expected[9].created_at, expected[9].id))), expected[10:])
+            self.assertEqual(storage.page(City, 4), [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_counts(self):
+        """Test that counts returns the count of every class"""
+        storage = FileStorage()
+        counts = storage.counts()
+        for name in classes:
+            with self.subTest(name=name):
+                self.assertEqual(counts[name], storage.count(name))
+        self.assertEqual(sum(counts.values()), storage.count())
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_tally(self):
+        """Test that tally counts the children of each parent, following
+        moves and deletions, and counts other attributes by a scan"""
+        storage = FileStorage()
+        state = State(name="Tallied")
+        cities = [City(name="Tallied", state_id=state.id) for i in range(3)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        try:
+            self.assertEqual(storage.tally(City, "state_id")[state.id], 3)
+            cities[0].state_id = "elsewhere"
+            storage.delete(cities[1])
+            found = storage.tally("City", "state_id")
+            self.assertEqual((found[state.id], found["elsewhere"]), (1, 1))
+            self.assertEqual(storage.tally(City, "name")["Tallied"], 2)
+            self.assertEqual(storage.column(City, "state_id")[cities[0].id],
+                             "elsewhere")
+        finally:
+            for obj in [state] + cities:
+                storage.delete(obj)
+        self.assertNotIn(state.id, storage.tally(City, "state_id"))
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_query(self):
+        """Test that query finds what a scan finds, through the hash index
+        of a foreign key or the sorted index of a number, and that explain
+        tells which"""
+        storage = FileStorage()
+        user = User(email="query@hbnb.io", password="pwd")
+        city = City(name="Ely", state_id="s1")
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id,
+                        price_by_night=i * 10 % 70, max_guest=i % 4)
+                  for i in range(30)]
+        for obj in [user, city] + places:
+            storage.new(obj)
+        try:
+            cases = [({"user_id": user.id}, None, None),
+                     ({"user_id": user.id, "max_guest": {"in": [1, 3]}},
+                      "-price_by_night", 5),
+                     ({"price_by_night": {">": 20, "<=": 50}},
+                      ["max_guest", "-price_by_night"], None),
+                     ({"city_id": city.id, "price_by_night": {"!=": 0}},
+                      "price_by_night", 4),
+                     ({"max_guest": 2, "name": {">=": "2"}}, "name", None)]
+            for where, order_by, limit in cases:
+                with self.subTest(where=where, order_by=order_by):
+                    expected = query.run(storage.all(Place).values(), where,
+                                         order_by, limit)
+                    found = storage.query(Place, where, order_by, limit)
+                    if order_by is None:
+                        found, expected = set(found), set(expected)
+                    self.assertEqual(found, expected)
+            plan = storage.explain(Place, {"user_id": user.id})
+            self.assertEqual((plan["index"], plan["kind"]),
+                             ("user_id", "hash"))
+            self.assertEqual(plan["candidates"], 30)
+            plan = storage.explain("Place", {"price_by_night": {">": 50}},
+                                   "name")
+            self.assertEqual((plan["index"], plan["kind"], plan["order"]),
+                             ("price_by_night", "sorted", "sort"))
+            self.assertLess(plan["candidates"], storage.count(Place))
+            self.assertIsNone(storage.explain(Place, {"name": "1"})["index"])
+            self.assertEqual(storage.query("Nowhere", {"id": 1}), [])
+            with self.assertRaises(ValueError):
+                storage.query(Place, {"max_guest": {"~": 1}})
+            places[0].price_by_night = 65
+            storage.changed(places[0], "price_by_night")
+            storage.delete(places[1])
+            self.assertEqual(storage.query(Place, {"price_by_night": {
+                "in": [10, 65]}, "user_id": user.id}, "price_by_night"),
+                sorted((place for place in places[2:]
+                        if place.price_by_night == 10),
+                       key=lambda place: place.id) + [places[0]])
+        finally:
+            for obj in [user, city] + places:
+                storage.delete(obj)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_nearby(self):
+        """Test that nearby finds the nearest places on the grid, following
+        their moves and deletions"""
+        storage = FileStorage()
+        places = [Place(name=str(i), latitude=-33.8 + i * 0.01,
+                        longitude=151.2) for i in range(5)]
+        for place in places:
+            storage.new(place)
+        try:
+            found = storage.nearby(Place, -33.8, 151.2, 3)
+            self.assertEqual([place for far, place in found], places[:3])
+            self.assertEqual(found[0][0], 0)
+            self.assertAlmostEqual(found[1][0], 1.112, 3)
+            self.assertEqual(storage.nearby("Place", -33.8, 151.2, 100, 2),
+                             found[:2])
+            places[0].longitude = -151.2
+            storage.delete(places[1])
+            found = storage.nearby(Place, -33.8, 151.2, 3)
+            self.assertEqual([place for far, place in found], [places[2]])
+            found = storage.nearby(Place, -33.8, -151.2, 1)
+            self.assertEqual([place for far, place in found], [places[0]])
+            self.assertEqual(storage.nearby(State, 0, 0, 10), [])
+        finally:
+            for place in places:
+                storage.delete(place)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_nearby_without_position(self):
+        """Test that a place saved without coordinates is not taken to be
+        at (0, 0)"""
+        storage = FileStorage()
+        place = Place(name="Nowhere")
+        storage.new(place)
+        storage.save()
+        try:
+            self.assertEqual(storage.nearby(Place, 0, 0, 10), [])
+            storage.reload()
+            self.assertEqual(storage.nearby(Place, 0, 0, 10), [])
+        finally:
+            storage.delete(storage.get(Place, place.id))
+            storage.save()
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_search_text(self):
+        """Test that search_text ranks the places by their text and that of
+        their reviews, follows changes and is saved to be read back"""
+        storage = FileStorage()
+        places = [Place(name="Loft", description="quiet wombat burrow"),
+                  Place(name="Hut", description="noisy road"),
+                  Place(name="Cabin", description="wombat wombat lake")]
+        review = Review(place_id=places[1].id,
+                        text="A wombat came by at night")
+        path = os.path.join(tempfile.mkdtemp(), "file.text")
+        with mock.patch.object(FileStorage, "_FileStorage__text_path",
+                               path), \
+                mock.patch.object(FileStorage, "_FileStorage__texts", None):
+            for obj in places + [review]:
+                storage.new(obj)
+            try:
+                found = storage.search_text(Place, "WOMBAT")
+                self.assertEqual([place for score, place in found],
+                                 [places[2], places[0], places[1]])
+                self.assertEqual(storage.search_text("Place", "wombat", 1),
+                                 found[:1])
+                self.assertEqual(storage.search_text(Review, "wombat"), [])
+                self.assertTrue(os.path.isfile(path))
+                places[2].description = "lake"
+                storage.delete(review)
+                found = storage.search_text(Place, "wombat lake")
+                self.assertEqual({place for score, place in found},
+                                 {places[0], places[2]})
+                storage.save_text_index()
+                with open(path, "rb") as f:
+                    self.assertIn("Place." + places[2].id,
+                                  text.TextIndex.load(f))
+                FileStorage._FileStorage__texts = None
+                found = storage.search_text(Place, "noisy")
+                self.assertEqual([place for score, place in found],
+                                 [places[1]])
+            finally:
+                for place in places:
+                    storage.delete(place)
+
+    @unittest.skipIf(type(models.storage) is not FileStorage,
+                     "not testing file storage")
+    def test_suggest(self):
+        """Test that suggest finds the names starting with a prefix,
+        following renames and deletions"""
+        storage = FileStorage()
+        objs = [State(name="Zealand"), City(name="zebra Falls"),
+                Amenity(name="Zen garden"), Place(name="Zeppelin"),
+                User(first_name="Zed")]
+        for obj in objs:
+            storage.new(obj)
+        try:
+            found = storage.suggest("ZE")
+            self.assertEqual(found, [("State", objs[0].id, "Zealand"),
+                                     ("City", objs[1].id, "zebra Falls"),
+                                     ("Amenity", objs[2].id, "Zen garden"),
+                                     ("Place", objs[3].id, "Zeppelin")])
+            self.assertEqual(storage.suggest("ze", [City, "Place"], 1),
+                             found[1:2])
+            objs[0].name = "Alaska"
+            storage.delete(objs[2])
+            self.assertEqual(storage.suggest("ze"), [found[1], found[3]])
+            self.assertEqual(storage.suggest("alask", ["State"]),
+                             [("State", objs[0].id, "Alaska")])
+        finally:
+            for obj in objs:
+                storage.delete(obj)
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoDocs, TestGeo and TestGeoGrid classes
+"""
+
+import inspect
+from models.engine import geo
+import pep8
+import random
+import unittest
+
+
+class TestGeoDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the geo module"""
+
+    def test_pep8_conformance_geo(self):
+        """Test that models/engine/geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_geo(self):
+        """Test tests/test_models/test_geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_module_docstring(self):
+        """Test for the geo.py module docstring"""
+        self.assertIsNot(geo.__doc__, None,
+                         "geo.py needs a docstring")
+        self.assertTrue(len(geo.__doc__) >= 1,
+                        "geo.py needs a docstring")
+
+    def test_geo_func_docstrings(self):
+        """Test for the presence of docstrings in geo functions"""
+        for name, func in inspect.getmembers(geo, inspect.isfunction):
+            if func.__module__ != geo.__name__:
+                continue
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+    def test_geo_grid_docstrings(self):
+        """Test for the docstrings of the GeoGrid methods"""
+        self.assertIsNot(geo.GeoGrid.__doc__, None,
+                         "GeoGrid class needs a docstring")
+        for name, func in inspect.getmembers(geo.GeoGrid,
+                                             inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestGeo(unittest.TestCase):
+    """Test the great-circle helpers"""
+
+    def test_coordinates(self):
+        """Test that only numbers within range are a position"""
+        self.assertEqual(geo.coordinates(1, -2.5), (1.0, -2.5))
+        for lat, lng in [(None, 1), (1, "2"), (90.5, 0), (0, -181),
+                         (float("nan"), 0)]:
+            with self.subTest(lat=lat, lng=lng):
+                self.assertIsNone(geo.coordinates(lat, lng))
+
+    def test_distance(self):
+        """Test the distance between known positions"""
+        self.assertEqual(geo.distance(10, 20, 10, 20), 0)
+        self.assertAlmostEqual(geo.distance(0, 0, 0, 1), 111.195, 3)
+        self.assertAlmostEqual(geo.distance(0, 179.5, 0, -179.5), 111.195,
+                               3)
+        paris_london = geo.distance(48.8566, 2.3522, 51.5074, -0.1278)
+        self.assertAlmostEqual(paris_london, 343.5, 0)
+
+    def test_bounds(self):
+        """Test that the box holds the circle, split across the
+        antimeridian and widened to every longitude near a pole"""
+        rand = random.Random(2)
+        for lat, lng, radius in [(0, 0, 100), (10, 179.9, 300),
+                                 (-40, -179, 500), (88, 10, 300),
+                                 (0, 0, 15000)]:
+            with self.subTest(lat=lat, lng=lng, radius=radius):
+                (south, north), spans = geo.bounds(lat, lng, radius)
+                for i in range(2000):
+                    lat2 = rand.uniform(-90, 90)
+                    lng2 = rand.uniform(-180, 180)
+                    if geo.distance(lat, lng, lat2, lng2) > radius:
+                        continue
+                    self.assertTrue(south <= lat2 <= north)
+                    self.assertTrue(any(west <= lng2 <= east
+                                        for west, east in spans))
+        self.assertEqual(len(geo.bounds(10, 179.9, 300)[1]), 2)
+        self.assertEqual(geo.bounds(88, 10, 300)[1], [(-180.0, 180.0)])
+
+
+class TestGeoGrid(unittest.TestCase):
+    """Test the GeoGrid class"""
+
+    def setUp(self):
+        """Indexes random positions, many of them at the poles, on the
+        antimeridian or at the same place"""
+        rand = random.Random(4)
+        self.points = {}
+        for i in range(1500):
+            lat = rand.choice([rand.uniform(-90, 90), 89.95, 0.0])
+            lng = rand.choice([rand.uniform(-180, 180), 179.99, 0.0])
+            self.points["k{:04d}".format(i)] = (lat, lng)
+        self.grid = geo.GeoGrid(5)
+        for key, point in self.points.items():
+            self.grid.add(key, *point)
+
+    def expected(self, lat, lng, radius, limit):
+        """returns the (distance, key) found by a scan"""
+        found = sorted((geo.distance(lat, lng, *point), key)
+                       for key, point in self.points.items())
+        return [item for item in found if item[0] <= radius][:limit]
+
+    def test_nearest(self):
+        """Test that nearest finds what a scan finds, in order"""
+        rand = random.Random(6)
+        for i in range(200):
+            lat, lng = rand.uniform(-90, 90), rand.uniform(-180, 180)
+            radius = rand.choice([10, 300, 2000, 20000])
+            limit = rand.choice([None, 1, 10])
+            with self.subTest(lat=lat, lng=lng, radius=radius):
+                found = self.grid.nearest(lat, lng, radius, limit)
+                expected = self.expected(lat, lng, radius, limit)
+                self.assertEqual([key for far, key in found],
+                                 [key for far, key in expected])
+
+    def test_ties(self):
+        """Test that keys equally far are ordered by key"""
+        found = self.grid.nearest(0, 0, 1, 3)
+        self.assertEqual(found, self.expected(0, 0, 1, 3))
+        self.assertEqual([far for far, key in found], [0, 0, 0])
+
+    def test_changes(self):
+        """Test that moved, invalid and discarded keys are found where they
+        are only"""
+        self.grid.add("k0000", 45.0, 45.0)
+        self.grid.add("k0001", None, 3)
+        self.grid.discard("k0002")
+        self.grid.discard("missing")
+        self.points["k0000"] = (45.0, 45.0)
+        del self.points["k0001"], self.points["k0002"]
+        self.assertEqual(len(self.grid), len(self.points))
+        self.assertEqual(self.grid.nearest(45, 45, 1, 1)[0][1], "k0000")
+        for lat, lng in [(0, 0), (89.95, 179.99), (45, 45)]:
+            self.assertEqual(self.grid.nearest(lat, lng, 5000),
+                             self.expected(lat, lng, 5000, None))
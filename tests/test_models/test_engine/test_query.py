@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""
+Contains the TestQueryDocs, TestPredicates and TestSortedIndex classes
+"""
+
+from datetime import datetime
+import inspect
+from models.engine import query
+import pep8
+import random
+import unittest
+
+
+class TestQueryDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the query module"""
+
+    def test_pep8_conformance_query(self):
+        """Test that models/engine/query.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/query.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_query(self):
+        """Test tests/test_models/test_query.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_query.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_query_module_docstring(self):
+        """Test for the query.py module docstring"""
+        self.assertIsNot(query.__doc__, None,
+                         "query.py needs a docstring")
+        self.assertTrue(len(query.__doc__) >= 1,
+                        "query.py needs a docstring")
+
+    def test_query_func_docstrings(self):
+        """Test for the presence of docstrings in query functions"""
+        for name, func in inspect.getmembers(query, inspect.isfunction):
+            if func.__module__ != query.__name__:
+                continue
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+    def test_sorted_index_docstrings(self):
+        """Test for the docstrings of the SortedIndex methods"""
+        self.assertIsNot(query.SortedIndex.__doc__, None,
+                         "SortedIndex class needs a docstring")
+        for name, func in inspect.getmembers(query.SortedIndex,
+                                             inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class Row:
+    """an object holding the attributes it is given"""
+
+    def __init__(self, **kwargs):
+        """sets the attributes of kwargs"""
+        self.__dict__.update(kwargs)
+
+
+class TestPredicates(unittest.TestCase):
+    """Test the predicates, ordering and scan of a query"""
+
+    def test_predicates(self):
+        """Test that a where gives one triple per operator"""
+        found = query.predicates({"a": 1, "b": {">=": 2, "in": (3, 4)}})
+        self.assertEqual(found, [("a", "==", 1), ("b", ">=", 2),
+                                 ("b", "in", [3, 4])])
+        self.assertEqual(query.predicates(None), [])
+        for where in [{"a": {"~": 1}}, {"a": {"in": "ab"}},
+                      {"a": {"in": 3}}, {"a": {"in": [{"b": 1}]}},
+                      {"a": {">": [1]}}, {"a": {"==": {}}}]:
+            with self.subTest(where=where):
+                with self.assertRaises(ValueError):
+                    query.predicates(where)
+
+    def test_ordering(self):
+        """Test that a "-" prefix orders descending"""
+        self.assertEqual(query.ordering("-a"), [("a", True)])
+        self.assertEqual(query.ordering(["a", "-b"]),
+                         [("a", False), ("b", True)])
+        self.assertEqual(query.ordering(None), [])
+
+    def test_test(self):
+        """Test that a missing value or one of another type satisfies no
+        comparison"""
+        self.assertTrue(query.test(3, "<", 4))
+        self.assertFalse(query.test(None, "<", 4))
+        self.assertFalse(query.test(None, "!=", 4))
+        self.assertFalse(query.test("3", "<", 4))
+        self.assertTrue(query.test(2, "in", [1, 2]))
+
+    def test_run(self):
+        """Test that run filters, orders by value then id and limits"""
+        rows = [Row(id="c", n=2), Row(id="a", n=2), Row(id="b", n=1),
+                Row(id="d", n=None), Row(id="e")]
+        ids = [row.id for row in query.run(rows, {"n": {">=": 1}}, "n")]
+        self.assertEqual(ids, ["b", "a", "c"])
+        ids = [row.id for row in query.run(rows, None, "-n", 3)]
+        self.assertEqual(ids, ["c", "a", "b"])
+        ids = [row.id for row in query.run(rows, None, "n")]
+        self.assertEqual(ids, ["d", "e", "b", "a", "c"])
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+
+    def setUp(self):
+        """Indexes a few keys of numbers, strings and dates"""
+        self.index = query.SortedIndex()
+        self.values = {"k{}".format(i): i % 7 for i in range(30)}
+        self.values.update(s1="b", s2="a", f1=2.5,
+                           d1=datetime(2017, 6, 14), n1=None, l1=[1])
+        for key, value in self.values.items():
+            self.index.add(key, value)
+
+    def expected(self, found):
+        """returns the keys satisfying found by a scan, in index order"""
+        keys = [key for key, value in self.values.items()
+                if query.rank(value) is not None and
+                all(query.test(value, op, operand)
+                    for op, operand in found)]
+        return sorted(keys, key=lambda key: query.rank(self.values[key]) +
+                      (key,))
+
+    def test_len(self):
+        """Test that values of other types are left out"""
+        self.assertEqual(len(self.index), len(self.values) - 2)
+
+    def test_keys(self):
+        """Test that keys returns what a scan finds, in order"""
+        for found in [[], [("==", 3)], [(">", 2), ("<=", 5)], [("<", 2.5)],
+                      [(">=", 2.5)], [("in", [1, 6, "a", None])],
+                      [("==", "a")], [(">", "a")], [("==", 8)],
+                      [("<", datetime(2018, 1, 1))]]:
+            with self.subTest(found=found):
+                self.assertEqual(list(self.index.keys(found)),
+                                 self.expected(found))
+                self.assertEqual(self.index.count(found),
+                                 len(self.expected(found)))
+        self.assertEqual(list(self.index.keys([("<", 1)], True)),
+                         ["k7", "k28", "k21", "k14", "k0"])
+
+    def test_items(self):
+        """Test that items gives the value of each key keys gives"""
+        found = [(">", 4)]
+        self.assertEqual(list(self.index.items(found)),
+                         [(self.values[key], key)
+                          for key in self.index.keys(found)])
+        self.assertEqual(list(self.index.items([("<", 1)], True))[0],
+                         (0, "k7"))
+
+    def test_changes(self):
+        """Test that changed and discarded keys are found under their new
+        value only, in order both ways, however many changes pile up"""
+        rand = random.Random(5)
+        for step in range(400):
+            key = "k{}".format(rand.randrange(40))
+            if rand.random() < 0.3:
+                self.index.discard(key)
+                self.values.pop(key, None)
+            else:
+                self.values[key] = rand.randrange(10)
+                self.index.add(key, self.values[key])
+            if step % 37 == 0:
+                found = [(">=", rand.randrange(10))]
+                self.assertEqual(list(self.index.keys(found)),
+                                 self.expected(found))
+                self.assertEqual(list(self.index.keys(found, True)),
+                                 self.expected(found)[::-1])
+        self.assertEqual(list(self.index.keys()), self.expected([]))
+        self.assertEqual(len(self.index), len(self.expected([])))
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Contains the TestShardsDocs and TestShards classes
+"""
+
+import inspect
+from models.engine import codec, shards
+import os
+import pep8
+import shutil
+import tempfile
+import unittest
+
+
+class TestShardsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the shards module"""
+
+    def test_pep8_conformance_shards(self):
+        """Test that models/engine/shards.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/shards.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_shards(self):
+        """Test tests/test_models/test_shards.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_shards.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_shards_module_docstring(self):
+        """Test for the shards.py module docstring"""
+        self.assertIsNot(shards.__doc__, None,
+                         "shards.py needs a docstring")
+        self.assertTrue(len(shards.__doc__) >= 1,
+                        "shards.py needs a docstring")
+
+    def test_shards_func_docstrings(self):
+        """Test for the presence of docstrings in shards functions"""
+        for name, func in inspect.getmembers(shards, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestShards(unittest.TestCase):
+    """Test the layout of the shard files"""
+    def setUp(self):
+        """Makes a directory of shard files"""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Removes the directory"""
+        shutil.rmtree(self.directory)
+
+    def write(self, name, records):
+        """writes the shard file name holding records"""
+        with open(os.path.join(self.directory, name), "wb") as f:
+            codec.dump(records, f)
+
+    def test_shard(self):
+        """Test that only the partitioned classes are spread, always over
+        the same shards"""
+        self.assertEqual(shards.shard("State.s1", 8), "State")
+        self.assertEqual(shards.shard("Place.p1", 1), "Place")
+        found = {shards.shard("Place.{}".format(i), 4) for i in range(100)}
+        self.assertEqual(found, {"Place.0", "Place.1", "Place.2",
+                                 "Place.3"})
+        self.assertEqual(shards.shard("Review.r1", 4),
+                         shards.shard("Review.r1", 4))
+
+    def test_listing(self):
+        """Test that the shard files are listed by shard name, without the
+        temp files"""
+        for name in ["State.json", "Place.3.json.gz", "Place.1.hbnb",
+                     "City.json.tmp"]:
+            self.write(name, {})
+        self.assertEqual(set(shards.listing(self.directory)),
+                         {"State", "Place.3", "Place.1"})
+        self.assertEqual(shards.listing(os.path.join(self.directory, "no")),
+                         {})
+
+    def test_read_all(self):
+        """Test that the files read by a pool of processes give back their
+        records and digests"""
+        records = {}
+        for i in range(4):
+            records[i] = {"Place.{}".format(j): {
+                "__class__": "Place", "id": str(j), "name": "p"}
+                for j in range(i * 10, i * 10 + 10)}
+            self.write("Place.{}.json".format(i), records[i])
+        paths = shards.listing(self.directory)
+        for processes in [1, 2]:
+            with self.subTest(processes=processes):
+                found = shards.read_all(paths.values(), "json", processes)
+                for i in range(4):
+                    path = paths["Place.{}".format(i)]
+                    self.assertEqual(found[path][0], codec.digest(path))
+                    self.assertEqual(found[path][1], records[i])
@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+"""
+Contains the TestSharedStorageDocs and TestSharedStorage classes
+"""
+
+from datetime import datetime
+import inspect
+import json
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.engine import columns, shared_storage
+from models.engine.file_storage import relations
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import tempfile
+import unittest
+SharedStorage = shared_storage.SharedStorage
+
+
+class TestSharedStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SharedStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.ss_f = inspect.getmembers(SharedStorage, inspect.isfunction)
+
+    def test_pep8_conformance_shared_storage(self):
+        """Test that models/engine/shared_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/shared_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_shared_storage(self):
+        """Test tests/test_models/test_shared_storage.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_shared_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_shared_storage_module_docstring(self):
+        """Test for the shared_storage.py module docstring"""
+        self.assertIsNot(shared_storage.__doc__, None,
+                         "shared_storage.py needs a docstring")
+        self.assertTrue(len(shared_storage.__doc__) >= 1,
+                        "shared_storage.py needs a docstring")
+
+    def test_shared_storage_class_docstring(self):
+        """Test for the SharedStorage class docstring"""
+        self.assertIsNot(SharedStorage.__doc__, None,
+                         "SharedStorage class needs a docstring")
+        self.assertTrue(len(SharedStorage.__doc__) >= 1,
+                        "SharedStorage class needs a docstring")
+
+    def test_ss_func_docstrings(self):
+        """Test for the presence of docstrings in SharedStorage methods"""
+        for func in self.ss_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestSharedStorage(unittest.TestCase):
+    """Test the SharedStorage class over a snapshot built from JSON"""
+    def setUp(self):
+        """Writes a JSON file holding a state, a city, two places and an
+        amenity, and maps the snapshot built from it"""
+        self.dir = tempfile.mkdtemp()
+        self.state = State(name="Nevada")
+        self.city = City(name="Reno", state_id=self.state.id)
+        self.wifi = Amenity(name="Wifi")
+        self.loft = Place(name="Loft", city_id=self.city.id)
+        self.loft.amenity_ids = [self.wifi.id]
+        self.flat = Place(name="Flat", city_id=self.city.id)
+        self.user = User(email="a@b.c", password="pwd")
+        objs = [self.state, self.city, self.wifi, self.loft, self.flat,
+                self.user]
+        source = os.path.join(self.dir, "file.json")
+        with open(source, "w") as f:
+            json.dump({obj.__class__.__name__ + "." + obj.id:
+                       obj.to_dict(secure_pwd=False) for obj in objs}, f)
+        self.saved = {name: getattr(SharedStorage, name) for name in [
+            "_SharedStorage__file_path", "_SharedStorage__source_path"]}
+        SharedStorage._SharedStorage__file_path = os.path.join(self.dir,
+                                                               "file.cols")
+        SharedStorage._SharedStorage__source_path = source
+        SharedStorage._SharedStorage__overlay = {}
+        SharedStorage._SharedStorage__removed = set()
+        self.storage = SharedStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Restores the paths of the snapshot"""
+        for name, value in self.saved.items():
+            setattr(SharedStorage, name, value)
+        SharedStorage._SharedStorage__overlay = {}
+        SharedStorage._SharedStorage__removed = set()
+        SharedStorage._SharedStorage__columns = None
+
+    def test_get_materializes(self):
+        """Test that get() builds the object once while it is in use"""
+        state = self.storage.get(State, self.state.id)
+        self.assertIsNot(state, self.state)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertIs(type(state.created_at), datetime)
+        self.assertIs(self.storage.get(State, self.state.id), state)
+        self.assertIsNone(self.storage.get(State, "missing"))
+        self.assertIsNone(self.storage.get(State, None))
+        user = self.storage.get(User, self.user.id)
+        self.assertEqual(user.password, self.user.password)
+
+    def test_all_and_count(self):
+        """Test that all() and count() cover every class"""
+        self.assertEqual(set(self.storage.all(Place)),
+                         {"Place." + self.loft.id, "Place." + self.flat.id})
+        self.assertEqual(len(self.storage.all()), 6)
+        self.assertEqual(self.storage.count(), 6)
+        self.assertEqual(self.storage.count(Place), 2)
+        self.assertEqual(self.storage.counts()["Review"], 0)
+
+    def test_overlay(self):
+        """Test that new, changed and deleted objects are seen before they
+        are saved"""
+        other = State(name="Utah")
+        self.storage.new(other)
+        state = self.storage.get(State, self.state.id)
+        state.name = "Silver"
+        self.storage.changed(state, "name")
+        self.storage.delete(self.storage.get(Place, self.flat.id))
+        self.assertIs(self.storage.get(State, other.id), other)
+        self.assertEqual(self.storage.count(State), 2)
+        self.assertEqual(self.storage.count(Place), 1)
+        self.assertIsNone(self.storage.get(Place, self.flat.id))
+        self.assertEqual(self.storage.related(Place, "city_id", self.city.id),
+                         [self.storage.get(Place, self.loft.id)])
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Silver")
+
+    def test_save_republishes(self):
+        """Test that save() writes the overlay in a new snapshot that
+        another process picks up on close()"""
+        path = SharedStorage._SharedStorage__file_path
+        inode = os.stat(path).st_ino
+        other = State(name="Utah")
+        self.storage.new(other)
+        self.storage.delete(self.storage.get(Place, self.flat.id))
+        self.storage.save()
+        self.assertNotEqual(os.stat(path).st_ino, inode)
+        self.assertIs(self.storage.get(State, other.id), other)
+        table = columns.Columns(path).table("State")
+        self.assertIsNotNone(table.find(other.id))
+        self.assertIsNone(columns.Columns(path).table("Place").find(
+            self.flat.id))
+        records = [{"__class__": "State", "id": "s9", "name": "Ohio"}]
+        columns.write(path, records, relations)
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, "s9").name, "Ohio")
+        self.assertIsNone(self.storage.get(State, other.id))
+
+    def test_edits_across_saves(self):
+        """Test that an object fetched before a save is still saved once
+        changed after it, unless it was deleted"""
+        state = self.storage.get(State, self.state.id)
+        city = self.storage.get(City, self.city.id)
+        place = self.storage.get(Place, self.flat.id)
+        state.name = "Silver"
+        self.storage.changed(state, "name")
+        self.storage.save()
+        city.name = "Sparks"
+        self.storage.changed(city, "name")
+        self.storage.delete(place)
+        self.storage.save()
+        place.name = "Gone"
+        self.storage.changed(place, "name")
+        self.storage.save()
+        path = SharedStorage._SharedStorage__file_path
+        snapshot = columns.Columns(path)
+        for name, obj, value in [("State", self.state, "Silver"),
+                                 ("City", self.city, "Sparks")]:
+            table = snapshot.table(name)
+            self.assertEqual(table.record(table.find(obj.id))["name"],
+                             value)
+        self.assertIsNone(snapshot.table("Place").find(self.flat.id))
+        self.assertIsNone(self.storage.get(Place, self.flat.id))
+
+    def test_page_and_walk(self):
+        """Test that paging merges the snapshot and the overlay in
+        order"""
+        late = Place(name="Late", city_id=self.city.id)
+        self.storage.new(late)
+        order = sorted([self.loft, self.flat, late],
+                       key=lambda obj: (obj.created_at, obj.id))
+        self.assertEqual([obj.id for obj in self.storage.walk(Place)],
+                         [obj.id for obj in order])
+        first = order[0]
+        page = self.storage.page(Place, 1, (first.created_at, first.id))
+        self.assertEqual([obj.id for obj in page], [order[1].id])
+        page = self.storage.page(City, 5, None, "state_id", self.state.id)
+        self.assertEqual([obj.id for obj in page], [self.city.id])
+
+    def test_search_places(self):
+        """Test that search_places matches states, cities and
+        amenities"""
+        search = self.storage.search_places
+        self.assertEqual(len(search()), 2)
+        self.assertEqual([place.id for place in search(
+            states=[self.state.id], amenities=[self.wifi.id])],
+            [self.loft.id])
+        self.assertEqual(len(search(cities=[self.city.id])), 2)
+        self.assertEqual(search(amenities=["missing"]), [])
+
+    def test_nearby_without_position(self):
+        """Test that nearby skips the places saved without coordinates"""
+        late = Place(name="Late", city_id=self.city.id)
+        self.storage.new(late)
+        self.assertEqual(self.storage.nearby(Place, 0, 0, 10), [])
+        self.storage.save()
+        self.assertEqual(self.storage.nearby(Place, 0, 0, 10), [])
+        near = Place(name="Near", latitude=0.01, longitude=0.0)
+        self.storage.new(near)
+        self.assertEqual([place.id for far, place in self.storage.nearby(
+            Place, 0, 0, 10)], [near.id])
+
+    def test_column_defaults(self):
+        """Test that a row without an attribute reads as the default of
+        its class, as the materialized object does"""
+        place = self.storage.get(Place, self.flat.id)
+        self.assertEqual(self.storage.column(Place, "description"),
+                         {self.loft.id: place.description,
+                          self.flat.id: place.description})
+        self.assertEqual(self.storage.tally(Place, "user_id"),
+                         {place.user_id: 2})
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""
+Contains the TestSnapshotDocs and TestSnapshot classes
+"""
+
+import inspect
+import json
+from models.engine import snapshot
+import pep8
+import unittest
+
+
+class TestSnapshotDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the snapshot module"""
+
+    def test_pep8_conformance_snapshot(self):
+        """Test that models/engine/snapshot.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_snapshot(self):
+        """Test tests/test_models/test_snapshot.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_snapshot_module_docstring(self):
+        """Test for the snapshot.py module docstring"""
+        self.assertIsNot(snapshot.__doc__, None,
+                         "snapshot.py needs a docstring")
+        self.assertTrue(len(snapshot.__doc__) >= 1,
+                        "snapshot.py needs a docstring")
+
+    def test_snapshot_func_docstrings(self):
+        """Test for the presence of docstrings in snapshot functions"""
+        for name, func in inspect.getmembers(snapshot, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test the binary snapshot format"""
+    def setUp(self):
+        """Makes the records of a state and of two of its cities"""
+        self.records = {
+            "State.s1": {"__class__": "State", "name": "Nevada",
+                         "id": "s1", "created_at": "2017-06-14T22:31:03"},
+            "City.c1": {"__class__": "City", "id": "c1", "state_id": "s1",
+                        "name": "Reno"},
+            "City.c2": json.dumps({"__class__": "City", "id": "c2",
+                                   "state_id": "s1", "name": "Ely"}),
+        }
+
+    def test_round_trip(self):
+        """Test that decoding gives back every record"""
+        data = snapshot.encode(self.records)
+        self.assertTrue(snapshot.is_snapshot(data))
+        rows = snapshot.decode(data)
+        self.assertEqual(set(rows), set(self.records))
+        for key, row in rows.items():
+            with self.subTest(key=key):
+                self.assertEqual(snapshot.record(row),
+                                 snapshot.record(self.records[key]))
+
+    def test_rows_are_kept(self):
+        """Test that decoded rows are encoded again as they are"""
+        rows = snapshot.decode(snapshot.encode(self.records))
+        self.assertIs(snapshot.row(rows["City.c1"]), rows["City.c1"])
+        self.assertEqual(snapshot.decode(snapshot.encode(rows)), rows)
+
+    def test_strings_stored_once(self):
+        """Test that the repeated strings are shared by the rows"""
+        rows = snapshot.decode(snapshot.encode(self.records))
+        state, reno, ely = rows["State.s1"], rows["City.c1"], rows["City.c2"]
+        self.assertIs(reno[2][1], state[2][0])
+        self.assertIs(reno[2][1], ely[2][1])
+        self.assertIs(reno[1], ely[1])
+        self.assertIs(reno[0], ely[0])
+
+    def test_smaller_than_json(self):
+        """Test that the snapshot is smaller than the JSON file"""
+        records = {}
+        for i in range(100):
+            records["City.{}".format(i)] = {
+                "__class__": "City", "id": str(i), "state_id": "s1",
+                "name": "City", "created_at": "2017-06-14T22:31:03.000000"}
+        self.assertLess(len(snapshot.encode(records)),
+                        len(json.dumps(records)) / 2)
+
+    def test_invalid_data(self):
+        """Test that JSON data or an unknown version is rejected"""
+        data = snapshot.encode(self.records)
+        self.assertFalse(snapshot.is_snapshot(b"{}"))
+        with self.assertRaises(ValueError):
+            snapshot.decode(b"{}")
+        with self.assertRaises(ValueError):
+            snapshot.decode(snapshot.magic + b"\xff" +
+                            data[len(snapshot.magic) + 1:])
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.engine.db_storage import DBStorage
+from models.city import City
+from models.state import State
+import pep8
+import threading
+import unittest
+SQLiteStorage = sqlite_storage.SQLiteStorage
+is_sqlite = type(models.storage).__name__ == "SQLiteStorage"
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqs_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqs_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+    def test_is_db_storage(self):
+        """Test that SQLiteStorage shares the DBStorage contract"""
+        self.assertTrue(issubclass(SQLiteStorage, DBStorage))
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    @unittest.skipIf(not is_sqlite, "not testing sqlite storage")
+    def test_wal_mode(self):
+        """Test that connections use the WAL journal"""
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        self.assertEqual(mode, "wal")
+
+    @unittest.skipIf(not is_sqlite, "not testing sqlite storage")
+    def test_foreign_key_indexes(self):
+        """Test that every foreign key column is indexed"""
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as conn:
+            indexes = {row[0] for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for index in ["ix_cities_state_id", "ix_places_city_id",
+                      "ix_places_user_id", "ix_reviews_place_id",
+                      "ix_reviews_user_id", "ix_place_amenity_amenity_id"]:
+            with self.subTest(index=index):
+                self.assertIn(index, indexes)
+
+    @unittest.skipIf(not is_sqlite, "not testing sqlite storage")
+    def test_more_threads_than_pool(self):
+        """Test that more concurrent threads than the pool holds all get a
+        working connection, configured and handed back to the pool"""
+        engine = models.storage._DBStorage__engine
+        state = State(name="Pooled")
+        state.save()
+        # more threads than the pool keeps and lets overflow at once
+        size = 24
+        barrier = threading.Barrier(size)
+        errors = []
+        found = []
+
+        def read():
+            """reads the state and the pragmas from this thread"""
+            try:
+                barrier.wait()
+                for i in range(5):
+                    found.append(models.storage.get(State, state.id).name)
+                    found.append(models.storage.count(State) > 0)
+                session = models.storage._DBStorage__session
+                found.append(session.connection().exec_driver_sql(
+                    "PRAGMA foreign_keys").scalar() == 1)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                models.storage.close()
+        threads = [threading.Thread(target=read) for i in range(size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(found), size * 11)
+        self.assertEqual(set(found), {"Pooled", True})
+        self.assertTrue(engine.pool.checkedin() <= engine.pool.size())
+        models.storage.delete(state)
+        models.storage.save()
+
+    @unittest.skipIf(not is_sqlite, "not testing sqlite storage")
+    def test_relationships(self):
+        """Test that objects saved through SQLite come back with their
+        relationships"""
+        state = State(name="Nevada")
+        state.save()
+        city = City(name="Reno", state_id=state.id)
+        city.save()
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIn(city, models.storage.get(State, state.id).cities)
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Contains the TestSuggestDocs and TestNameIndex classes
+"""
+
+import inspect
+from models.engine import suggest
+import pep8
+import random
+import unittest
+
+
+class TestSuggestDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the suggest module"""
+
+    def test_pep8_conformance_suggest(self):
+        """Test that models/engine/suggest.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/suggest.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_suggest(self):
+        """Test tests/test_models/test_suggest.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_suggest.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_suggest_module_docstring(self):
+        """Test for the suggest.py module docstring"""
+        self.assertIsNot(suggest.__doc__, None,
+                         "suggest.py needs a docstring")
+        self.assertTrue(len(suggest.__doc__) >= 1,
+                        "suggest.py needs a docstring")
+
+    def test_name_index_docstrings(self):
+        """Test for the docstrings of the NameIndex methods"""
+        self.assertIsNot(suggest.NameIndex.__doc__, None,
+                         "NameIndex class needs a docstring")
+        for name, func in inspect.getmembers(suggest.NameIndex,
+                                             inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestNameIndex(unittest.TestCase):
+    """Test the NameIndex class"""
+
+    def setUp(self):
+        """Indexes random names of a few letters in every class"""
+        rand = random.Random(3)
+        self.index = suggest.NameIndex()
+        self.names = {}
+        for i in range(800):
+            cls = rand.choice(list(suggest.fields))
+            name = "".join(rand.choice("aAbBcé ") for j in range(
+                rand.randint(1, 5)))
+            self.names["{}.{:03d}".format(cls, i)] = name
+            self.index.add("{}.{:03d}".format(cls, i), name)
+
+    def expected(self, prefix, types=None, limit=None):
+        """returns the (class name, id, name) found by a scan"""
+        found = sorted((name.casefold(), key, name)
+                       for key, name in self.names.items()
+                       if name.casefold().startswith(prefix.casefold()) and
+                       (types is None or key.split(".")[0] in types))
+        return [tuple(key.split(".")) + (name,)
+                for folded, key, name in found][:limit]
+
+    def test_suggest(self):
+        """Test that suggest finds what a scan finds, in order, whatever
+        the case of the prefix"""
+        for prefix in ["", "a", "A", "ab", "É", "c b", "zz"]:
+            for types in [None, {"City"}, {"State", "Place"}, set()]:
+                for limit in [None, 1, 10]:
+                    with self.subTest(prefix=prefix, types=types,
+                                      limit=limit):
+                        self.assertEqual(
+                            self.index.suggest(prefix, types, limit),
+                            self.expected(prefix, types, limit))
+        self.assertEqual(self.index.suggest("a", None, 0), [])
+
+    def test_changes(self):
+        """Test that renamed and discarded keys are found under their new
+        name only"""
+        self.index.add("City.000", "Zanzibar")
+        self.index.add("State.001", None)
+        self.index.discard("Place.002")
+        self.index.discard("Place.missing")
+        self.names.update({"City.000": "Zanzibar"})
+        for key in ["State.001", "Place.002"]:
+            self.names.pop(key, None)
+        self.assertEqual(len(self.index), len(self.names))
+        self.assertEqual(self.index.suggest("zan"),
+                         [("City", "000", "Zanzibar")])
+        self.assertEqual(self.index.suggest("a", None, None),
+                         self.expected("a"))
+
+    def test_sync(self):
+        """Test that sync drops the keys not given and renames the
+        others"""
+        self.index.sync([("Amenity.1", "Wifi"), ("City.2", "wichita")])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.suggest("WI"),
+                         [("City", "2", "wichita"),
+                          ("Amenity", "1", "Wifi")])
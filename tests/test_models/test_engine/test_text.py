@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""
+Contains the TestTextDocs, TestText and TestTextIndex classes
+"""
+
+import inspect
+import io
+from models.engine import text
+import pep8
+import random
+import unittest
+
+
+class TestTextDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the text module"""
+
+    def test_pep8_conformance_text(self):
+        """Test that models/engine/text.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_text(self):
+        """Test tests/test_models/test_text.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_text_module_docstring(self):
+        """Test for the text.py module docstring"""
+        self.assertIsNot(text.__doc__, None,
+                         "text.py needs a docstring")
+        self.assertTrue(len(text.__doc__) >= 1,
+                        "text.py needs a docstring")
+
+    def test_text_func_docstrings(self):
+        """Test for the presence of docstrings in text functions"""
+        for name, func in inspect.getmembers(text, inspect.isfunction):
+            if func.__module__ != text.__name__:
+                continue
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+    def test_text_index_docstrings(self):
+        """Test for the docstrings of the TextIndex methods"""
+        self.assertIsNot(text.TextIndex.__doc__, None,
+                         "TextIndex class needs a docstring")
+        for name, func in inspect.getmembers(text.TextIndex,
+                                             inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestText(unittest.TestCase):
+    """Test the tokenizer and the documents of the objects"""
+
+    def test_tokens(self):
+        """Test that tokens are lowercase runs of letters and digits"""
+        self.assertEqual(text.tokens("Cozy LOFT, 2 rooms_near Café!"),
+                         ["cozy", "loft", "2", "rooms", "near", "café"])
+        self.assertEqual(text.tokens(" -- "), [])
+
+    def test_document(self):
+        """Test that a document joins the text attributes and names the
+        object credited with its score"""
+        self.assertEqual(text.document("Place", {
+            "id": "1", "name": "Loft", "description": None}),
+            ("Place.1", "Loft", "Place.1"))
+        self.assertEqual(text.document("Review", {
+            "id": "2", "text": "Nice", "place_id": "1"}),
+            ("Review.2", "Nice", "Place.1"))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class"""
+
+    def setUp(self):
+        """Indexes random documents of a small vocabulary, some of them
+        credited to another key"""
+        rand = random.Random(8)
+        words = ["w{}".format(i) for i in range(40)]
+        self.index = text.TextIndex()
+        self.documents = []
+        for i in range(600):
+            found = rand.choices(words, weights=range(40, 0, -1),
+                                 k=rand.randint(1, 12))
+            owner = "P.{}".format(rand.randrange(200)) if i % 3 else None
+            self.documents.append(("D.{:03d}".format(i), " ".join(found),
+                                   owner))
+            self.index.add(*self.documents[-1])
+
+    def test_search(self):
+        """Test that a search with a limit finds the best scores a full
+        search finds, in order"""
+        rand = random.Random(9)
+        for i in range(100):
+            query = " ".join("w{}".format(rand.randrange(45))
+                             for j in range(rand.randint(1, 4)))
+            limit = rand.choice([1, 5, 20])
+            prefix = rand.choice([None, "P."])
+            with self.subTest(query=query, limit=limit, prefix=prefix):
+                full = self.index.search(query, None, prefix)
+                found = self.index.search(query, limit, prefix)
+                self.assertEqual([key for score, key in found],
+                                 [key for score, key in full[:limit]])
+                for (score, key), (expected, key) in zip(found, full):
+                    self.assertAlmostEqual(score, expected)
+
+    def test_owners(self):
+        """Test that the score of an owner sums its documents"""
+        self.index.sync([("A", "alpha", "O"), ("B", "alpha alpha", "O"),
+                         ("C", "alpha beta", None)])
+        scores = self.index.scores("alpha")
+        self.assertEqual(set(scores), {"O", "C"})
+        self.assertTrue(scores["O"] > scores["C"])
+        self.assertEqual([key for score, key in
+                          self.index.search("beta gamma")], ["C"])
+
+    def test_changes(self):
+        """Test that documents added again unchanged are not counted,
+        while changed and discarded ones are"""
+        self.index.changes = 0
+        for document in self.documents:
+            self.index.add(*document)
+        self.assertEqual(self.index.changes, 0)
+        self.index.add("D.000", "zebra")
+        self.index.discard("D.001")
+        self.index.discard("missing")
+        self.assertEqual(len(self.index), len(self.documents) - 1)
+        self.assertNotIn("D.001", self.index)
+        self.assertEqual([key for score, key in self.index.search("zebra")],
+                         ["D.000"])
+        self.assertTrue(self.index.changes > 0)
+
+    def test_sync(self):
+        """Test that sync drops the documents not given"""
+        self.index.sync(self.documents[:10])
+        self.assertEqual(sorted(self.index.keys()),
+                         [key for key, value, owner in self.documents[:10]])
+
+    def test_dump_load(self):
+        """Test that a loaded index searches like the one dumped"""
+        f = io.BytesIO()
+        self.index.dump(f)
+        self.assertEqual(self.index.changes, 0)
+        f.seek(0)
+        loaded = text.TextIndex.load(f)
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertEqual(loaded.search("w3 w30", 10),
+                         self.index.search("w3 w30", 10))
+        loaded.add(*self.documents[0])
+        self.assertEqual(loaded.changes, 0)
+        for data in [b"", b"HBTX\x00", b"HBTX\x01\x00"]:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    text.TextIndex.load(io.BytesIO(data))
+
+    def test_read_missing(self):
+        """Test that reading a missing file gives an empty index"""
+        self.assertEqual(len(text.read("/nonexistent/file.text")), 0)
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Test the compiled serializers for expected behavior and documentation"""
+from datetime import datetime
+import inspect
+import json
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.serializer import serializer, Serializer
+from models.state import State
+from models.user import User
+import pep8 as pycodestyle
+import unittest
+module_doc = models.serializer.__doc__
+
+
+class TestSerializerDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the serializer
+    module"""
+
+    def test_pep8_conformance(self):
+        """Test that models/serializer.py conforms to PEP8."""
+        for path in ['models/serializer.py',
+                     'tests/test_models/test_serializer.py']:
+            with self.subTest(path=path):
+                errors = pycodestyle.Checker(path).check_all()
+                self.assertEqual(errors, 0)
+
+    def test_module_docstring(self):
+        """Test for the existence of module docstring"""
+        self.assertIsNot(module_doc, None,
+                         "serializer.py needs a docstring")
+        self.assertTrue(len(module_doc) > 1,
+                        "serializer.py needs a docstring")
+
+    def test_func_docstrings(self):
+        """Test for the presence of docstrings in the functions"""
+        funcs = inspect.getmembers(models.serializer, inspect.isfunction)
+        funcs += inspect.getmembers(Serializer, inspect.isfunction)
+        for func in funcs:
+            with self.subTest(function=func):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestSerializer(unittest.TestCase):
+    """Test the compiled serializers"""
+
+    def objects(self):
+        """returns an instance of every model class"""
+        return [Amenity(name="Wifi"), City(name="Reno", state_id="s"),
+                Place(name="Loft", number_rooms=2, latitude=1.5,
+                      description="café \"quoted\""),
+                Review(text="Nice"), State(name="Nevada"),
+                User(email="a@b.c", password="pwd", first_name=None)]
+
+    def test_to_json_matches_to_dict(self):
+        """Test that to_json is the JSON encoding of to_dict"""
+        for obj in self.objects():
+            with self.subTest(cls=obj.__class__.__name__):
+                self.assertEqual(json.loads(obj.to_json()), obj.to_dict())
+
+    def test_extra_attributes(self):
+        """Test that attributes the class does not declare are encoded"""
+        state = State(name="Nevada")
+        state.motto = "Battle Born"
+        state.population = 3104614
+        self.assertEqual(json.loads(state.to_json())["motto"], "Battle Born")
+        self.assertEqual(state.to_dict()["population"], 3104614)
+
+    def test_datetime_format(self):
+        """Test that datetimes keep the time format of BaseModel"""
+        state = State()
+        state.created_at = datetime(2017, 6, 14, 22, 31, 3)
+        expected = "2017-06-14T22:31:03.000000"
+        self.assertEqual(state.to_dict()["created_at"], expected)
+        self.assertEqual(json.loads(state.to_json())["created_at"], expected)
+
+    def test_password(self):
+        """Test that the password is only encoded when asked for"""
+        user = User(email="a@b.c", password="pwd")
+        self.assertNotIn("password", user.to_dict())
+        self.assertNotIn("password", json.loads(user.to_json()))
+        self.assertEqual(json.loads(user.to_json(False))["password"],
+                         user.password)
+        self.assertEqual(user.to_dict(False)["password"], user.password)
+
+    def test_compiled_once(self):
+        """Test that each class is compiled once"""
+        self.assertIs(serializer(State), serializer(State))
+        self.assertIsNot(serializer(State), serializer(City))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_relationships_left_out(self):
+        """Test that loaded relationships are not encoded"""
+        state = State(name="Nevada")
+        state.cities.append(City(name="Reno"))
+        self.assertIn("cities", state.__dict__)
+        self.assertNotIn("cities", state.to_dict())
+        self.assertNotIn("cities", json.loads(state.to_json()))
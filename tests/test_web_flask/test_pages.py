@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagesDocs and TestPagesStatements classes
+"""
+
+import importlib
+import models
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+from sqlalchemy import event
+import unittest
+
+
+class TestPagesDocs(unittest.TestCase):
+    """Tests to check the style of the web_flask page tests"""
+
+    def test_pep8_conformance_test_pages(self):
+        """Test that tests/test_web_flask/test_pages.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_web_flask/test_pages.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestPagesStatements(unittest.TestCase):
+    """Test that the pages loading their relationships eagerly issue as
+    many statements whatever the number of rows"""
+
+    def setUp(self):
+        """Creates the user owning the places added"""
+        self.user = User(email="pages@hbnb.io", password="pwd",
+                         first_name="Page", last_name="Owner")
+        self.user.save()
+        self.added = []
+
+    def tearDown(self):
+        """Deletes the places, cities, states and user added"""
+        for obj in reversed([self.user] + self.added):
+            found = models.storage.get(type(obj), obj.id)
+            if found is not None:
+                models.storage.delete(found)
+        models.storage.save()
+        models.storage.close()
+
+    def add_states(self, states):
+        """adds states of two cities, each holding a place"""
+        for i in range(states):
+            state = State(name="Paged")
+            state.save()
+            self.added.append(state)
+            for j in range(2):
+                city = City(name="Paged City", state_id=state.id)
+                city.save()
+                place = Place(name="Paged Place", city_id=city.id,
+                              user_id=self.user.id)
+                place.save()
+                self.added.extend([city, place])
+        models.storage.close()
+
+    def get(self, module, path):
+        """returns the page at path of the web_flask module and the number
+        of SQL statements it issued"""
+        client = importlib.import_module(
+            "web_flask." + module).app.test_client()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        engine = models.storage._DBStorage__engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get(path)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(response.status_code, 200)
+        return response.get_data(as_text=True), len(statements)
+
+    def assertStatementsDoNotGrow(self, module, path=None):
+        """asserts that the page issues as many statements before and
+        after states, cities and places are added, and lists them"""
+        self.add_states(1)
+        path = path or "/" + module.split("-", 1)[1]
+        self.get(module, path.format(self.added[0].id))
+        page, small = self.get(module, path.format(self.added[0].id))
+        self.add_states(3)
+        page, large = self.get(module, path.format(self.added[0].id))
+        self.assertEqual(small, large)
+        self.assertIn("Paged City", page)
+        return page
+
+    def test_cities_by_states(self):
+        """Test the statements of 8-cities_by_states"""
+        self.assertStatementsDoNotGrow("8-cities_by_states")
+
+    def test_states(self):
+        """Test the statements of 9-states for one state"""
+        self.assertStatementsDoNotGrow("9-states", "/states/{}")
+
+    def test_hbnb_filters(self):
+        """Test the statements of 10-hbnb_filters"""
+        self.assertStatementsDoNotGrow("10-hbnb_filters")
+
+    def test_hbnb(self):
+        """Test the statements of 100-hbnb"""
+        page = self.assertStatementsDoNotGrow("100-hbnb")
+        self.assertIn("Page Owner", page)